@@ -1,15 +1,10 @@
-import time
 import random
-import json
-import os
-from enum import Enum
-
-class SkillType(Enum):
-    SLASH = "Slash"
-    POWER_STRIKE = "Power Strike"
-    MAGIC_BOLT = "Magic Bolt"
-    HEAL = "Heal"
-    POISON_STRIKE = "Poison Strike"
+import argparse
+import journal
+import pacing
+import save_schema
+import storage
+from skills import SKILLS, SkillType, roll_damage, skill_error
 
 class Potion:
     def __init__(self, nama, harga, hp_restore):
@@ -52,7 +47,38 @@ class Character:
         self.weapon_inventory = []
         self.armor_inventory = []
         self.skills = [SkillType.SLASH]
+        # Field save Adventure_v2 yang tidak dipakai di sini, disimpan apa adanya
+        self.role = "Warrior"
+        self.bombs = {}
+        self.status_effects = []
         
+    def to_save_data(self):
+        """Dict pemain untuk save (skema sama dengan Adventure_v2, lihat save_schema)"""
+        return {
+            "nama": self.nama,
+            "role": self.role,
+            "level": self.level,
+            "exp": self.exp,
+            "exp_max": self.exp_max,
+            "hp": self.hp,
+            "hp_max": self.hp_max,
+            "mp": self.mp,
+            "mp_max": self.mp_max,
+            "attack": self.attack,
+            "defense": self.defense,
+            "magic": self.magic,
+            "agility": self.agility,
+            "gold": self.gold,
+            "skills": [s.name for s in self.skills],
+            "potions": dict(self.potions),
+            "bombs": dict(self.bombs),
+            "equipped_weapon": self.equipped_weapon.nama if self.equipped_weapon else None,
+            "equipped_armor": self.equipped_armor.nama if self.equipped_armor else None,
+            "weapon_inventory": [w.nama for w in self.weapon_inventory],
+            "armor_inventory": [a.nama for a in self.armor_inventory],
+            "status_effects": list(self.status_effects),
+        }
+    
     def take_damage(self, damage):
         reduced_damage = max(1, damage - self.defense // 2)
         self.hp -= reduced_damage
@@ -138,26 +164,39 @@ class Enemy:
         print(f"HP: {self.hp}/{self.hp_max} | Attack: {self.attack}")
 
 class Battle:
-    def __init__(self, player, enemy):
+    def __init__(self, player, enemy, pacer=None):
         self.player = player
         self.enemy = enemy
         self.turn = 0
+        self.pacer = pacer or pacing.get_pacing()
+    
+    MENU_SKILLS = {
+        "1": SkillType.SLASH,
+        "2": SkillType.POWER_STRIKE,
+        "3": SkillType.MAGIC_BOLT,
+        "4": SkillType.POISON_STRIKE,
+        "5": SkillType.HEAL,
+    }
     
     def calculate_damage(self, attacker, skill_type=SkillType.SLASH):
-        base_damage = attacker.attack
+        return roll_damage(attacker, skill_type)
+    
+    def use_skill(self, skill_type):
+        """Pakai skill dari tabel skill, kembalikan attack atau heal"""
+        spec = SKILLS[skill_type]
+        self.player.use_mp(spec.mp)
+        if spec.target == "self":
+            heal_amount = roll_damage(self.player, skill_type)
+            self.player.restore_hp(heal_amount)
+            print(f"\n{spec.teks}")
+            print(f"❤️  HP: +{heal_amount}")
+            return "heal"
         
-        if skill_type == SkillType.SLASH:
-            damage = base_damage + random.randint(-3, 5)
-        elif skill_type == SkillType.POWER_STRIKE:
-            damage = int(base_damage * 1.5) + random.randint(0, 10)
-        elif skill_type == SkillType.MAGIC_BOLT:
-            damage = attacker.magic + random.randint(5, 15)
-        elif skill_type == SkillType.POISON_STRIKE:
-            damage = base_damage + random.randint(5, 12)
-        else:
-            damage = base_damage + random.randint(-2, 3)
-        
-        return max(1, damage)
+        damage = self.calculate_damage(self.player, skill_type)
+        actual_damage = self.enemy.take_damage(damage)
+        print(f"\n{spec.teks}")
+        print(f"💥 Damage: {actual_damage}")
+        return "attack"
     
     def player_turn(self):
         print(f"\n--- GILIRAN {self.player.nama} (TURN {self.turn}) ---")
@@ -173,61 +212,13 @@ class Battle:
         while True:
             pilihan = input("\nPilih aksi (1-6): ").strip()
             
-            if pilihan == "1":
-                damage = self.calculate_damage(self.player, SkillType.SLASH)
-                actual_damage = self.enemy.take_damage(damage)
-                print(f"\n⚔️  Menyerang dengan Slash!")
-                print(f"💥 Damage: {actual_damage}")
-                return "attack"
-            
-            elif pilihan == "2":
-                if not self.player.use_mp(10):
-                    print("❌ MP tidak cukup!")
-                    continue
-                damage = self.calculate_damage(self.player, SkillType.POWER_STRIKE)
-                actual_damage = self.enemy.take_damage(damage)
-                print(f"\n⚡ Power Strike!")
-                print(f"💥 Damage: {actual_damage}")
-                return "attack"
-            
-            elif pilihan == "3":
-                if SkillType.MAGIC_BOLT not in self.player.skills:
-                    print("❌ Skill tidak dimiliki!")
-                    continue
-                if not self.player.use_mp(15):
-                    print("❌ MP tidak cukup!")
-                    continue
-                damage = self.calculate_damage(self.player, SkillType.MAGIC_BOLT)
-                actual_damage = self.enemy.take_damage(damage)
-                print(f"\n🔮 Magic Bolt!")
-                print(f"💥 Damage: {actual_damage}")
-                return "attack"
-            
-            elif pilihan == "4":
-                if SkillType.POISON_STRIKE not in self.player.skills:
-                    print("❌ Skill tidak dimiliki!")
-                    continue
-                if not self.player.use_mp(12):
-                    print("❌ MP tidak cukup!")
+            if pilihan in self.MENU_SKILLS:
+                skill_type = self.MENU_SKILLS[pilihan]
+                error = skill_error(self.player, skill_type)
+                if error:
+                    print(error)
                     continue
-                damage = self.calculate_damage(self.player, SkillType.POISON_STRIKE)
-                actual_damage = self.enemy.take_damage(damage)
-                print(f"\n☠️  Poison Strike!")
-                print(f"💥 Damage: {actual_damage}")
-                return "attack"
-            
-            elif pilihan == "5":
-                if SkillType.HEAL not in self.player.skills:
-                    print("❌ Skill tidak dimiliki!")
-                    continue
-                if not self.player.use_mp(20):
-                    print("❌ MP tidak cukup!")
-                    continue
-                heal_amount = self.player.magic + random.randint(10, 20)
-                self.player.restore_hp(heal_amount)
-                print(f"\n💚 Menyembuhkan diri!")
-                print(f"❤️  HP: +{heal_amount}")
-                return "heal"
+                return self.use_skill(skill_type)
             
             elif pilihan == "6":
                 self.player.show_status()
@@ -267,13 +258,13 @@ class Battle:
                 return self.battle_won()
             
             print()
-            time.sleep(1)
+            self.pacer.sleep(1)
             self.enemy_turn()
             
             if self.player.hp <= 0:
                 return self.battle_lost()
             
-            time.sleep(2)
+            self.pacer.sleep(2)
     
     def battle_won(self):
         print(f"\n{'='*60}")
@@ -295,39 +286,47 @@ class Battle:
         print(f"{'='*60}")
         return False
 
+# Revisi save yang terakhir dimuat/ditulis proses ini, untuk deteksi konflik (lihat storage)
+_save_revisions = {}
+
 def save_game(player, chapter, save_name="autosave"):
-    """Simpan game ke JSON file"""
+    """Simpan game lewat backend save aktif (storage), skema sama dengan Adventure_v2"""
     save_data = {
-        "nama": player.nama,
-        "level": player.level,
-        "exp": player.exp,
-        "exp_max": player.exp_max,
-        "hp": player.hp,
-        "hp_max": player.hp_max,
-        "mp": player.mp,
-        "mp_max": player.mp_max,
-        "attack": player.attack,
-        "defense": player.defense,
-        "magic": player.magic,
-        "agility": player.agility,
-        "gold": player.gold,
+        "schema_version": save_schema.CURRENT_VERSION,
         "chapter": chapter,
-        "skills": [s.name for s in player.skills],
-        "potions": player.potions,
+        "players": [player.to_save_data()],
     }
-    
-    os.makedirs("saves", exist_ok=True)
-    
-    with open(f"saves/{save_name}.json", "w") as f:
-        json.dump(save_data, f, indent=2)
+    store = storage.get_store()
+    expected = _save_revisions.get(save_name)
+    if expected is None:
+        # Nama yang belum pernah dimuat/ditulis di sini: timpa hanya kalau dikonfirmasi
+        expected = store.revision(save_name)
+        if store.exists(save_name) and input(f"⚠️  Save {save_name} sudah ada. Timpa? (y/n): ").strip().lower() != "y":
+            print("Save dibatalkan.")
+            return
+    while True:
+        try:
+            _save_revisions[save_name] = store.save(save_name, save_data, expected_revision=expected)
+            break
+        except storage.SaveConflict as e:
+            print(f"⚠️  Save {save_name} sudah diubah di tempat lain sejak kamu muat/simpan.")
+            if input("Timpa? (y/n): ").strip().lower() != "y":
+                print("Save dibatalkan.")
+                return
+            expected = e.actual
     
     print(f"✅ Game disimpan!")
 
 def load_game(save_name="autosave"):
     """Buka game dari JSON file"""
     try:
-        with open(f"saves/{save_name}.json", "r") as f:
-            save_data = json.load(f)
+        revision = storage.get_store().revision(save_name)
+        # Snapshot plus journal autosave Adventure_v2 kalau ada (lihat journal.py)
+        save_data = journal.recover(save_name)
+        
+        chapter = save_data["chapter"]
+        # Adventure.py hanya satu pemain: pakai pemain pertama di party
+        save_data = save_data["players"][0]
         
         player = Character(
             save_data["nama"],
@@ -347,8 +346,16 @@ def load_game(save_name="autosave"):
         player.gold = save_data["gold"]
         player.skills = [SkillType[s] for s in save_data["skills"]]
         player.potions = save_data["potions"]
-        
-        chapter = save_data["chapter"]
+        weapons = {w.nama: w for w in shop_weapons()}
+        armor_list = {a.nama: a for a in shop_armor()}
+        player.weapon_inventory = [weapons[n] for n in save_data["weapon_inventory"] if n in weapons]
+        player.armor_inventory = [armor_list[n] for n in save_data["armor_inventory"] if n in armor_list]
+        player.equipped_weapon = weapons.get(save_data["equipped_weapon"])
+        player.equipped_armor = armor_list.get(save_data["equipped_armor"])
+        player.role = save_data.get("role", "Warrior")
+        player.bombs = dict(save_data.get("bombs", {}))
+        player.status_effects = list(save_data.get("status_effects", []))
+        _save_revisions[save_name] = revision
         
         print(f"✅ Game dimuat!")
         print(f"👤 {player.nama} - Level {player.level} | 💰 Gold: {player.gold}")
@@ -364,24 +371,18 @@ def load_game(save_name="autosave"):
 
 def list_save_files():
     """Tampilkan daftar save file"""
-    if not os.path.exists("saves"):
-        return []
-    
-    save_files = [f[:-5] for f in os.listdir("saves") if f.endswith(".json")]
+    # Header dari backend save (manifest/kolom ringkasan), tanpa membuka setiap save
+    headers = [(save, header) for save, header in storage.get_store().headers() if header]
     
-    if not save_files:
+    if not headers:
         return []
     
     print("\n📂 DAFTAR SAVE FILE:")
-    for idx, save in enumerate(save_files, 1):
-        try:
-            with open(f"saves/{save}.json", "r") as f:
-                data = json.load(f)
-            print(f"[{idx}] {save} - {data['nama']} (Level {data['level']}, Chapter {data['chapter']})")
-        except:
-            pass
+    for idx, (save, header) in enumerate(headers, 1):
+        player_data = header["players"][0]
+        print(f"[{idx}] {save} - {player_data['nama']} (Level {player_data['level']}, Chapter {header['chapter']})")
     
-    return save_files
+    return [save for save, _ in headers]
 
 def choose_skill(player):
     """Memilih skill baru saat level up"""
@@ -418,6 +419,18 @@ def choose_skill(player):
         except ValueError:
             print("❌ Input harus angka!")
 
+def shop_weapons():
+    return [
+        Weapon("Iron Sword", 250, 8),
+        Weapon("Steel Sword", 500, 15),
+    ]
+
+def shop_armor():
+    return [
+        Armor("Iron Plate", 300, 6),
+        Armor("Steel Plate", 700, 12),
+    ]
+
 def visit_shop(player):
     """Menu shop"""
     potions = [
@@ -425,15 +438,8 @@ def visit_shop(player):
         Potion("Greater Health Potion", 100, 80),
     ]
     
-    weapons = [
-        Weapon("Iron Sword", 250, 8),
-        Weapon("Steel Sword", 500, 15),
-    ]
-    
-    armor_list = [
-        Armor("Iron Plate", 300, 6),
-        Armor("Steel Plate", 700, 12),
-    ]
+    weapons = shop_weapons()
+    armor_list = shop_armor()
     
     while True:
         print(f"\n🏪 SHOP - Gold: {player.gold}")
@@ -529,7 +535,7 @@ Sesuatu dalam hatimu bergerak. Kamu tidak bisa diam melihat ini.
     """)
     
     print("\n" + "="*70)
-    time.sleep(2)
+    pacing.sleep(2)
 
 def encounter_thugs(player):
     """Cutscene bertemu preman"""
@@ -622,7 +628,7 @@ def explore_world(player):
         if 0 <= idx < len(locations):
             location_name, possible_monsters = locations[idx]
             print(f"\n🗺️  Kamu memasuki {location_name}...")
-            time.sleep(1)
+            pacing.sleep(1)
             
             enemy_name = random.choice(possible_monsters)
             enemy = monsters[enemy_name]
@@ -633,7 +639,7 @@ def explore_world(player):
             )
             
             print(f"\n⚠️  {enemy_encounter.nama} muncul!")
-            time.sleep(1)
+            pacing.sleep(1)
             
             return enemy_encounter
     except ValueError:
@@ -761,4 +767,9 @@ def main_game_loop(player, chapter):
                     input("Tekan ENTER...")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shadow of Narcotics")
+    pacing.add_argument(parser)
+    args = parser.parse_args()
+    if args.pacing:
+        pacing.set_pacing(args.pacing)
     game_utama()
@@ -1,26 +1,74 @@
-import time
 import random
-import json
-import os
-from enum import Enum
-
-class SkillType(Enum):
-    SLASH = "Slash"
-    POWER_STRIKE = "Power Strike"
-    MAGIC_BOLT = "Magic Bolt"
-    HEAL = "Heal"
-    POISON_STRIKE = "Poison Strike"
-    ARROW_SHOT = "Arrow Shot"
-    MULTI_SHOT = "Multi Shot"
+import argparse
+import pacing
+import save_codec
+import storage
+import journal
+import save_schema
+import entity_codec
+from collections import namedtuple
+from types import MappingProxyType
+from skills import SKILLS, SkillType, roll_damage, skill_error
 
 class StatusEffect:
+    __slots__ = ("nama", "tipe", "nilai", "durasi")
+    
     def __init__(self, nama, tipe, nilai, durasi):
         self.nama = nama
         self.tipe = tipe
         self.nilai = nilai
         self.durasi = durasi
 
+class StatusEffects:
+    """Status effect aktif satu unit, dengan total rage/weaken yang selalu terbaru
+
+    StatusEffect di sini dipakai sebagai template dan tidak diubah. Sisa durasi
+    dihitung dari tick unit: effect masuk ke bucket tick saat ia habis, jadi
+    reduce() hanya membuang satu bucket dan lookup damage cukup baca total.
+    """
+    __slots__ = ("tick", "buckets", "totals", "count")
+    
+    def __init__(self):
+        self.tick = 0
+        self.buckets = {}
+        self.totals = {}
+        self.count = 0
+    
+    def add(self, effect, sisa=None):
+        """Tambah effect; sisa menggantikan durasinya, misal saat memuat save"""
+        expire = self.tick + max(1, effect.durasi if sisa is None else sisa)
+        self.buckets.setdefault(expire, []).append(effect)
+        key = (effect.nama, effect.tipe)
+        self.totals[key] = self.totals.get(key, 0) + effect.nilai
+        self.count += 1
+    
+    def reduce(self):
+        """Maju satu turn, buang effect yang habis"""
+        self.tick += 1
+        for effect in self.buckets.pop(self.tick, ()):
+            self.totals[(effect.nama, effect.tipe)] -= effect.nilai
+            self.count -= 1
+    
+    def total(self, nama, tipe):
+        return self.totals.get((nama, tipe), 0)
+    
+    def clear(self):
+        self.buckets.clear()
+        self.totals.clear()
+        self.count = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def __iter__(self):
+        """(effect, sisa turn) untuk tampilan, urut dari yang paling cepat habis"""
+        for expire in sorted(self.buckets):
+            for effect in self.buckets[expire]:
+                yield effect, expire - self.tick
+
 class Potion:
+    __slots__ = ("nama", "harga", "hp_restore", "effect")
+    
     def __init__(self, nama, harga, hp_restore=0, effect=None):
         self.nama = nama
         self.harga = harga
@@ -28,24 +76,37 @@ class Potion:
         self.effect = effect
 
 class Bomb:
+    __slots__ = ("nama", "harga", "damage")
+    
     def __init__(self, nama, harga, damage):
         self.nama = nama
         self.harga = harga
         self.damage = damage
 
 class Weapon:
+    __slots__ = ("nama", "harga", "attack_bonus")
+    
     def __init__(self, nama, harga, attack_bonus):
         self.nama = nama
         self.harga = harga
         self.attack_bonus = attack_bonus
 
 class Armor:
+    __slots__ = ("nama", "harga", "defense_bonus")
+    
     def __init__(self, nama, harga, defense_bonus):
         self.nama = nama
         self.harga = harga
         self.defense_bonus = defense_bonus
 
 class Character:
+    __slots__ = (
+        "nama", "role", "level", "exp", "exp_max",
+        "hp", "hp_max", "mp", "mp_max", "attack", "defense", "magic", "agility",
+        "gold", "potions", "bombs", "equipped_weapon", "equipped_armor",
+        "weapon_inventory", "armor_inventory", "bomb_inventory", "skills", "status_effects",
+    )
+    
     def __init__(self, nama, role="Warrior", hp=100, mp=50, attack=10, defense=5, magic=8, agility=7):
         self.nama = nama
         self.role = role
@@ -71,36 +132,26 @@ class Character:
         self.armor_inventory = []
         self.bomb_inventory = []
         self.skills = [SkillType.SLASH]
-        self.status_effects = []
+        self.status_effects = StatusEffects()
         
     def apply_status_effect(self, effect):
-        self.status_effects.append(effect)
+        self.status_effects.add(effect)
     
     def reduce_status_effects(self):
-        for effect in self.status_effects[:]:
-            effect.durasi -= 1
-            if effect.durasi <= 0:
-                self.status_effects.remove(effect)
+        self.status_effects.reduce()
     
     def get_damage_multiplier(self):
         """Hitung multiplier damage dari status effect"""
-        multiplier = 1.0
-        for effect in self.status_effects:
-            if effect.nama == "rage" and effect.tipe == "buff":
-                multiplier += effect.nilai / 100
-        return multiplier
+        return 1.0 + self.status_effects.total("rage", "buff") / 100
     
     def get_damage_reduction(self):
         """Hitung reduction damage dari status effect"""
-        reduction = 1.0
-        for effect in self.status_effects:
-            if effect.nama == "weaken" and effect.tipe == "debuff":
-                reduction -= effect.nilai / 100
-        return max(0.1, reduction)
+        return max(0.1, 1.0 - self.status_effects.total("weaken", "debuff") / 100)
     
     def take_damage(self, damage):
         reduced_damage = max(1, damage - self.defense // 2)
-        reduced_damage = int(reduced_damage * self.get_damage_reduction())
+        if self.status_effects:
+            reduced_damage = int(reduced_damage * self.get_damage_reduction())
         self.hp -= reduced_damage
         return reduced_damage
     
@@ -117,9 +168,12 @@ class Character:
         self.hp = min(self.hp_max, self.hp + amount)
     
     def gain_exp(self, amount):
+        """Tambah EXP, True kalau naik level"""
         self.exp += amount
         if self.exp >= self.exp_max:
             self.level_up()
+            return True
+        return False
     
     def level_up(self):
         self.level += 1
@@ -136,37 +190,57 @@ class Character:
         self.hp = self.hp_max
         self.mp = self.mp_max
         
-        print(f"\n✨ LEVEL UP! {self.nama} sekarang level {self.level}!")
-        
-    def show_status(self):
-        print(f"\n{'='*50}")
-        print(f"👤 {self.nama.upper()} ({self.role}) - Level {self.level}")
-        print(f"{'='*50}")
-        print(f"❤️  HP: {self.hp}/{self.hp_max}")
-        print(f"✨ MP: {self.mp}/{self.mp_max}")
-        print(f"⚔️  Attack: {self.attack}  🛡️  Defense: {self.defense}")
-        print(f"🔮 Magic: {self.magic}  ⚡ Agility: {self.agility}")
-        print(f"💰 Gold: {self.gold}")
+    def status_lines(self):
+        lines = []
+        lines.append(f"\n{'='*50}")
+        lines.append(f"👤 {self.nama.upper()} ({self.role}) - Level {self.level}")
+        lines.append(f"{'='*50}")
+        lines.append(f"❤️  HP: {self.hp}/{self.hp_max}")
+        lines.append(f"✨ MP: {self.mp}/{self.mp_max}")
+        lines.append(f"⚔️  Attack: {self.attack}  🛡️  Defense: {self.defense}")
+        lines.append(f"🔮 Magic: {self.magic}  ⚡ Agility: {self.agility}")
+        lines.append(f"💰 Gold: {self.gold}")
         if self.status_effects:
-            print(f"\n📊 Status Effects:")
-            for effect in self.status_effects:
-                print(f"  - {effect.nama} ({effect.durasi} turns)")
+            lines.append(f"\n📊 Status Effects:")
+            for effect, sisa in self.status_effects:
+                lines.append(f"  - {effect.nama} ({sisa} turns)")
         if self.equipped_weapon:
-            print(f"\n🗡️  Weapon: {self.equipped_weapon.nama} (+{self.equipped_weapon.attack_bonus} ATK)")
+            lines.append(f"\n🗡️  Weapon: {self.equipped_weapon.nama} (+{self.equipped_weapon.attack_bonus} ATK)")
         if self.equipped_armor:
-            print(f"🛡️  Armor: {self.equipped_armor.nama} (+{self.equipped_armor.defense_bonus} DEF)")
-        print(f"📚 Skills: {', '.join([s.value for s in self.skills])}")
+            lines.append(f"🛡️  Armor: {self.equipped_armor.nama} (+{self.equipped_armor.defense_bonus} DEF)")
+        lines.append(f"📚 Skills: {', '.join([s.value for s in self.skills])}")
         if self.potions:
-            print(f"\n🧪 Potions:")
+            lines.append(f"\n🧪 Potions:")
             for nama, jumlah in self.potions.items():
-                print(f"  - {nama}: {jumlah}x")
+                lines.append(f"  - {nama}: {jumlah}x")
         if self.bombs:
-            print(f"\n💣 Bombs:")
+            lines.append(f"\n💣 Bombs:")
             for nama, jumlah in self.bombs.items():
-                print(f"  - {nama}: {jumlah}x")
-        print(f"{'='*50}\n")
+                lines.append(f"  - {nama}: {jumlah}x")
+        lines.append(f"{'='*50}\n")
+        return lines
+    
+    def show_status(self):
+        for line in self.status_lines():
+            print(line)
+    
+    def to_save_data(self):
+        """Dict pemain untuk file save (lihat CHARACTER_CODEC)"""
+        return CHARACTER_CODEC.to_dict(self)
+    
+    @classmethod
+    def from_save_data(cls, data):
+        """Character dari dict file save (skema terbaru, lihat save_schema)"""
+        return CHARACTER_CODEC.from_dict(data)
+
+ENEMY_SKILLS = (SkillType.SLASH, SkillType.POWER_STRIKE)
 
 class Enemy:
+    __slots__ = (
+        "nama", "hp", "hp_max", "attack", "defense", "magic",
+        "gold_drop", "exp_drop", "level", "skills", "status_effects",
+    )
+    
     def __init__(self, nama, hp, attack, defense, magic, gold_drop, exp_drop, level=1):
         self.nama = nama
         self.hp = hp
@@ -177,40 +251,191 @@ class Enemy:
         self.gold_drop = gold_drop
         self.exp_drop = exp_drop
         self.level = level
-        self.skills = [SkillType.SLASH, SkillType.POWER_STRIKE]
-        self.status_effects = []
+        self.skills = ENEMY_SKILLS
+        self.status_effects = StatusEffects()
+    
+    @classmethod
+    def from_template(cls, template):
+        return cls(
+            template.nama, template.hp, template.attack, template.defense,
+            template.magic, template.gold_drop, template.exp_drop, template.level
+        )
+    
+    def reset(self, template):
+        """Isi ulang enemy dari template, untuk EnemyPool"""
+        self.nama = template.nama
+        self.hp = template.hp
+        self.hp_max = template.hp
+        self.attack = template.attack
+        self.defense = template.defense
+        self.magic = template.magic
+        self.gold_drop = template.gold_drop
+        self.exp_drop = template.exp_drop
+        self.level = template.level
+        self.status_effects.clear()
     
     def apply_status_effect(self, effect):
-        self.status_effects.append(effect)
+        self.status_effects.add(effect)
     
     def reduce_status_effects(self):
-        for effect in self.status_effects[:]:
-            effect.durasi -= 1
-            if effect.durasi <= 0:
-                self.status_effects.remove(effect)
+        self.status_effects.reduce()
     
     def get_damage_reduction(self):
-        reduction = 1.0
-        for effect in self.status_effects:
-            if effect.nama == "weaken":
-                reduction -= effect.nilai / 100
-        return max(0.1, reduction)
+        return max(0.1, 1.0 - self.status_effects.total("weaken", "debuff") / 100)
     
     def take_damage(self, damage):
         reduced_damage = max(1, damage - self.defense // 2)
-        reduced_damage = int(reduced_damage * self.get_damage_reduction())
+        if self.status_effects:
+            reduced_damage = int(reduced_damage * self.get_damage_reduction())
         self.hp -= reduced_damage
         return reduced_damage
     
-    def show_status(self):
+    def status_lines(self):
         status_str = f"👹 {self.nama} - Level {self.level}"
         if self.status_effects:
             status_str += " ["
-            for effect in self.status_effects:
-                status_str += f"{effect.nama}({effect.durasi}) "
+            for effect, sisa in self.status_effects:
+                status_str += f"{effect.nama}({sisa}) "
             status_str += "]"
-        print(status_str)
-        print(f"HP: {self.hp}/{self.hp_max} | Attack: {self.attack}")
+        return [status_str, f"HP: {self.hp}/{self.hp_max} | Attack: {self.attack}"]
+    
+    def show_status(self):
+        for line in self.status_lines():
+            print(line)
+
+STATUS_EFFECT_CODEC = entity_codec.compile_codec(StatusEffect, (
+    entity_codec.value("nama"), entity_codec.value("tipe"),
+    entity_codec.value("nilai"), entity_codec.value("durasi"),
+))
+
+def _encode_status_effects(effects):
+    if not effects:
+        return []
+    return [dict(STATUS_EFFECT_CODEC.to_dict(effect), sisa=sisa) for effect, sisa in effects]
+
+def _decode_status_effects(data):
+    effects = StatusEffects()
+    for item in data:
+        effects.add(STATUS_EFFECT_CODEC.from_dict(item), item["sisa"])
+    return effects
+
+def _catalog_item(nama):
+    # Item disimpan sebagai nama; objeknya diambil dari katalog shop
+    return SHOP_CATALOG.get(nama)
+
+# Skema save entity. Field dict mengikuti urutan di sini
+CHARACTER_CODEC = entity_codec.compile_codec(Character, (
+    *(entity_codec.value(field) for field in (
+        "nama", "role", "level", "exp", "exp_max", "hp", "hp_max", "mp", "mp_max",
+        "attack", "defense", "magic", "agility", "gold",
+    )),
+    entity_codec.enum_list("skills", SkillType),
+    entity_codec.dict_field("potions"),
+    entity_codec.dict_field("bombs"),
+    entity_codec.ref("equipped_weapon", _catalog_item),
+    entity_codec.ref("equipped_armor", _catalog_item),
+    entity_codec.ref_list("weapon_inventory", _catalog_item),
+    entity_codec.ref_list("armor_inventory", _catalog_item),
+    entity_codec.custom("status_effects", _encode_status_effects, _decode_status_effects, default=list),
+    entity_codec.transient("bomb_inventory", list),
+))
+
+ENEMY_CODEC = entity_codec.compile_codec(Enemy, (
+    *(entity_codec.value(field) for field in (
+        "nama", "hp", "hp_max", "attack", "defense", "magic", "gold_drop", "exp_drop", "level",
+    )),
+    entity_codec.enum_list("skills", SkillType),
+    entity_codec.custom("status_effects", _encode_status_effects, _decode_status_effects, default=list),
+))
+
+WEAPON_CODEC = entity_codec.compile_codec(Weapon, (
+    entity_codec.value("nama"), entity_codec.value("harga"), entity_codec.value("attack_bonus"),
+))
+ARMOR_CODEC = entity_codec.compile_codec(Armor, (
+    entity_codec.value("nama"), entity_codec.value("harga"), entity_codec.value("defense_bonus"),
+))
+POTION_CODEC = entity_codec.compile_codec(Potion, (
+    entity_codec.value("nama"), entity_codec.value("harga"), entity_codec.value("hp_restore"),
+    entity_codec.nested("effect", STATUS_EFFECT_CODEC),
+))
+BOMB_CODEC = entity_codec.compile_codec(Bomb, (
+    entity_codec.value("nama"), entity_codec.value("harga"), entity_codec.value("damage"),
+))
+
+EnemyTemplate = namedtuple(
+    "EnemyTemplate", ["nama", "hp", "attack", "defense", "magic", "gold_drop", "exp_drop", "level"]
+)
+
+# Registry musuh, dibangun sekali saat import dan tidak diubah lagi
+ENEMY_TEMPLATES = MappingProxyType({
+    template.nama: template for template in (
+        EnemyTemplate("Kepala Preman SCAR", 60, 12, 6, 3, 150, 80, 2),
+        EnemyTemplate("Pengawal Kereta 1", 80, 14, 7, 2, 200, 100, 3),
+        EnemyTemplate("Pengawal Kereta 2", 75, 13, 6, 3, 200, 100, 3),
+        EnemyTemplate("Kapten Pengawal", 100, 16, 8, 4, 300, 150, 4),
+        EnemyTemplate("Slime Hijau", 25, 5, 2, 2, 30, 25, 1),
+        EnemyTemplate("Goblin Kecil", 40, 8, 3, 1, 60, 50, 2),
+        EnemyTemplate("Orc Prajurit", 70, 14, 6, 3, 150, 120, 3),
+    )
+})
+
+ENCOUNTERS = MappingProxyType({
+    "thug": ("Kepala Preman SCAR",),
+    "merchant_caravan": ("Pengawal Kereta 1", "Pengawal Kereta 2", "Kapten Pengawal"),
+})
+
+EXPLORE_LOCATIONS = (
+    ("Hutan Gelap", ("Slime Hijau", "Goblin Kecil")),
+    ("Gua Orc", ("Goblin Kecil", "Orc Prajurit")),
+)
+
+class EnemyPool:
+    """Daur ulang objek Enemy setelah battle selesai"""
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.free = []
+    
+    def acquire(self, template):
+        """Enemy segar dari template, pakai ulang objek lama kalau ada"""
+        if self.free:
+            enemy = self.free.pop()
+            enemy.reset(template)
+            return enemy
+        return Enemy.from_template(template)
+    
+    def release(self, enemies):
+        """Kembalikan enemy ke pool. Jangan dipakai lagi setelah ini"""
+        for enemy in enemies:
+            if len(self.free) >= self.max_size:
+                break
+            self.free.append(enemy)
+
+ENEMY_POOL = EnemyPool()
+
+def spawn_encounter(nama):
+    """Daftar musuh untuk encounter bernama di ENCOUNTERS"""
+    return [ENEMY_POOL.acquire(ENEMY_TEMPLATES[enemy_name]) for enemy_name in ENCOUNTERS[nama]]
+
+def is_debuff_potion(nama):
+    """True kalau potion memberi debuff ke musuh, jadi butuh target"""
+    potion = SHOP_CATALOG.get(nama)
+    return bool(potion and potion.effect and potion.effect.tipe == "debuff")
+
+def _event(tipe, teks, **data):
+    """Buat satu event battle"""
+    data["tipe"] = tipe
+    data["teks"] = teks
+    return data
+
+class BattleAction:
+    """Aksi pemain untuk Battle.step: skill, potion, atau bomb"""
+    __slots__ = ("tipe", "skill", "target", "item")
+    
+    def __init__(self, tipe, skill=None, target=None, item=None):
+        self.tipe = tipe
+        self.skill = skill
+        self.target = target
+        self.item = item
 
 class Battle:
     def __init__(self, players, enemies):
@@ -218,597 +443,469 @@ class Battle:
         self.enemies = enemies if isinstance(enemies, list) else [enemies]
         self.turn = 0
         self.current_player_idx = 0
-    
+        self.hasil = None
+
     def calculate_damage(self, attacker, skill_type=SkillType.SLASH):
-        base_damage = attacker.attack
         multiplier = attacker.get_damage_multiplier() if hasattr(attacker, 'get_damage_multiplier') else 1.0
-        
-        if skill_type == SkillType.SLASH:
-            damage = int((base_damage + random.randint(-3, 5)) * multiplier)
-        elif skill_type == SkillType.POWER_STRIKE:
-            damage = int((int(base_damage * 1.5) + random.randint(0, 10)) * multiplier)
-        elif skill_type == SkillType.MAGIC_BOLT:
-            damage = int((attacker.magic + random.randint(5, 15)) * multiplier)
-        elif skill_type == SkillType.POISON_STRIKE:
-            damage = int((base_damage + random.randint(5, 12)) * multiplier)
-        elif skill_type == SkillType.ARROW_SHOT:
-            damage = int((base_damage + random.randint(3, 8)) * multiplier)
-        elif skill_type == SkillType.MULTI_SHOT:
-            damage = int((int(base_damage * 1.3) + random.randint(2, 6)) * multiplier)
-        else:
-            damage = int((base_damage + random.randint(-2, 3)) * multiplier)
-        
-        return max(1, damage)
-    
-    def player_turn(self):
-        player = self.players[self.current_player_idx]
-        
-        print(f"\n{'─'*60}")
-        print(f"GILIRAN {player.nama} ({player.role})")
-        print(f"{'─'*60}")
-        print(f"❤️  HP: {player.hp}/{player.hp_max} | ✨ MP: {player.mp}/{player.mp_max}")
-        
-        if self.enemies:
-            print(f"\n👹 Musuh:")
-            for idx, enemy in enumerate(self.enemies):
-                if enemy.hp > 0:
-                    enemy.show_status()
-        
-        while True:
-            print(f"\n{player.nama}, pilih aksi:")
-            print("[1] Slash")
-            print("[2] Power Strike (MP: 10)")
-            print("[3] Magic Bolt (MP: 15)")
-            print("[4] Poison Strike (MP: 12)")
-            print("[5] Heal (MP: 20)")
-            
-            if player.role == "Archer":
-                print("[6] Arrow Shot")
-                print("[7] Multi Shot (MP: 15)")
-            
-            if player.potions:
-                print("[8] Gunakan Potion")
-            if player.bombs:
-                print("[9] Gunakan Bomb")
-            
-            print("[0] Status")
-            
-            pilihan = input("\nPilihan: ").strip()
-            
-            if pilihan == "1":
-                if not self.enemies:
-                    print("❌ Tidak ada musuh!")
-                    continue
-                target_idx = 0 if len(self.enemies) == 1 else self.select_target()
-                if target_idx is None:
-                    continue
-                damage = self.calculate_damage(player, SkillType.SLASH)
-                actual_damage = self.enemies[target_idx].take_damage(damage)
-                print(f"⚔️  Menyerang dengan Slash!")
-                print(f"💥 Damage: {actual_damage}")
-                return "attack"
-            
-            elif pilihan == "2":
-                if not self.enemies:
-                    print("❌ Tidak ada musuh!")
-                    continue
-                if not player.use_mp(10):
-                    print("❌ MP tidak cukup!")
-                    continue
-                target_idx = 0 if len(self.enemies) == 1 else self.select_target()
-                if target_idx is None:
-                    player.mp += 10
-                    continue
-                damage = self.calculate_damage(player, SkillType.POWER_STRIKE)
-                actual_damage = self.enemies[target_idx].take_damage(damage)
-                print(f"⚡ Power Strike!")
-                print(f"💥 Damage: {actual_damage}")
-                return "attack"
-            
-            elif pilihan == "3":
-                if SkillType.MAGIC_BOLT not in player.skills:
-                    print("❌ Skill tidak dimiliki!")
-                    continue
-                if not self.enemies:
-                    print("❌ Tidak ada musuh!")
-                    continue
-                if not player.use_mp(15):
-                    print("❌ MP tidak cukup!")
-                    continue
-                target_idx = 0 if len(self.enemies) == 1 else self.select_target()
-                if target_idx is None:
-                    player.mp += 15
-                    continue
-                damage = self.calculate_damage(player, SkillType.MAGIC_BOLT)
-                actual_damage = self.enemies[target_idx].take_damage(damage)
-                print(f"🔮 Magic Bolt!")
-                print(f"💥 Damage: {actual_damage}")
-                return "attack"
-            
-            elif pilihan == "4":
-                if SkillType.POISON_STRIKE not in player.skills:
-                    print("❌ Skill tidak dimiliki!")
-                    continue
-                if not self.enemies:
-                    print("❌ Tidak ada musuh!")
-                    continue
-                if not player.use_mp(12):
-                    print("❌ MP tidak cukup!")
-                    continue
-                target_idx = 0 if len(self.enemies) == 1 else self.select_target()
-                if target_idx is None:
-                    player.mp += 12
-                    continue
-                damage = self.calculate_damage(player, SkillType.POISON_STRIKE)
-                actual_damage = self.enemies[target_idx].take_damage(damage)
-                print(f"☠️  Poison Strike!")
-                print(f"💥 Damage: {actual_damage}")
-                return "attack"
-            
-            elif pilihan == "5":
-                if SkillType.HEAL not in player.skills:
-                    print("❌ Skill tidak dimiliki!")
-                    continue
-                if not player.use_mp(20):
-                    print("❌ MP tidak cukup!")
-                    continue
-                heal_amount = player.magic + random.randint(10, 20)
-                player.restore_hp(heal_amount)
-                print(f"💚 Menyembuhkan diri!")
-                print(f"❤️  HP: +{heal_amount}")
-                return "heal"
-            
-            elif pilihan == "6" and player.role == "Archer":
-                if SkillType.ARROW_SHOT not in player.skills:
-                    print("❌ Skill tidak dimiliki!")
-                    continue
-                if not self.enemies:
-                    print("❌ Tidak ada musuh!")
-                    continue
-                target_idx = 0 if len(self.enemies) == 1 else self.select_target()
-                if target_idx is None:
-                    continue
-                damage = self.calculate_damage(player, SkillType.ARROW_SHOT)
-                actual_damage = self.enemies[target_idx].take_damage(damage)
-                print(f"🏹 Arrow Shot!")
-                print(f"💥 Damage: {actual_damage}")
-                return "attack"
-            
-            elif pilihan == "7" and player.role == "Archer":
-                if SkillType.MULTI_SHOT not in player.skills:
-                    print("❌ Skill tidak dimiliki!")
-                    continue
-                if not player.use_mp(15):
-                    print("❌ MP tidak cukup!")
-                    continue
-                total_damage = 0
-                print(f"🏹 Multi Shot! Serangan ke semua musuh!")
-                for enemy in self.enemies:
-                    if enemy.hp > 0:
-                        damage = self.calculate_damage(player, SkillType.MULTI_SHOT)
-                        actual_damage = enemy.take_damage(damage)
-                        total_damage += actual_damage
-                        print(f"  {enemy.nama}: {actual_damage} damage")
-                return "attack"
-            
-            elif pilihan == "8" and player.potions:
-                self.use_potion(player)
-                return "item"
-            
-            elif pilihan == "9" and player.bombs:
-                self.use_bomb(player)
-                return "item"
-            
-            elif pilihan == "0":
-                player.show_status()
-                continue
-            
-            else:
-                print("❌ Input tidak valid!")
-    
-    def select_target(self):
-        """Pilih target musuh"""
-        if not self.enemies:
-            return None
-        
-        if len(self.enemies) == 1:
-            return 0
-        
-        print("\n🎯 Pilih target:")
+        return roll_damage(attacker, skill_type, multiplier)
+
+    # ---- Engine: tanpa input() dan print() ----
+
+    def current_player(self):
+        """Pemain yang sedang mendapat giliran"""
+        if self.turn == 0:
+            self.turn = 1
+            self.current_player_idx = self._next_alive_player(0)
+        return self.players[self.current_player_idx]
+
+    def _next_alive_player(self, start):
+        for idx in range(start, len(self.players)):
+            if self.players[idx].hp > 0:
+                return idx
+        return None
+
+    def _resolve_target(self, target):
+        """Index target musuh, atau None kalau tidak valid"""
+        if target is None:
+            return self._next_alive_enemy()
+        if 0 <= target < len(self.enemies) and self.enemies[target].hp > 0:
+            return target
+        return None
+
+    def _next_alive_enemy(self):
         for idx, enemy in enumerate(self.enemies):
             if enemy.hp > 0:
-                print(f"[{idx+1}] {enemy.nama} (HP: {enemy.hp}/{enemy.hp_max})")
-        
-        while True:
-            try:
-                choice = int(input("Pilih (0 batal): ")) - 1
-                if choice == -1:
-                    return None
-                if 0 <= choice < len(self.enemies):
-                    return choice
-            except:
-                pass
-            print("❌ Input tidak valid!")
-    
-    def use_potion(self, player):
-        """Menu gunakan potion"""
-        print("\n🧪 Pilih Potion:")
-        for idx, (nama, jumlah) in enumerate(player.potions.items(), 1):
-            print(f"[{idx}] {nama} (x{jumlah})")
-        
-        try:
-            choice = int(input("Pilih (0 batal): ")) - 1
-            if choice == -1:
-                return
-            potion_names = list(player.potions.keys())
-            if 0 <= choice < len(potion_names):
-                nama = potion_names[choice]
-                
-                if "Health" in nama:
-                    hp_restore = 30 if nama == "Health Potion" else 80
-                    player.restore_hp(hp_restore)
-                    print(f"✅ Gunakan {nama}! ❤️  +{hp_restore} HP")
-                elif "Rage" in nama:
-                    effect = StatusEffect("rage", "buff", 20, 3)
-                    player.apply_status_effect(effect)
-                    print(f"✅ Gunakan {nama}! ⚡ +20% Damage untuk 3 turn!")
-                elif "Weaken" in nama:
-                    if self.enemies:
-                        target_idx = 0 if len(self.enemies) == 1 else self.select_target()
-                        if target_idx is not None:
-                            effect = StatusEffect("weaken", "debuff", 15, 3)
-                            self.enemies[target_idx].apply_status_effect(effect)
-                            print(f"✅ Gunakan {nama} ke {self.enemies[target_idx].nama}! -15% Damage musuh selama 3 turn!")
-                
-                player.potions[nama] -= 1
-                if player.potions[nama] == 0:
-                    del player.potions[nama]
-        except:
-            pass
-    
-    def use_bomb(self, player):
-        """Menu gunakan bomb"""
-        print("\n💣 Pilih Bomb:")
-        for idx, (nama, jumlah) in enumerate(player.bombs.items(), 1):
-            print(f"[{idx}] {nama} (x{jumlah})")
-        
-        try:
-            choice = int(input("Pilih (0 batal): ")) - 1
-            if choice == -1:
-                return
-            bomb_names = list(player.bombs.keys())
-            if 0 <= choice < len(bomb_names):
-                nama = bomb_names[choice]
-                total_damage = 0
-                print(f"💣 Ledakan {nama}! AOE Damage ke semua musuh!")
-                for enemy in self.enemies:
-                    if enemy.hp > 0:
-                        damage = random.randint(30, 50)
-                        actual_damage = enemy.take_damage(damage)
-                        total_damage += actual_damage
-                        print(f"  {enemy.nama}: {actual_damage} damage")
-                
-                player.bombs[nama] -= 1
-                if player.bombs[nama] == 0:
-                    del player.bombs[nama]
-                print(f"💥 Total damage: {total_damage}")
-        except:
-            pass
-    
+                return idx
+        return None
+
+    def validate_skill(self, player, skill):
+        """Pesan error kalau skill tidak bisa dipakai, None kalau boleh"""
+        if SKILLS[skill].target == "single" and not self.enemies:
+            return "❌ Tidak ada musuh!"
+        return skill_error(player, skill)
+
+    def player_action(self, action):
+        """Jalankan aksi pemain saat ini. Event 'invalid' berarti giliran belum dipakai"""
+        if self.hasil is not None:
+            return [_event("invalid", "❌ Pertempuran sudah selesai!")]
+
+        player = self.current_player()
+
+        if action.tipe == "skill":
+            events = self._use_skill(player, action.skill, action.target)
+        elif action.tipe == "potion":
+            events = self._use_potion(player, action.item, action.target)
+        elif action.tipe == "bomb":
+            events = self._use_bomb(player, action.item)
+        else:
+            events = [_event("invalid", "❌ Input tidak valid!")]
+
+        if events[0]["tipe"] != "invalid" and all(enemy.hp <= 0 for enemy in self.enemies):
+            events += self.battle_won()
+        return events
+
+    def enemy_phase(self):
+        """Giliran musuh setelah aksi pemain, lalu pindah ke pemain berikutnya"""
+        events = self.enemy_turn()
+
+        if any(player.hp <= 0 for player in self.players):
+            events += self.battle_lost()
+            return events
+
+        next_idx = self._next_alive_player(self.current_player_idx + 1)
+        if next_idx is None:
+            self.turn += 1
+            next_idx = self._next_alive_player(0)
+        self.current_player_idx = next_idx
+        return events
+
+    def step(self, action):
+        """Satu langkah battle: aksi pemain lalu giliran musuh. Kembalikan daftar event"""
+        events = self.player_action(action)
+        if events[0]["tipe"] != "invalid" and self.hasil is None:
+            events += self.enemy_phase()
+        return events
+
+    def _use_skill(self, player, skill, target):
+        error = self.validate_skill(player, skill)
+        if error:
+            return [_event("invalid", error)]
+        spec = SKILLS[skill]
+        return self.SKILL_HANDLERS[spec.target](self, player, skill, spec, target)
+
+    def _skill_self(self, player, skill, spec, target):
+        player.use_mp(spec.mp)
+        heal_amount = roll_damage(player, skill)
+        player.restore_hp(heal_amount)
+        return [
+            _event("heal", spec.teks, player=player.nama),
+            _event("heal", f"❤️  HP: +{heal_amount}", player=player.nama, jumlah=heal_amount),
+        ]
+
+    def _skill_all(self, player, skill, spec, target):
+        player.use_mp(spec.mp)
+        events = [_event("attack", spec.teks, player=player.nama)]
+        for enemy in self.enemies:
+            if enemy.hp > 0:
+                damage = self.calculate_damage(player, skill)
+                actual_damage = enemy.take_damage(damage)
+                events.append(_event("damage", f"  {enemy.nama}: {actual_damage} damage",
+                                     target=enemy.nama, damage=actual_damage))
+        return events
+
+    def _skill_single(self, player, skill, spec, target):
+        target_idx = self._resolve_target(target)
+        if target_idx is None:
+            return [_event("invalid", "❌ Input tidak valid!")]
+
+        player.use_mp(spec.mp)
+        enemy = self.enemies[target_idx]
+        damage = self.calculate_damage(player, skill)
+        actual_damage = enemy.take_damage(damage)
+        return [
+            _event("attack", spec.teks, player=player.nama, skill=skill.name),
+            _event("damage", f"💥 Damage: {actual_damage}", target=enemy.nama, damage=actual_damage),
+        ]
+
+    # Mode target di tabel skill -> handler
+    SKILL_HANDLERS = {
+        "self": _skill_self,
+        "all": _skill_all,
+        "single": _skill_single,
+    }
+
+    def _use_potion(self, player, nama, target):
+        if player.potions.get(nama, 0) <= 0:
+            return [_event("invalid", "❌ Input tidak valid!")]
+
+        potion = SHOP_CATALOG.get(nama)
+        effect = potion.effect if potion else None
+        if potion and potion.hp_restore:
+            player.restore_hp(potion.hp_restore)
+            events = [_event("item", f"✅ Gunakan {nama}! ❤️  +{potion.hp_restore} HP", item=nama)]
+        elif effect and effect.tipe == "buff":
+            player.apply_status_effect(effect)
+            events = [_event("item", f"✅ Gunakan {nama}! ⚡ +{effect.nilai}% Damage untuk {effect.durasi} turn!", item=nama)]
+        elif effect:
+            target_idx = self._resolve_target(target)
+            if target_idx is None:
+                return [_event("invalid", "❌ Input tidak valid!")]
+            target_enemy = self.enemies[target_idx]
+            target_enemy.apply_status_effect(effect)
+            events = [_event("item", f"✅ Gunakan {nama} ke {target_enemy.nama}! -{effect.nilai}% Damage musuh selama {effect.durasi} turn!",
+                             item=nama, target=target_enemy.nama)]
+        else:
+            events = [_event("item", f"✅ Gunakan {nama}!", item=nama)]
+
+        player.potions[nama] -= 1
+        if player.potions[nama] == 0:
+            del player.potions[nama]
+        return events
+
+    def _use_bomb(self, player, nama):
+        if player.bombs.get(nama, 0) <= 0:
+            return [_event("invalid", "❌ Input tidak valid!")]
+
+        total_damage = 0
+        events = [_event("item", f"💣 Ledakan {nama}! AOE Damage ke semua musuh!", item=nama)]
+        for enemy in self.enemies:
+            if enemy.hp > 0:
+                damage = random.randint(30, 50)
+                actual_damage = enemy.take_damage(damage)
+                total_damage += actual_damage
+                events.append(_event("damage", f"  {enemy.nama}: {actual_damage} damage",
+                                     target=enemy.nama, damage=actual_damage))
+
+        player.bombs[nama] -= 1
+        if player.bombs[nama] == 0:
+            del player.bombs[nama]
+        events.append(_event("item", f"💥 Total damage: {total_damage}", damage=total_damage))
+        return events
+
     def enemy_turn(self):
         """Giliran musuh"""
+        events = []
         for enemy in self.enemies:
             if enemy.hp <= 0:
                 continue
-            
+
             target = random.choice(self.players)
             action = random.choice(["attack", "attack", "power_strike"])
-            
+
             if action == "power_strike" and random.random() > 0.4:
                 damage = self.calculate_damage(enemy, SkillType.POWER_STRIKE)
                 actual_damage = target.take_damage(damage)
-                print(f"\n👹 {enemy.nama} menggunakan Power Strike ke {target.nama}!")
-                print(f"💥 Damage: {actual_damage}")
+                events.append(_event("enemy_attack", f"\n👹 {enemy.nama} menggunakan Power Strike ke {target.nama}!",
+                                     enemy=enemy.nama, target=target.nama))
             else:
                 damage = self.calculate_damage(enemy, SkillType.SLASH)
                 actual_damage = target.take_damage(damage)
-                print(f"\n👹 {enemy.nama} menyerang {target.nama}!")
-                print(f"💥 Damage: {actual_damage}")
-            
+                events.append(_event("enemy_attack", f"\n👹 {enemy.nama} menyerang {target.nama}!",
+                                     enemy=enemy.nama, target=target.nama))
+            events.append(_event("damage", f"💥 Damage: {actual_damage}", target=target.nama, damage=actual_damage))
+
             enemy.reduce_status_effects()
-        
+
         for player in self.players:
             player.reduce_status_effects()
-    
-    def start_battle(self, story_text=""):
-        """Mulai battle"""
-        print(f"\n{'='*60}")
-        print("⚔️  PERTEMPURAN DIMULAI! ⚔️")
-        print(f"{'='*60}")
-        if story_text:
-            print(story_text)
-        
-        while True:
-            self.turn += 1
-            
-            for idx, player in enumerate(self.players):
-                self.current_player_idx = idx
-                if player.hp <= 0:
-                    continue
-                
-                action = self.player_turn()
-                
-                if all(enemy.hp <= 0 for enemy in self.enemies):
-                    return self.battle_won()
-                
-                print()
-                time.sleep(1)
-                self.enemy_turn()
-                
-                if any(player.hp <= 0 for player in self.players):
-                    return self.battle_lost()
-                
-                time.sleep(2)
+        return events
 
     def battle_won(self):
         """Menang"""
-        print(f"\n{'='*60}")
-        print("🎉 KEMENANGAN! 🎉")
-        print(f"{'='*60}")
-        
+        self.hasil = True
+        events = [
+            _event("info", f"\n{'='*60}"),
+            _event("won", "🎉 KEMENANGAN! 🎉"),
+            _event("info", f"{'='*60}"),
+        ]
+
         total_exp = 0
         total_gold = 0
-        
+
         for enemy in self.enemies:
             total_exp += enemy.exp_drop
             total_gold += enemy.gold_drop
-        
+
         for player in self.players:
-            player.gain_exp(total_exp // len(self.players))
+            if player.gain_exp(total_exp // len(self.players)):
+                events.append(_event("level_up", f"\n✨ LEVEL UP! {player.nama} sekarang level {player.level}!",
+                                     player=player.nama, level=player.level))
             player.gold += total_gold // len(self.players)
-        
-        print(f"✨ EXP: +{total_exp // len(self.players)} per karakter")
-        print(f"💰 Gold: +{total_gold // len(self.players)} per karakter")
-        return True
-    
+
+        events.append(_event("reward", f"✨ EXP: +{total_exp // len(self.players)} per karakter", exp=total_exp // len(self.players)))
+        events.append(_event("reward", f"💰 Gold: +{total_gold // len(self.players)} per karakter", gold=total_gold // len(self.players)))
+        return events
+
+    def release_enemies(self):
+        """Kembalikan musuh ke ENEMY_POOL setelah battle selesai dan hasilnya dipakai"""
+        ENEMY_POOL.release(self.enemies)
+        self.enemies = []
+
+    def to_save_data(self, party):
+        """Dict battle yang sedang berjalan. Pemain ditulis sebagai index di party"""
+        return {
+            "players": [next(i for i, p in enumerate(party) if p is player) for player in self.players],
+            "enemies": [ENEMY_CODEC.to_dict(enemy) for enemy in self.enemies],
+            "turn": self.turn,
+            "current_player_idx": self.current_player_idx,
+            "hasil": self.hasil,
+        }
+
+    @classmethod
+    def from_save_data(cls, data, party):
+        """Battle dari to_save_data, memakai objek pemain dari party yang sama"""
+        battle = cls([party[idx] for idx in data["players"]],
+                     [ENEMY_CODEC.from_dict(enemy) for enemy in data["enemies"]])
+        battle.turn = data["turn"]
+        battle.current_player_idx = data["current_player_idx"]
+        battle.hasil = data["hasil"]
+        return battle
+
     def battle_lost(self):
         """Kalah"""
-        print(f"\n{'='*60}")
-        print("💀 KALAH DALAM PERTEMPURAN 💀")
-        print(f"{'='*60}")
-        return False
+        self.hasil = False
+        return [
+            _event("info", f"\n{'='*60}"),
+            _event("lost", "💀 KALAH DALAM PERTEMPURAN 💀"),
+            _event("info", f"{'='*60}"),
+        ]
+
+    # ---- Frontend console ----
+
+    def menu_lines(self, player):
+        """Baris menu aksi untuk pemain"""
+        lines = [f"\n{player.nama}, pilih aksi:"]
+        for pilihan, skill in self.MENU_SKILLS.items():
+            spec = SKILLS[skill]
+            if spec.archer_only and player.role != "Archer":
+                continue
+            lines.append(f"[{pilihan}] {skill.value}" + (f" (MP: {spec.mp})" if spec.mp else ""))
+        if player.potions:
+            lines.append("[8] Gunakan Potion")
+        if player.bombs:
+            lines.append("[9] Gunakan Bomb")
+        lines.append("[0] Status")
+        return lines
+
+    MENU_SKILLS = {
+        "1": SkillType.SLASH,
+        "2": SkillType.POWER_STRIKE,
+        "3": SkillType.MAGIC_BOLT,
+        "4": SkillType.POISON_STRIKE,
+        "5": SkillType.HEAL,
+        "6": SkillType.ARROW_SHOT,
+        "7": SkillType.MULTI_SHOT,
+    }
+
+    def turn_header_lines(self):
+        """Baris pembuka giliran pemain saat ini"""
+        player = self.current_player()
+        lines = [
+            f"\n{'─'*60}",
+            f"GILIRAN {player.nama} ({player.role})",
+            f"{'─'*60}",
+            f"❤️  HP: {player.hp}/{player.hp_max} | ✨ MP: {player.mp}/{player.mp_max}",
+        ]
+        if self.enemies:
+            lines.append(f"\n👹 Musuh:")
+            for enemy in self.enemies:
+                if enemy.hp > 0:
+                    lines.extend(enemy.status_lines())
+        return lines
 
-def save_game(players, chapter, save_name="autosave"):
-    """Simpan game"""
+    def target_lines(self):
+        """Baris menu pilih target"""
+        lines = ["\n🎯 Pilih target:"]
+        for idx, enemy in enumerate(self.enemies):
+            if enemy.hp > 0:
+                lines.append(f"[{idx+1}] {enemy.nama} (HP: {enemy.hp}/{enemy.hp_max})")
+        return lines
+
+    def needs_target(self, skill=None, item=None):
+        """True kalau aksi butuh pilih target dari beberapa musuh"""
+        if len(self.enemies) <= 1:
+            return False
+        if skill is not None:
+            return SKILLS[skill].target == "single"
+        return item is not None and is_debuff_potion(item)
+
+def save_game(players, chapter, save_name="autosave", verbose=True, format_name=None, expected_revision=None):
+    """Simpan game ke backend aktif (lihat storage). format_name: json atau binary
+
+    Kembalikan revisi baru. Dengan expected_revision, storage.SaveConflict
+    kalau save sudah ditulis proses lain sejak revisi itu.
+    """
     save_data = {
+        "schema_version": save_schema.CURRENT_VERSION,
         "chapter": chapter,
-        "players": []
+        "players": [player.to_save_data() for player in players]
     }
     
-    for player in players:
-        player_data = {
-            "nama": player.nama,
-            "role": player.role,
-            "level": player.level,
-            "exp": player.exp,
-            "exp_max": player.exp_max,
-            "hp": player.hp,
-            "hp_max": player.hp_max,
-            "mp": player.mp,
-            "mp_max": player.mp_max,
-            "attack": player.attack,
-            "defense": player.defense,
-            "magic": player.magic,
-            "agility": player.agility,
-            "gold": player.gold,
-            "skills": [s.name for s in player.skills],
-            "potions": player.potions,
-            "bombs": player.bombs,
-        }
-        save_data["players"].append(player_data)
-    
-    os.makedirs("saves", exist_ok=True)
-    
-    with open(f"saves/{save_name}.json", "w") as f:
-        json.dump(save_data, f, indent=2)
+    revision = storage.get_store().save(save_name, save_data, format_name, expected_revision)
     
-    print(f"✅ Game disimpan!")
+    if verbose:
+        print(f"✅ Game disimpan!")
+    return revision
 
-def load_game(save_name="autosave"):
+def load_game(save_name="autosave", verbose=True):
     """Load game"""
     try:
-        with open(f"saves/{save_name}.json", "r") as f:
-            save_data = json.load(f)
-        
-        players = []
-        for player_data in save_data["players"]:
-            player = Character(
-                player_data["nama"],
-                role=player_data["role"],
-                hp=player_data["hp_max"],
-                mp=player_data["mp_max"],
-                attack=player_data["attack"],
-                defense=player_data["defense"],
-                magic=player_data["magic"],
-                agility=player_data["agility"]
-            )
-            
-            player.level = player_data["level"]
-            player.exp = player_data["exp"]
-            player.exp_max = player_data["exp_max"]
-            player.hp = player_data["hp"]
-            player.mp = player_data["mp"]
-            player.gold = player_data["gold"]
-            player.skills = [SkillType[s] for s in player_data["skills"]]
-            player.potions = player_data["potions"]
-            player.bombs = player_data["bombs"]
-            
-            players.append(player)
-        
+        save_data = journal.recover(save_name)
+        players = [Character.from_save_data(player_data) for player_data in save_data["players"]]
         chapter = save_data["chapter"]
         
-        print(f"✅ Game dimuat!")
-        for player in players:
-            print(f"👤 {player.nama} ({player.role}) - Level {player.level}")
+        if verbose:
+            print(f"✅ Game dimuat!")
+            for player in players:
+                print(f"👤 {player.nama} ({player.role}) - Level {player.level}")
         
         return players, chapter
     
     except FileNotFoundError:
-        print(f"❌ File save tidak ditemukan!")
+        if verbose:
+            print(f"❌ File save tidak ditemukan!")
         return None, None
     except Exception as e:
-        print(f"❌ Error: {e}")
+        if verbose:
+            print(f"❌ Error: {e}")
         return None, None
 
-def list_save_files():
-    """Daftar save file"""
-    if not os.path.exists("saves"):
-        return []
-    
-    save_files = [f[:-5] for f in os.listdir("saves") if f.endswith(".json")]
-    
-    if not save_files:
-        return []
+def save_summaries():
+    """Ringkasan save file: (nama save, nama pemain, chapter), None kalau rusak"""
+    summaries = []
+    for save, players, chapter in storage.get_store().summaries():
+        if players is None:
+            summaries.append((save, None, None))
+        else:
+            summaries.append((save, ", ".join(players), chapter))
+    return summaries
+
+def save_headers(offset=0, limit=None):
+    """Header save (chapter, nama/role/level pemain) per halaman, tanpa membuat Character"""
+    return list(storage.get_store().headers(offset, limit))
+
+def save_list_lines(summaries):
+    """Baris daftar save file"""
+    lines = ["\n📂 DAFTAR SAVE FILE:"]
+    for idx, (save, player_names, chapter) in enumerate(summaries, 1):
+        if player_names is not None:
+            lines.append(f"[{idx}] {save} - {player_names} (Chapter {chapter})")
+    return lines
+
+class ShopCatalog:
+    """Katalog shop bersama, dibangun sekali. Nama item dipakai sebagai ID
+
+    Item di katalog adalah flyweight yang dipakai bersama semua pemain,
+    jangan diubah. State pemain hanya menyimpan nama (potion, bomb) atau
+    referensi ke item katalog (weapon, armor).
+    """
+    def __init__(self, categories):
+        self.by_category = MappingProxyType({
+            kategori: tuple(items) for kategori, items in categories.items()
+        })
+        self.by_id = MappingProxyType({
+            item.nama: item for items in self.by_category.values() for item in items
+        })
+        self.category_of = MappingProxyType({
+            item.nama: kategori for kategori, items in self.by_category.items() for item in items
+        })
     
-    print("\n📂 DAFTAR SAVE FILE:")
-    for idx, save in enumerate(save_files, 1):
-        try:
-            with open(f"saves/{save}.json", "r") as f:
-                data = json.load(f)
-            player_names = ", ".join([p["nama"] for p in data["players"]])
-            print(f"[{idx}] {save} - {player_names} (Chapter {data['chapter']})")
-        except:
-            pass
+    def get(self, item_id):
+        """Item dari ID, None kalau tidak ada"""
+        return self.by_id.get(item_id)
     
-    return save_files
+    def items(self, kategori):
+        """Tuple item dalam satu kategori"""
+        return self.by_category[kategori]
 
-def visit_shop(players):
-    """Shop"""
-    potions = [
+SHOP_CATALOG = ShopCatalog({
+    "potion": [
         Potion("Health Potion", 50, hp_restore=30),
         Potion("Greater Health Potion", 100, hp_restore=80),
         Potion("Rage Potion", 150, effect=StatusEffect("rage", "buff", 20, 3)),
         Potion("Weaken Potion", 120, effect=StatusEffect("weaken", "debuff", 15, 3)),
-    ]
-    
-    bombs = [
+    ],
+    "bomb": [
         Bomb("Fire Bomb", 200, 40),
         Bomb("Ice Bomb", 200, 40),
-    ]
-    
-    weapons = [
+    ],
+    "weapon": [
         Weapon("Iron Sword", 250, 8),
         Weapon("Steel Sword", 500, 15),
         Weapon("Wooden Bow", 200, 7),
         Weapon("Steel Bow", 400, 12),
-    ]
-    
-    armor_list = [
+    ],
+    "armor": [
         Armor("Iron Plate", 300, 6),
         Armor("Steel Plate", 700, 12),
-    ]
-    
-    while True:
-        print(f"\n🏪 SHOP")
-        for idx, player in enumerate(players, 1):
-            print(f"[{idx}] {player.nama} ({player.role}) - Gold: {player.gold}")
-        print("[0] Keluar Shop")
-        
-        pilihan = input("Pilih karakter: ").strip()
-        
-        try:
-            idx = int(pilihan) - 1
-            if idx == -1:
-                break
-            if 0 <= idx < len(players):
-                player = players[idx]
-                
-                print(f"\n{player.nama}, pilih item:")
-                print("[1] Potion  [2] Bomb  [3] Weapon  [4] Armor  [5] Keluar")
-                
-                item_pilihan = input("Pilihan: ").strip()
-                
-                if item_pilihan == "1":
-                    for i, p in enumerate(potions, 1):
-                        print(f"[{i}] {p.nama} - ${p.harga}")
-                    p_idx = input("Pilih (0 batal): ").strip()
-                    try:
-                        p_idx = int(p_idx) - 1
-                        if 0 <= p_idx < len(potions):
-                            p = potions[p_idx]
-                            if player.gold >= p.harga:
-                                player.gold -= p.harga
-                                if p.nama not in player.potions:
-                                    player.potions[p.nama] = 0
-                                player.potions[p.nama] += 1
-                                print(f"✅ Beli {p.nama}")
-                            else:
-                                print("❌ Gold kurang!")
-                    except:
-                        pass
-                
-                elif item_pilihan == "2":
-                    for i, b in enumerate(bombs, 1):
-                        print(f"[{i}] {b.nama} - ${b.harga}")
-                    b_idx = input("Pilih (0 batal): ").strip()
-                    try:
-                        b_idx = int(b_idx) - 1
-                        if 0 <= b_idx < len(bombs):
-                            b = bombs[b_idx]
-                            if player.gold >= b.harga:
-                                player.gold -= b.harga
-                                if b.nama not in player.bombs:
-                                    player.bombs[b.nama] = 0
-                                player.bombs[b.nama] += 1
-                                print(f"✅ Beli {b.nama}")
-                            else:
-                                print("❌ Gold kurang!")
-                    except:
-                        pass
-                
-                elif item_pilihan == "3":
-                    for i, w in enumerate(weapons, 1):
-                        print(f"[{i}] {w.nama} - ${w.harga}")
-                    w_idx = input("Pilih (0 batal): ").strip()
-                    try:
-                        w_idx = int(w_idx) - 1
-                        if 0 <= w_idx < len(weapons):
-                            w = weapons[w_idx]
-                            if player.gold >= w.harga:
-                                player.gold -= w.harga
-                                player.weapon_inventory.append(w)
-                                print(f"✅ Beli {w.nama}")
-                            else:
-                                print("❌ Gold kurang!")
-                    except:
-                        pass
-                
-                elif item_pilihan == "4":
-                    for i, a in enumerate(armor_list, 1):
-                        print(f"[{i}] {a.nama} - ${a.harga}")
-                    a_idx = input("Pilih (0 batal): ").strip()
-                    try:
-                        a_idx = int(a_idx) - 1
-                        if 0 <= a_idx < len(armor_list):
-                            a = armor_list[a_idx]
-                            if player.gold >= a.harga:
-                                player.gold -= a.harga
-                                player.armor_inventory.append(a)
-                                print(f"✅ Beli {a.nama}")
-                            else:
-                                print("❌ Gold kurang!")
-                    except:
-                        pass
-        except:
-            pass
-
-def intro_scene(nama):
-    """Intro"""
-    print("\n" + "="*70)
-    print("🌙 SHADOW OF NARCOTICS 🌙".center(70))
-    print("="*70)
+    ],
+})
+
+SHOP_MENU = {"1": "potion", "2": "bomb", "3": "weapon", "4": "armor"}
+
+def buy_item(player, item_id):
+    """Beli satu item katalog untuk pemain, kembalikan pesan hasil"""
+    item = SHOP_CATALOG.get(item_id)
+    if item is None:
+        return "❌ Item tidak ditemukan!"
+    if player.gold < item.harga:
+        return "❌ Gold kurang!"
     
-    print(f"""
+    player.gold -= item.harga
+    kategori = SHOP_CATALOG.category_of[item_id]
+    if kategori == "potion":
+        player.potions[item.nama] = player.potions.get(item.nama, 0) + 1
+    elif kategori == "bomb":
+        player.bombs[item.nama] = player.bombs.get(item.nama, 0) + 1
+    elif kategori == "weapon":
+        player.weapon_inventory.append(item)
+    else:
+        player.armor_inventory.append(item)
+    return f"✅ Beli {item.nama}"
+
+def intro_text(nama):
+    """Teks intro cerita"""
+    return f"""
 Tahun 2120, di kota NOVA RAYA...
 
 Namamu adalah {nama}. Seorang rakyat jelata yang bekerja sebagai 
@@ -828,18 +925,11 @@ Salah seorang mencekoki anak itu dengan VENOM.
 "TIDAK! AAAAHHH!" teriak si anak.
 
 Sesuatu dalam hatimu bergerak. Kamu tidak bisa diam melihat ini.
-    """)
-    
-    print("\n" + "="*70)
-    time.sleep(2)
-
-def encounter_thugs(player):
-    """Encounter preman"""
-    print("\n" + "="*70)
-    print("⚠️  PERTAMA KALI BERTEMPUR ⚠️".center(70))
-    print("="*70)
-    
-    print(f"""
+    """
+
+def thug_encounter_text(player):
+    """Teks bertemu preman"""
+    return f"""
 Kamu melangkah berani menuju ketiga preman itu.
 
 "HEY! LEPASKAN ANAK ITU!" teriakmu.
@@ -856,23 +946,11 @@ Mereka tertawa mengejek, tapi mata mereka menunjukkan marah.
 PREMAN KEPALA: "Baiklah! Kami akan mengajarimu adab, nak!"
 
 Mereka bersiap menyerang!
-    """)
-    
-    input("\nTekan ENTER untuk mulai pertempuran...")
-
-def thug_encounter_battle(player):
-    """Battle preman"""
-    enemy = Enemy(
-        "Kepala Preman SCAR",
-        hp=60, attack=12, defense=6, magic=3,
-        gold_drop=150, exp_drop=80,
-        level=2
-    )
-    
-    battle = Battle(player, enemy)
-    
-    if battle.start_battle():
-        print(f"""
+    """
+
+def thug_victory_text(player):
+    """Teks menang melawan preman"""
+    return f"""
 "ARGH! Cukup!" teriak SCAR sambil mundur.
 
 Dia menatapmu penuh dendam, tapi juga keraguan.
@@ -884,20 +962,16 @@ Mereka berlari meninggalkan gang, meninggalkan {player.nama} dan anak itu...
 
 Anak itu berlari menghampirimu dengan mata berair.
 "Terima kasih, kak! Terima kasih sudah menyelamatkan aku!"
-        """)
-        return True
-    else:
-        print("""
+        """
+
+THUG_DEFEAT_TEXT = """
 Tubuhmu lemas. Ketiga preman terus menyerang tanpa henti.
 Kamu jatuh... dan anak itu pun ditangkap...
 
 [GAME OVER]
-        """)
-        return False
+        """
 
-def chapter_2_intro(player):
-    """Intro Chapter 2"""
-    print(f"""
+CHAPTER_2_TEXT = """
 Kamu membawa anak itu ke rumah sakit. Dokter memeriksa dan menjamin
 anak itu akan baik-baik saja.
 
@@ -907,13 +981,9 @@ Saat keluar rumah sakit, seorang wanita menemuimu.
 organisasi yang melawan perdaran VENOM. Kami butuh orang sepertimu."
 
 Kamu menerima ajakan itu. Perjalananmu melawan narkoba dimulai...
-    """)
-    
-    input("Tekan ENTER...")
+    """
 
-def chapter_3_intro(players):
-    """Intro Chapter 3 - Misi Kereta Pedagang"""
-    print(f"""
+CHAPTER_3_TEXT = """
 Kamu sudah melatih diri selama beberapa minggu sebagai anggota Shadow Guardians.
 Sekarang kamu sudah cukup kuat untuk misi yang lebih berat.
 
@@ -942,20 +1012,9 @@ Mereka memberikan kalian informasi lengkap:
 KETUA: "Siapkan diri kalian. Misi dimulai dalam 1 jam."
 
 Kamu dan Santoso mempersiapkan diri untuk misi yang paling berbahaya sampai saat ini...
-    """)
-    
-    input("Tekan ENTER untuk lanjut...")
-
-def merchant_caravan_battle(players):
-    """Battle Kereta Pedagang"""
-    enemies = [
-        Enemy("Pengawal Kereta 1", hp=80, attack=14, defense=7, magic=2, gold_drop=200, exp_drop=100, level=3),
-        Enemy("Pengawal Kereta 2", hp=75, attack=13, defense=6, magic=3, gold_drop=200, exp_drop=100, level=3),
-        Enemy("Kapten Pengawal", hp=100, attack=16, defense=8, magic=4, gold_drop=300, exp_drop=150, level=4),
-    ]
-    
-    battle = Battle(players, enemies)
-    story = """
+    """
+
+CARAVAN_STORY = """
 Jalanan gelap sepi. Hanya cahaya bulan yang menerangi.
 
 Tiba-tiba, terdengar bunyi roda kereta. Kereta besar muncul dari kegelapan,
@@ -971,9 +1030,8 @@ Kapten dan pengawalnya langsung mengeluarkan senjata. Pertarungan pun dimulai!
 
 ---PERTEMPURAN DIMULAI---
     """
-    
-    if battle.start_battle(story):
-        print("""
+
+CARAVAN_VICTORY_TEXT = """
 Setelah pertarungan sengit, ketiga pengawal akhirnya tumbang.
 
 Santoso langsung membuka pekat kereta. Ribuan paket VENOM berisi di dalamnya.
@@ -991,10 +1049,9 @@ Ini adalah awal dari akhir untuk para pengedar narkoba!"
 
 Kamu dan Santoso kembali ke markas dengan penuh kebanggaan.
 Perjalanan panjang masih menanti...
-        """)
-        return True
-    else:
-        print("""
+        """
+
+CARAVAN_DEFEAT_TEXT = """
 Pertarungan sangat sengit. Pengawal kereta lebih kuat dari yang diperkirakan.
 
 Kamu dan Santoso berusaha sebaik mungkin, namun akhirnya kewalahan.
@@ -1005,231 +1062,83 @@ SANTOSO: "Mereka terlalu kuat... aku minta maaf, aku gagal..."
 Tim Shadow Guardians mengambil kalian dan merawat di markas.
 
 KETUA: "Kalian masih perlu banyak latihan. Jangan menyerah. Kita akan coba lagi."
-        """)
-        return False
-
-def explore_world(players):
-    """Explore"""
-    monsters = {
-        "Slime Hijau": Enemy("Slime Hijau", 25, 5, 2, 2, 30, 25, level=1),
-        "Goblin Kecil": Enemy("Goblin Kecil", 40, 8, 3, 1, 60, 50, level=2),
-        "Orc Prajurit": Enemy("Orc Prajurit", 70, 14, 6, 3, 150, 120, level=3),
-    }
-    
-    locations = [
-        ("Hutan Gelap", ["Slime Hijau", "Goblin Kecil"]),
-        ("Gua Orc", ["Goblin Kecil", "Orc Prajurit"]),
+        """
+
+def thug_enemies():
+    """Musuh battle preman"""
+    return spawn_encounter("thug")
+
+def caravan_guards():
+    """Tiga pengawal kereta pedagang"""
+    return spawn_encounter("merchant_caravan")
+
+def recruit_santoso():
+    """Rekan pemanah yang bergabung di Chapter 3"""
+    santoso = Character("Santoso", role="Archer", hp=90, mp=60, attack=9, defense=4, magic=7, agility=9)
+    santoso.level = 3
+    santoso.skills = [SkillType.SLASH, SkillType.ARROW_SHOT, SkillType.MULTI_SHOT]
+    return santoso
+
+def explore_locations():
+    """Lokasi jelajah dan monster yang mungkin muncul"""
+    return EXPLORE_LOCATIONS
+
+def spawn_monster(enemy_name):
+    """Monster jelajah dari registry, diambil dari pool"""
+    return ENEMY_POOL.acquire(ENEMY_TEMPLATES[enemy_name])
+
+def main_menu_lines(players, chapter):
+    """Baris menu utama"""
+    lines = [
+        f"\n{'='*60}",
+        "MENU UTAMA".center(60),
+        f"{'='*60}",
+        f"Chapter: {chapter}",
     ]
-    
-    print(f"\n{'='*60}")
-    print("🌍 JELAJAHI DUNIA".center(60))
-    print(f"{'='*60}")
-    
-    for idx, (nama, _) in enumerate(locations, 1):
-        print(f"[{idx}] {nama}")
-    
-    pilihan = input("\nPilih lokasi (0 batal): ").strip()
-    
-    try:
-        idx = int(pilihan) - 1
-        if idx == -1:
-            return None
-        if 0 <= idx < len(locations):
-            location_name, possible_monsters = locations[idx]
-            print(f"\n🗺️  Kamu memasuki {location_name}...")
-            time.sleep(1)
-            
-            enemy_name = random.choice(possible_monsters)
-            enemy = monsters[enemy_name]
-            
-            enemy_encounter = Enemy(
-                enemy.nama, enemy.hp_max, enemy.attack, enemy.defense,
-                enemy.magic, enemy.gold_drop, enemy.exp_drop, enemy.level
-            )
-            
-            print(f"\n⚠️  {enemy_encounter.nama} muncul!")
-            time.sleep(1)
-            
-            return enemy_encounter
-    except ValueError:
-        pass
-    
-    return None
-
-def main_menu(players, chapter):
-    """Main Menu"""
-    print(f"\n{'='*60}")
-    print("MENU UTAMA".center(60))
-    print(f"{'='*60}")
-    print(f"Chapter: {chapter}")
     for player in players:
-        print(f"👤 {player.nama} ({player.role}) - Level {player.level}, Gold: {player.gold}")
-    print("[1] Jelajahi Dunia")
-    print("[2] Kunjungi Shop")
-    print("[3] Status Karakter")
-    print("[4] Simpan Game")
-    print("[5] Keluar Game")
-    
-    while True:
-        pilihan = input("\nPilihan (1-5): ").strip()
-        if pilihan == "1":
-            return "explore"
-        elif pilihan == "2":
-            visit_shop(players)
-        elif pilihan == "3":
-            for player in players:
-                player.show_status()
-        elif pilihan == "4":
-            save_name = input("Nama save (default: autosave): ").strip() or "autosave"
-            save_game(players, chapter, save_name)
-        elif pilihan == "5":
-            return "exit"
-        else:
-            print("❌ Input tidak valid!")
+        lines.append(f"👤 {player.nama} ({player.role}) - Level {player.level}, Gold: {player.gold}")
+    lines += [
+        "[1] Jelajahi Dunia",
+        "[2] Kunjungi Shop",
+        "[3] Status Karakter",
+        "[4] Simpan Game",
+        "[5] Keluar Game",
+    ]
+    return lines
 
 def game_utama():
-    """Main"""
-    print("\n" + "="*70)
-    print("SHADOW OF NARCOTICS".center(70))
-    print("="*70)
-    print("\n[1] Game Baru")
-    print("[2] Lanjutkan Game (Load Save)")
-    print("[3] Keluar")
-    
-    while True:
-        pilihan = input("\nPilihan (1-3): ").strip()
-        
-        if pilihan == "1":
-            break
-        elif pilihan == "2":
-            save_files = list_save_files()
-            if save_files:
-                pilihan_save = input("\nPilih save file (0 batal): ").strip()
-                try:
-                    idx = int(pilihan_save) - 1
-                    if idx == -1:
-                        continue
-                    if 0 <= idx < len(save_files):
-                        players, chapter = load_game(save_files[idx])
-                        if players:
-                            if chapter == 2:
-                                main_game_loop(players, chapter)
-                            elif chapter == 3:
-                                chapter_3_intro(players)
-                                main_game_loop(players, chapter)
-                            return
-                except ValueError:
-                    pass
-            continue
-        elif pilihan == "3":
-            print("Terima kasih sudah bermain!")
-            return
-        else:
-            print("❌ Input tidak valid!")
-    
-    # Game baru
-    nama = input("\nSiapa namamu? ").strip()
-    player = Character(nama, role="Warrior")
-    
-    intro_scene(nama)
-    input("Tekan ENTER...")
-    
-    encounter_thugs(player)
-    battle_result = thug_encounter_battle(player)
+    """Main: GameSession (lihat session.py) dijalankan lewat input() sampai pemain keluar
+
+    Seluruh alur (judul, intro, battle, menu, shop, jelajah, chapter) ada di
+    state machine sesi, jadi tidak ada rekursi atau loop bersarang di sini.
+    Jeda antar event (session.beats) mengikuti pacer sesi, default pacing
+    aktif (--pacing).
+    """
+    from session import CONSOLE_AUTOSAVE, GameSession  # session.py mengimpor modul ini
     
-    if battle_result:
-        players = [player]
-        chapter = 2
-        chapter_2_intro(player)
-        main_game_loop(players, chapter)
-    else:
-        print("\n[Coba lagi?]")
-        game_utama()
-
-def main_game_loop(players, chapter):
-    """Game loop"""
-    while True:
-        if chapter == 2:
-            menu_choice = main_menu(players, chapter)
-            
-            if menu_choice == "exit":
-                print(f"\nTerima kasih sudah bermain!")
-                break
-            
-            elif menu_choice == "explore":
-                enemy = explore_world(players)
-                
-                if enemy:
-                    input("\nTekan ENTER untuk pertempuran...")
-                    battle = Battle(players[0], enemy)
-                    
-                    if battle.start_battle():
-                        print("\n⏳ Kamu kembali ke kota...")
-                        input("Tekan ENTER...")
-                    else:
-                        print("\n💀 Kamu kalah!")
-                        players[0].hp = players[0].hp_max
-                        print("Dirawat di markas...")
-                        input("Tekan ENTER...")
-            
-            # Trigger Chapter 3 saat level cukup
-            if players[0].level >= 3:
-                print("\n📬 Kamu menerima panggilan dari Ketua Shadow Guardians...")
-                input("Tekan ENTER...")
-                chapter = 3
-                
-                santoso = Character("Santoso", role="Archer", hp=90, mp=60, attack=9, defense=4, magic=7, agility=9)
-                santoso.level = 3
-                santoso.skills = [SkillType.SLASH, SkillType.ARROW_SHOT, SkillType.MULTI_SHOT]
-                players.append(santoso)
-                
-                chapter_3_intro(players)
-                
-                print("\n🗺️  Kamu dan Santoso menuju Jalanan Gelap...")
-                input("Tekan ENTER...")
-                
-                if merchant_caravan_battle(players):
-                    print("\n🎊 Misi Chapter 3 berhasil!")
-                    chapter = 4
-                else:
-                    print("\n💪 Kamu akan coba lagi...")
-                    players[1].hp = players[1].hp_max
-                    players[0].hp = players[0].hp_max
-                input("Tekan ENTER...")
-        
-        elif chapter >= 3:
-            menu_choice = main_menu(players, chapter)
-            
-            if menu_choice == "exit":
-                print(f"\nTerima kasih sudah bermain!")
+    session = GameSession("console", autosave_name=CONSOLE_AUTOSAVE)
+    lines = session.start()
+    try:
+        while True:
+            for idx, line in enumerate(lines):
+                session.sleep_beats(idx)
+                print(line)
+            if session.state == "ended":
                 break
-            
-            elif menu_choice == "explore":
-                if len(players) == 1:
-                    enemy = explore_world(players)
-                    if enemy:
-                        input("\nTekan ENTER untuk pertempuran...")
-                        battle = Battle(players[0], enemy)
-                        if battle.start_battle():
-                            print("\n⏳ Kembali ke kota...")
-                            input("Tekan ENTER...")
-                        else:
-                            print("\n💀 Kalah!")
-                            players[0].hp = players[0].hp_max
-                            input("Tekan ENTER...")
-                else:
-                    enemy = explore_world(players)
-                    if enemy:
-                        input("\nTekan ENTER untuk pertempuran...")
-                        battle = Battle(players, enemy)
-                        if battle.start_battle():
-                            print("\n⏳ Kembali ke kota...")
-                            input("Tekan ENTER...")
-                        else:
-                            print("\n💀 Kalah!")
-                            for p in players:
-                                p.hp = p.hp_max
-                            input("Tekan ENTER...")
+            lines = session.handle(input("> "))
+    finally:
+        session.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shadow of Narcotics")
+    pacing.add_argument(parser)
+    save_codec.add_argument(parser)
+    storage.add_argument(parser)
+    args = parser.parse_args()
+    if args.pacing:
+        pacing.set_pacing(args.pacing)
+    if args.save_format:
+        save_codec.set_default_format(args.save_format)
+    if args.save_store:
+        storage.set_store(args.save_store)
     game_utama()
@@ -0,0 +1,363 @@
+"""Arsip riwayat save: chunk ber-alamat konten, terkompresi, tanpa duplikat
+
+Setiap snapshot dipecah per pemain menjadi beberapa chunk (identitas, stat,
+item) dalam JSON kanonik. Nama chunk adalah sha256 isinya, disimpan sekali
+dengan zlib di <root>/chunks/. Snapshot sendiri hanya manifest kecil di
+<root>/snapshots/<nama save>/ yang berisi daftar hash chunk, jadi bagian
+yang sama antar snapshot (skill, item, pemain yang tidak berubah) tidak
+disimpan ulang. Manifest memakai ekstensi .snap supaya tidak dikira save
+oleh pemindai folder save.
+
+Id snapshot adalah nomor urut per save (bukan jam), jadi snapshot terbaru
+selalu yang id-nya terbesar walaupun jam sistem mundur. RetentionPolicy
+membatasi riwayat per save (N terakhir, satu per hari, satu per minggu)
+dan gc() menghapus chunk yang tidak dipakai lagi; ArchiveStore
+menjalankan keduanya sendiri saat menyimpan (gc paling sering sekali per
+gc_interval detik). put()
+memegang kunci bersama <root>/gc.lock selama menulis chunk dan manifest,
+gc() mengambilnya eksklusif sebelum menghapus, jadi chunk yang baru
+dipakai ulang oleh put() yang sedang berjalan tidak ikut terhapus.
+
+Contoh:
+    python archive.py add saves/          # arsipkan semua save sekarang
+    python archive.py list pablo2
+    python archive.py restore pablo2 --as pablo2_lama
+    python archive.py prune --keep-last 10 --keep-daily 7 --keep-weekly 8
+    python archive.py stats
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import zlib
+from datetime import datetime
+
+import save_codec
+import save_schema
+import storage
+from storage import RevisionLock, atomic_write, check_revision, read_revision
+
+SNAPSHOT_EXTENSION = ".snap"
+
+# Field pemain per chunk; field lain masuk chunk "items"
+CHUNK_GROUPS = (
+    ("identity", ("nama", "role", "skills")),
+    ("stats", ("level", "exp", "exp_max", "hp", "hp_max", "mp", "mp_max",
+               "attack", "defense", "magic", "agility", "gold")),
+)
+
+def _canonical(obj):
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def split_player(player):
+    """Pecah dict pemain jadi daftar bagian untuk dijadikan chunk"""
+    parts = []
+    used = set()
+    for _, fields in CHUNK_GROUPS:
+        parts.append({field: player[field] for field in fields if field in player})
+        used.update(fields)
+    parts.append({field: value for field, value in player.items() if field not in used})
+    return parts
+
+class RetentionPolicy:
+    """Snapshot yang disimpan: keep_last terbaru, plus yang terbaru per hari
+    untuk keep_daily hari terakhir dan per minggu untuk keep_weekly minggu"""
+    def __init__(self, keep_last=10, keep_daily=7, keep_weekly=8):
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+
+    def select(self, snapshots):
+        """snapshots: [(snapshot_id, created)], kembalikan set snapshot_id yang disimpan"""
+        # Urut id (nomor urut), bukan created: jam yang mundur tidak mengubah mana yang terbaru
+        ordered = sorted(snapshots, reverse=True)
+        keep = {snapshot_id for snapshot_id, _ in ordered[:self.keep_last]}
+        for limit, bucket in ((self.keep_daily, "%Y-%m-%d"), (self.keep_weekly, "%G-W%V")):
+            seen = []
+            for snapshot_id, created in ordered:
+                key = datetime.fromtimestamp(created).strftime(bucket)
+                if key in seen:
+                    continue
+                if len(seen) >= limit:
+                    break
+                seen.append(key)
+                keep.add(snapshot_id)
+        return keep
+
+class Archive:
+    def __init__(self, root="saves/archive", level=6):
+        self.root = root
+        self.level = level
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.snapshot_dir = os.path.join(root, "snapshots")
+        self.gc_lock_path = os.path.join(root, "gc.lock")
+
+    # ---- Chunk ----
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunk_dir, digest[:2], digest[2:] + ".z")
+
+    def put_chunk(self, obj):
+        """Simpan obj sebagai chunk kalau belum ada, kembalikan hash-nya"""
+        data = _canonical(obj)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, zlib.compress(data, self.level))
+        return digest
+
+    def get_chunk(self, digest):
+        with open(self._chunk_path(digest), "rb") as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    # ---- Snapshot ----
+
+    def _save_dir(self, save_name):
+        return os.path.join(self.snapshot_dir, save_name)
+
+    def put(self, save_name, save_data, created=None):
+        """Arsipkan satu snapshot, kembalikan snapshot_id. Penulis untuk save
+        yang sama harus bergantian (ArchiveStore memegang kunci save-nya)"""
+        save_data = save_schema.upgrade(save_data)
+        created = time.time() if created is None else created
+        manifest = {
+            "schema_version": save_data["schema_version"],
+            "chapter": save_data["chapter"],
+            "created": created,
+            "header": save_codec.header_of(save_data),
+        }
+        history = self.history(save_name)
+        # Id lama berupa mikrodetik, jadi nomor urut setelahnya tetap lebih besar
+        snapshot_id = f"{int(history[-1]) + 1 if history else 1:020d}"
+        with RevisionLock(self.gc_lock_path, shared=True):
+            manifest["players"] = [[self.put_chunk(part) for part in split_player(player)]
+                                   for player in save_data["players"]]
+            folder = self._save_dir(save_name)
+            os.makedirs(folder, exist_ok=True)
+            atomic_write(self._manifest_path(save_name, snapshot_id), _canonical(manifest))
+        return snapshot_id
+
+    def _manifest_path(self, save_name, snapshot_id):
+        return os.path.join(self._save_dir(save_name), snapshot_id + SNAPSHOT_EXTENSION)
+
+    def _manifest(self, save_name, snapshot_id):
+        with open(self._manifest_path(save_name, snapshot_id), "rb") as f:
+            return json.loads(f.read())
+
+    def history(self, save_name):
+        """snapshot_id milik save ini, urut dari yang terlama"""
+        try:
+            names = os.listdir(self._save_dir(save_name))
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(SNAPSHOT_EXTENSION)] for name in names if name.endswith(SNAPSHOT_EXTENSION))
+
+    def save_names(self):
+        try:
+            return sorted(os.listdir(self.snapshot_dir))
+        except FileNotFoundError:
+            return []
+
+    def get(self, save_name, snapshot_id=None):
+        """Dict save dari snapshot (default: terbaru). FileNotFoundError kalau tidak ada"""
+        if snapshot_id is None:
+            history = self.history(save_name)
+            if not history:
+                raise FileNotFoundError(save_name)
+            snapshot_id = history[-1]
+        manifest = self._manifest(save_name, snapshot_id)
+        players = []
+        for digests in manifest["players"]:
+            player = {}
+            for digest in digests:
+                player.update(self.get_chunk(digest))
+            players.append(player)
+        return {"schema_version": manifest["schema_version"], "chapter": manifest["chapter"], "players": players}
+
+    def latest_header(self, save_name):
+        """Header snapshot terbaru (lihat save_codec.header_of), tanpa membuka chunk"""
+        history = self.history(save_name)
+        if not history:
+            return None
+        return self._manifest(save_name, history[-1])["header"]
+
+    # ---- Retensi ----
+
+    def apply_retention(self, save_name, policy):
+        """Hapus manifest snapshot di luar policy. Chunk dibersihkan oleh gc()"""
+        snapshots = [(snapshot_id, self._manifest(save_name, snapshot_id)["created"])
+                     for snapshot_id in self.history(save_name)]
+        keep = policy.select(snapshots)
+        removed = 0
+        for snapshot_id, _ in snapshots:
+            if snapshot_id not in keep:
+                os.remove(self._manifest_path(save_name, snapshot_id))
+                removed += 1
+        return removed
+
+    def _mark(self, live, seen):
+        """Tambahkan chunk dari manifest yang belum ada di seen ke live"""
+        for save_name in self.save_names():
+            for snapshot_id in self.history(save_name):
+                if (save_name, snapshot_id) in seen:
+                    continue
+                try:
+                    manifest = self._manifest(save_name, snapshot_id)
+                except FileNotFoundError:  # dihapus retensi di tengah jalan
+                    continue
+                seen.add((save_name, snapshot_id))
+                for digests in manifest["players"]:
+                    live.update(digests)
+
+    def gc(self):
+        """Hapus chunk yang tidak dirujuk snapshot mana pun. Kembalikan jumlahnya"""
+        live = set()
+        seen = set()
+        # Tandai tanpa kunci dulu (bagian yang lama), lalu di bawah kunci
+        # eksklusif baca hanya manifest yang muncul sejak itu sebelum menghapus
+        self._mark(live, seen)
+        removed = 0
+        with RevisionLock(self.gc_lock_path, timeout=60):
+            self._mark(live, seen)
+            for folder, _, filenames in os.walk(self.chunk_dir):
+                for filename in filenames:
+                    digest = os.path.basename(folder) + filename[:-2]
+                    if filename.endswith(".z") and digest not in live:
+                        os.remove(os.path.join(folder, filename))
+                        removed += 1
+        return removed
+
+    def prune(self, policy):
+        """Retensi untuk semua save lalu gc. Kembalikan (snapshot dihapus, chunk dihapus)"""
+        snapshots = sum(self.apply_retention(save_name, policy) for save_name in self.save_names())
+        return snapshots, self.gc()
+
+    def stats(self):
+        """Jumlah snapshot, chunk dan ukuran total di disk"""
+        snapshots = sum(len(self.history(save_name)) for save_name in self.save_names())
+        chunks = 0
+        size = 0
+        for folder, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                size += os.path.getsize(os.path.join(folder, filename))
+                if filename.endswith(".z"):
+                    chunks += 1
+        return {"snapshots": snapshots, "chunks": chunks, "bytes": size}
+
+class ArchiveStore:
+    """Backend storage (lihat storage.py) yang menyimpan setiap save sebagai
+    snapshot arsip, dengan retensi per save dan gc setiap kali menyimpan"""
+    def __init__(self, root="saves/archive", policy=None, gc_interval=600):
+        self.archive = Archive(root)
+        self.policy = policy or RetentionPolicy()
+        self.journal_folder = root
+        self.gc_interval = gc_interval
+        self.last_gc = None
+
+    def _lock_path(self, save_name):
+        return os.path.join(self.archive.root, "locks", save_name + ".lock")
+
+    def save(self, save_name, save_data, format_name=None, expected_revision=None):
+        with RevisionLock(self._lock_path(save_name)) as lock:
+            revision = lock.read()
+            check_revision(save_name, expected_revision, revision)
+            lock.write(revision + 1)
+            self.archive.put(save_name, save_data)
+            removed = 0
+            if len(self.archive.history(save_name)) > self.policy.keep_last + self.policy.keep_daily + self.policy.keep_weekly:
+                removed = self.archive.apply_retention(save_name, self.policy)
+        # gc di luar kunci save; menelusuri semua chunk, jadi dibatasi per gc_interval
+        now = time.monotonic()
+        if removed and (self.last_gc is None or now - self.last_gc >= self.gc_interval):
+            self.last_gc = now
+            self.archive.gc()
+        return revision + 1
+
+    def revision(self, save_name):
+        return read_revision(self._lock_path(save_name))
+
+    def exists(self, save_name):
+        return bool(self.archive.history(save_name))
+
+    def save_many(self, items, format_name=None):
+        return [self.save(save_name, save_data, format_name) for save_name, save_data in items]
+
+    def load(self, save_name):
+        return self.archive.get(save_name)
+
+    def summaries(self):
+        summaries = []
+        for save_name, header in self.headers():
+            if header:
+                summaries.append((save_name, [p["nama"] for p in header["players"]], header["chapter"]))
+        return summaries
+
+    def headers(self, offset=0, limit=None):
+        save_names = self.archive.save_names()
+        save_names = save_names[offset:None if limit is None else offset + limit]
+        return [(save_name, self.archive.latest_header(save_name)) for save_name in save_names]
+
+    def find(self, player=None, chapter=None):
+        return [
+            save_name for save_name, players, save_chapter in self.summaries()
+            if (player is None or player in players) and (chapter is None or save_chapter == chapter)
+        ]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arsip riwayat save dengan deduplikasi")
+    parser.add_argument("--root", default="saves/archive", help="folder arsip")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="arsipkan semua save di folder")
+    add.add_argument("folder", nargs="?", default="saves")
+    show = commands.add_parser("list", help="riwayat snapshot satu save")
+    show.add_argument("save")
+    restore = commands.add_parser("restore", help="kembalikan snapshot ke folder save (lewat FileStore)")
+    restore.add_argument("save")
+    restore.add_argument("snapshot", nargs="?", default=None)
+    restore.add_argument("--as", dest="target", default=None, help="nama save tujuan")
+    restore.add_argument("--folder", default="saves")
+    prune = commands.add_parser("prune", help="terapkan retensi lalu hapus chunk tak terpakai")
+    prune.add_argument("--keep-last", type=int, default=10)
+    prune.add_argument("--keep-daily", type=int, default=7)
+    prune.add_argument("--keep-weekly", type=int, default=8)
+    commands.add_parser("stats", help="ukuran arsip")
+    args = parser.parse_args(argv)
+
+    archive = Archive(args.root)
+    if args.command == "add":
+        # Lewat ArchiveStore: dikunci per save, revisi naik dan retensi berjalan
+        store = ArchiveStore(args.root)
+        count = 0
+        for filename in sorted(os.listdir(args.folder)):
+            save_name, extension = os.path.splitext(filename)
+            if extension not in save_codec.EXTENSIONS:
+                continue
+            with open(os.path.join(args.folder, filename), "rb") as f:
+                save_data = save_codec.FORMATS[save_codec.EXTENSIONS[extension]].decode(f.read())
+            store.save(save_name, save_data)
+            count += 1
+        print(f"✅ {count} save diarsipkan")
+    elif args.command == "list":
+        for snapshot_id in archive.history(args.save):
+            manifest = archive._manifest(args.save, snapshot_id)
+            created = datetime.fromtimestamp(manifest["created"]).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{snapshot_id}  {created}  Chapter {manifest['chapter']}  {', '.join(p['nama'] for p in manifest['header']['players'])}")
+    elif args.command == "restore":
+        save_data = archive.get(args.save, args.snapshot)
+        target = args.target or args.save
+        # Lewat store: dikunci dan revisinya naik, jadi sesi yang masih
+        # memegang revisi lama mendapat SaveConflict, bukan menimpa diam-diam
+        revision = storage.FileStore(args.folder).save(target, save_data)
+        print(f"✅ {args.save} dikembalikan sebagai {target} (revisi {revision})")
+    elif args.command == "prune":
+        policy = RetentionPolicy(args.keep_last, args.keep_daily, args.keep_weekly)
+        snapshots, chunks = archive.prune(policy)
+        print(f"🧹 {snapshots} snapshot dan {chunks} chunk dihapus")
+    else:
+        stats = archive.stats()
+        print(f"{stats['snapshots']} snapshot, {stats['chunks']} chunk, {stats['bytes']} byte")
+
+if __name__ == "__main__":
+    main()
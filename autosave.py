@@ -0,0 +1,261 @@
+"""Antrian write-behind untuk journal autosave
+
+Journal (lihat journal.py) tidak menulis ke disk sendiri: baris aksi dan
+snapshot dimasukkan ke antrian ini yang langsung kembali, jadi game loop
+(termasuk event loop server) tidak pernah menunggu flock, fsync atau
+rename. Thread latar menunggu sebentar supaya checkpoint beruntun ikut
+terkumpul, lalu per batch:
+
+- Snapshot untuk save yang sama digabung: hanya yang terakhir ditulis, dan
+  baris yang antre sebelum snapshot itu dibuang karena sudah termasuk.
+- Semua snapshot ditulis sekaligus lewat store.save_many (satu transaksi
+  di SqliteStore, atomic_write per file di FileStore), lalu journal-nya
+  dikosongkan.
+- Baris ditambahkan per journal dan dicap revisi snapshot-nya, fsync
+  dikelompokkan (Journal.sync_every dan sync_interval). File journal
+  dibuka, ditulis lalu ditutup per batch: sesi yang menunggu di memori
+  tidak memegang file descriptor, berapa pun jumlahnya.
+
+Kalau proses mati, yang hilang paling banyak checkpoint selama delay
+terakhir. Kalau penulisan gagal, pesannya dicatat di journal.error dan
+journal menulis snapshot baru di checkpoint berikutnya.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+class _Pending:
+    """Operasi yang antre untuk satu save"""
+    __slots__ = ("journal", "snapshot", "resume", "lines", "close")
+
+    def __init__(self, journal):
+        self.journal = journal
+        self.snapshot = None
+        self.resume = None
+        self.lines = []
+        self.close = False
+
+class _SyncState:
+    """Baris journal yang sudah ditulis tapi belum di-fsync"""
+    __slots__ = ("unsynced", "synced_at")
+
+    def __init__(self):
+        self.unsynced = 0
+        self.synced_at = time.monotonic()
+
+class AutosaveQueue:
+    def __init__(self, delay=0.5, batch_size=256):
+        self.delay = delay
+        self.batch_size = batch_size
+        self.pending = {}
+        self.writing = set()
+        # Nama save -> _SyncState, hanya dipakai thread penulis
+        self.sync_states = {}
+        self.written = 0
+        self.coalesced = 0
+        self.flushing = 0
+        self.closed = False
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self.thread.start()
+
+    def _pending(self, journal):
+        if self.closed:
+            raise RuntimeError("Antrian autosave sudah ditutup")
+        pending = self.pending.get(journal.save_name)
+        if pending is None:
+            pending = self.pending[journal.save_name] = _Pending(journal)
+        pending.journal = journal
+        self.cond.notify_all()
+        return pending
+
+    def snapshot(self, journal, save_data):
+        """Jadwalkan snapshot penuh. Snapshot dan baris yang antre sebelumnya dibuang"""
+        with self.cond:
+            pending = self._pending(journal)
+            if pending.snapshot is not None or pending.resume is not None or pending.lines:
+                self.coalesced += 1
+            pending.snapshot = save_data
+            pending.resume = None
+            pending.lines = []
+
+    def resume(self, journal, save_data, revision):
+        """Lanjutkan journal yang ada. Kalau revisi snapshot bukan revision lagi
+        (atau masih ada tulisan antre untuk save ini), save_data ditulis sebagai snapshot"""
+        with self.cond:
+            if journal.save_name in self.pending:
+                self.snapshot(journal, save_data)
+                return
+            self._pending(journal).resume = (save_data, revision)
+
+    def append(self, journal, entry):
+        """Jadwalkan satu baris journal; entry["rev"] diisi saat ditulis"""
+        with self.cond:
+            self._pending(journal).lines.append(entry)
+
+    def close_journal(self, journal):
+        """fsync lalu tutup file journal setelah semua yang antre ditulis"""
+        with self.cond:
+            self._pending(journal).close = True
+
+    def _take_batch(self):
+        batch = []
+        for save_name in list(self.pending)[:self.batch_size]:
+            batch.append((save_name, self.pending.pop(save_name)))
+        return batch
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closed:
+                    self.cond.wait()
+                if not self.pending and self.closed:
+                    return
+                # Tunggu sebentar supaya checkpoint beruntun ikut digabung
+                self.cond.wait_for(lambda: self.closed or self.flushing, self.delay)
+                batch = self._take_batch()
+                self.writing = {save_name for save_name, _ in batch}
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                print(f"❌ Autosave gagal: {e}", file=sys.stderr)
+
+            with self.cond:
+                self.writing = set()
+                self.written += len(batch)
+                self.cond.notify_all()
+
+    def _fail(self, journal, error):
+        # Baris berikutnya relatif ke state yang tidak tersimpan: dibuang
+        # sampai snapshot baru dari journal berhasil ditulis
+        journal.failed = True
+        journal.error = f"{type(error).__name__}: {error}"
+        print(f"❌ Autosave {journal.save_name} gagal: {journal.error}", file=sys.stderr)
+
+    def _write_batch(self, batch):
+        snapshots = []
+        for save_name, pending in batch:
+            journal = pending.journal
+            if pending.resume is not None:
+                save_data, revision = pending.resume
+                try:
+                    current = journal.store.revision(save_name)
+                except Exception as e:
+                    self._fail(journal, e)
+                    continue
+                if revision is not None and revision != current:
+                    # Snapshot sudah ditulis pihak lain sejak journal ini dipakai
+                    pending.snapshot = save_data
+                else:
+                    journal.revision = current
+            if pending.snapshot is not None:
+                snapshots.append((save_name, pending))
+
+        self._write_snapshots(snapshots)
+        for save_name, pending in batch:
+            self._append(save_name, pending)
+
+    def _write_snapshots(self, snapshots):
+        by_store = {}
+        for save_name, pending in snapshots:
+            by_store.setdefault(id(pending.journal.store), []).append((save_name, pending))
+        for group in by_store.values():
+            store = group[0][1].journal.store
+            try:
+                revisions = store.save_many([(save_name, pending.snapshot) for save_name, pending in group])
+            except Exception:
+                # Satu save yang gagal tidak boleh menggagalkan yang lain: ulang satu per satu
+                revisions = []
+                for save_name, pending in group:
+                    try:
+                        revisions.append(store.save(save_name, pending.snapshot))
+                    except Exception as e:
+                        revisions.append(e)
+            for (save_name, pending), revision in zip(group, revisions):
+                journal = pending.journal
+                if isinstance(revision, Exception):
+                    self._fail(journal, revision)
+                    continue
+                journal.revision = revision
+                journal.failed = False
+                # Baris lama tercap revisi sebelumnya, jadi aman kalau crash sebelum truncate
+                try:
+                    os.truncate(journal.path, 0)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self._fail(journal, e)
+
+    def _append(self, save_name, pending):
+        journal = pending.journal
+        state = self.sync_states.get(save_name)
+        try:
+            if pending.lines and not journal.failed:
+                if state is None:
+                    state = self.sync_states[save_name] = _SyncState()
+                os.makedirs(journal.folder, exist_ok=True)
+                with open(journal.path, "a") as f:
+                    for entry in pending.lines:
+                        entry["rev"] = journal.revision
+                        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                    f.flush()
+                    state.unsynced += len(pending.lines)
+                    if (state.unsynced >= journal.sync_every
+                            or time.monotonic() - state.synced_at >= journal.sync_interval):
+                        self._fsync(f, state, journal)
+            if pending.close and state is not None:
+                del self.sync_states[save_name]
+                if journal.sync and state.unsynced:
+                    # fsync lewat descriptor mana pun menulis semua data file itu
+                    with open(journal.path, "a") as f:
+                        self._fsync(f, state, journal)
+        except OSError as e:
+            self._fail(journal, e)
+
+    def _fsync(self, f, state, journal):
+        if journal.sync and state.unsynced:
+            os.fsync(f.fileno())
+        state.unsynced = 0
+        state.synced_at = time.monotonic()
+
+    def flush(self, save_name=None, timeout=None):
+        """Tunggu sampai semua yang antre (atau yang untuk save_name saja) sudah ditulis"""
+        if save_name is None:
+            done = lambda: not self.pending and not self.writing
+        else:
+            done = lambda: save_name not in self.pending and save_name not in self.writing
+        with self.cond:
+            self.flushing += 1
+            self.cond.notify_all()
+            try:
+                return self.cond.wait_for(done, timeout)
+            finally:
+                self.flushing -= 1
+
+    def close(self):
+        """Tulis sisa antrian lalu hentikan thread"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join()
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_queue():
+    """Antrian autosave bersama proses ini, ditutup otomatis saat keluar"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = AutosaveQueue()
+            atexit.register(_queue.close)
+        return _queue
+
+def flush(save_name=None):
+    """Tunggu antrian proses ini (kalau sudah ada) sampai tulisan yang antre selesai"""
+    if _queue is not None:
+        _queue.flush(save_name)
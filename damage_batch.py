@@ -0,0 +1,156 @@
+"""Model damage tervektorisasi (NumPy) untuk simulasi battle massal
+
+Rumus sama dengan Battle.calculate_damage, Character.take_damage,
+get_damage_multiplier (rage) dan get_damage_reduction (weaken), tapi
+dihitung untuk array penyerang, skill dan bertahan sekaligus.
+simulate_lockstep memakai model ini untuk menjalankan ribuan battle
+bersamaan, satu giliran untuk semua battle per iterasi.
+"""
+import numpy as np
+
+from skills import SKILLS, SkillType, expected_damage
+
+SKILL_ORDER = list(SkillType)
+SKILL_CODE = {skill: code for code, skill in enumerate(SKILL_ORDER)}
+
+# Kolom rumus dari tabel skill, diindeks dengan SKILL_CODE; stat 0 = attack, 1 = magic
+_STAT = np.array([int(SKILLS[s].stat == "magic") for s in SKILL_ORDER])
+_SCALE = np.array([SKILLS[s].scale for s in SKILL_ORDER])
+_LO = np.array([SKILLS[s].roll_min for s in SKILL_ORDER])
+_HI = np.array([SKILLS[s].roll_max for s in SKILL_ORDER])
+_MP = {skill: spec.mp for skill, spec in SKILLS.items()}
+
+def damage_multiplier(rage_total):
+    """Multiplier dari total nilai rage (persen), sama dengan get_damage_multiplier"""
+    return 1.0 + np.asarray(rage_total) / 100
+
+def damage_reduction(weaken_total):
+    """Reduction dari total nilai weaken (persen), sama dengan get_damage_reduction"""
+    return np.maximum(0.1, 1.0 - np.asarray(weaken_total) / 100)
+
+def batch_calculate_damage(attack, magic, skills, multiplier=1.0, rng=None):
+    """Damage mentah untuk array attack, magic dan kode skill (lihat SKILL_CODE)"""
+    rng = rng or np.random.default_rng()
+    skills = np.asarray(skills)
+    stat = np.where(_STAT[skills] == 1, magic, attack)
+    scale = _SCALE[skills]
+    base = np.where(scale == 1.0, stat, np.trunc(stat * scale))
+    roll = rng.integers(_LO[skills], _HI[skills] + 1)
+    damage = np.trunc((base + roll) * multiplier)
+    return np.maximum(1, damage).astype(np.int64)
+
+def batch_take_damage(damage, defense, reduction=1.0):
+    """Damage yang benar-benar diterima: defense // 2 lalu weaken, sama dengan take_damage"""
+    reduced = np.maximum(1, np.asarray(damage) - np.asarray(defense) // 2)
+    return np.trunc(reduced * reduction).astype(np.int64)
+
+def _usable_attacks(player):
+    """Skill serangan satu target yang boleh dipakai, urut dari damage terbesar"""
+    skills = []
+    for skill, spec in SKILLS.items():
+        if spec.target != "single" or (spec.archer_only and player.role != "Archer"):
+            continue
+        if spec.bawaan or skill in player.skills:
+            skills.append(skill)
+    return sorted(skills, key=lambda s: -expected_damage(player, s))
+
+def simulate_lockstep(party, enemy_sets, max_turns=100, rng=None):
+    """Jalankan len(enemy_sets) battle bersamaan dengan kebijakan simulate.auto_action
+
+    Potion, bomb dan status effect tidak dipakai di mode ini. Kembalikan dict
+    array: won, timeout, turns, hp_left, gold, exp.
+    """
+    rng = rng or np.random.default_rng()
+    n = len(enemy_sets)
+    n_players = len(party)
+
+    p_hp = np.tile(np.array([p.hp for p in party], dtype=np.int64), (n, 1))
+    p_mp = np.tile(np.array([p.mp for p in party], dtype=np.int64), (n, 1))
+    p_defense = np.array([p.defense for p in party])
+
+    e_hp = np.array([[e.hp for e in enemies] for enemies in enemy_sets], dtype=np.int64)
+    e_attack = np.array([[e.attack for e in enemies] for enemies in enemy_sets])
+    e_defense = np.array([[e.defense for e in enemies] for enemies in enemy_sets])
+    e_magic = np.array([[e.magic for e in enemies] for enemies in enemy_sets])
+    gold = np.array([sum(e.gold_drop for e in enemies) for enemies in enemy_sets]) // n_players
+    exp = np.array([sum(e.exp_drop for e in enemies) for enemies in enemy_sets]) // n_players
+    n_enemies = e_hp.shape[1]
+    rows = np.arange(n)
+
+    done = np.zeros(n, dtype=bool)
+    won = np.zeros(n, dtype=bool)
+    turns = np.full(n, max_turns + 1)
+
+    slash = SKILL_CODE[SkillType.SLASH]
+    power_strike = SKILL_CODE[SkillType.POWER_STRIKE]
+    multi_shot = SKILL_CODE[SkillType.MULTI_SHOT]
+
+    for turn in range(1, max_turns + 1):
+        for idx, player in enumerate(party):
+            active = ~done
+            if not active.any():
+                break
+
+            # Heal saat HP kritis
+            can_heal = (SkillType.HEAL in player.skills) & (p_mp[:, idx] >= _MP[SkillType.HEAL])
+            heal = active & can_heal & (p_hp[:, idx] < player.hp_max * 0.35)
+            if heal.any():
+                amount = player.magic + rng.integers(10, 21, size=n)
+                p_mp[:, idx] -= np.where(heal, _MP[SkillType.HEAL], 0)
+                p_hp[:, idx] = np.where(heal, np.minimum(player.hp_max, p_hp[:, idx] + amount), p_hp[:, idx])
+
+            # Multi Shot kalau musuh hidup lebih dari satu
+            alive = e_hp > 0
+            attacking = active & ~heal
+            multi = np.zeros(n, dtype=bool)
+            if player.role == "Archer" and SkillType.MULTI_SHOT in player.skills:
+                multi = attacking & (alive.sum(axis=1) > 1) & (p_mp[:, idx] >= _MP[SkillType.MULTI_SHOT])
+                if multi.any():
+                    p_mp[:, idx] -= np.where(multi, _MP[SkillType.MULTI_SHOT], 0)
+                    raw = batch_calculate_damage(player.attack, player.magic,
+                                                 np.full((n, n_enemies), multi_shot), rng=rng)
+                    dealt = batch_take_damage(raw, e_defense)
+                    e_hp -= np.where(multi[:, None] & alive, dealt, 0)
+
+            # Serangan satu target terkuat yang MP-nya cukup, ke musuh dengan HP terendah
+            single = attacking & ~multi
+            if single.any():
+                skill = np.full(n, slash)
+                chosen = np.zeros(n, dtype=bool)
+                for option in _usable_attacks(player):
+                    affordable = ~chosen & (p_mp[:, idx] >= _MP[option])
+                    skill = np.where(affordable, SKILL_CODE[option], skill)
+                    chosen |= affordable
+                    p_mp[:, idx] -= np.where(single & affordable, _MP[option], 0)
+                target = np.argmin(np.where(e_hp > 0, e_hp, np.iinfo(np.int64).max), axis=1)
+                raw = batch_calculate_damage(player.attack, player.magic, skill, rng=rng)
+                dealt = batch_take_damage(raw, e_defense[rows, target])
+                e_hp[rows, target] -= np.where(single, dealt, 0)
+
+            victory = active & (e_hp <= 0).all(axis=1)
+            won |= victory
+            done |= victory
+            turns = np.where(victory, turn, turns)
+
+            # Giliran musuh: 1/3 pilih power strike, lalu 60% jadi power strike
+            fighting = ~done
+            power = (rng.integers(0, 3, size=(n, n_enemies)) == 2) & (rng.random((n, n_enemies)) > 0.4)
+            raw = batch_calculate_damage(e_attack, e_magic, np.where(power, power_strike, slash), rng=rng)
+            target = rng.integers(0, n_players, size=(n, n_enemies))
+            dealt = batch_take_damage(raw, p_defense[target])
+            hits = fighting[:, None] & (e_hp > 0)
+            for enemy_idx in range(n_enemies):
+                p_hp[rows, target[:, enemy_idx]] -= np.where(hits[:, enemy_idx], dealt[:, enemy_idx], 0)
+
+            defeat = fighting & (p_hp <= 0).any(axis=1)
+            done |= defeat
+            turns = np.where(defeat, turn, turns)
+
+    return {
+        "won": won,
+        "timeout": ~done,
+        "turns": turns,
+        "hp_left": np.maximum(0, p_hp).sum(axis=1),
+        "gold": np.where(won, gold, 0),
+        "exp": np.where(won, exp, 0),
+    }
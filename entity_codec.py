@@ -0,0 +1,132 @@
+"""Serializer dict untuk entity game, dikompilasi sekali dari skema
+
+Skema entity adalah tuple Field. compile_codec() membuat source fungsi
+to_dict/from_dict khusus untuk skema itu (satu ekspresi per field, tanpa
+loop getattr/setattr) lalu meng-exec-nya sekali saat import. from_dict
+membuat objek dengan cls.__new__, jadi setiap slot harus punya Field;
+yang tidak disimpan dideklarasikan dengan transient().
+
+Jenis field:
+    value       disalin apa adanya (int, str, None)
+    dict, list  salinan dangkal
+    enum_list   list enum, disimpan sebagai nama member
+    ref         objek katalog, disimpan sebagai .nama; dibaca lewat lookup
+    ref_list    list objek katalog, nama yang tidak dikenal dilewati
+    nested      entity lain dengan codec-nya sendiri (boleh None)
+    custom      fungsi encode/decode sendiri
+    transient   tidak disimpan, diisi factory() saat decode
+default adalah factory untuk key yang tidak ada di dict (misal save lama);
+tanpa default, key wajib ada.
+"""
+
+class Field:
+    __slots__ = ("name", "kind", "encode", "decode", "default")
+
+    def __init__(self, name, kind, encode=None, decode=None, default=None):
+        self.name = name
+        self.kind = kind
+        self.encode = encode
+        self.decode = decode
+        self.default = default
+
+def value(name, default=None):
+    return Field(name, "value", default=default)
+
+def dict_field(name, default=None):
+    return Field(name, "dict", default=default)
+
+def list_field(name, default=None):
+    return Field(name, "list", default=default)
+
+def enum_list(name, enum, default=None):
+    return Field(name, "enum_list", decode=enum.__members__, default=default)
+
+def ref(name, lookup, default=None):
+    return Field(name, "ref", decode=lookup, default=default)
+
+def ref_list(name, lookup, default=None):
+    return Field(name, "ref_list", decode=lookup, default=default)
+
+def nested(name, codec, default=None):
+    return Field(name, "nested", encode=codec.to_dict, decode=codec.from_dict, default=default)
+
+def custom(name, encode, decode, default=None):
+    return Field(name, "custom", encode=encode, decode=decode, default=default)
+
+def transient(name, factory):
+    return Field(name, "transient", default=factory)
+
+# Ekspresi encode dan decode per jenis. {v} = nilai, {e}/{d} = helper field
+_ENCODE = {
+    "value": "{v}",
+    "dict": "dict({v})",
+    "list": "list({v})",
+    "enum_list": "[m.name for m in {v}]",
+    "ref": "({v}.nama if {v} is not None else None)",
+    "ref_list": "[item.nama for item in {v}]",
+    "nested": "({e}({v}) if {v} is not None else None)",
+    "custom": "{e}({v})",
+}
+_DECODE = {
+    "value": "{v}",
+    "dict": "dict({v})",
+    "list": "list({v})",
+    "enum_list": "[{d}[n] for n in {v}]",
+    "ref": "({d}({v}) if {v} is not None else None)",
+    "ref_list": "[item for item in map({d}, {v}) if item is not None]",
+    "nested": "({d}({v}) if {v} is not None else None)",
+    "custom": "{d}({v})",
+}
+
+class EntityCodec:
+    """to_dict(obj) dan from_dict(data) hasil compile_codec"""
+    __slots__ = ("cls", "fields", "to_dict", "from_dict", "source")
+
+def compile_codec(cls, fields):
+    """Bangun EntityCodec untuk cls dari tuple Field"""
+    slots = set()
+    for klass in cls.__mro__:
+        slots.update(getattr(klass, "__slots__", ()))
+    missing = slots - {field.name for field in fields}
+    if missing:
+        raise ValueError(f"{cls.__name__}: slot tanpa Field: {', '.join(sorted(missing))}")
+
+    namespace = {"_cls": cls}
+    encode_items = []
+    decode_lines = []
+    for idx, field in enumerate(fields):
+        e, d, default = f"_e{idx}", f"_d{idx}", f"_default{idx}"
+        namespace[e] = field.encode
+        namespace[d] = field.decode
+        namespace[default] = field.default
+        if field.kind == "transient":
+            decode_lines.append(f"    obj.{field.name} = {default}()")
+            continue
+        encode_items.append(f"        {field.name!r}: " + _ENCODE[field.kind].format(v=f"obj.{field.name}", e=e))
+        expr = _DECODE[field.kind].format(v="raw", d=d)
+        if field.default is None:
+            decode_lines.append(f"    raw = data[{field.name!r}]")
+        else:
+            decode_lines.append(f"    raw = data[{field.name!r}] if {field.name!r} in data else {default}()")
+        decode_lines.append(f"    obj.{field.name} = {expr}")
+
+    source = "\n".join([
+        "def to_dict(obj):",
+        "    return {",
+        *[item + "," for item in encode_items],
+        "    }",
+        "",
+        "def from_dict(data):",
+        "    obj = _cls.__new__(_cls)",
+        *decode_lines,
+        "    return obj",
+    ])
+    exec(compile(source, f"<entity_codec {cls.__name__}>", "exec"), namespace)
+
+    codec = EntityCodec()
+    codec.cls = cls
+    codec.fields = tuple(fields)
+    codec.to_dict = namespace["to_dict"]
+    codec.from_dict = namespace["from_dict"]
+    codec.source = source
+    return codec
@@ -0,0 +1,131 @@
+"""Batas jumlah sesi di memori: sesi yang lama diam di-hibernate ke disk
+
+SessionCache menyimpan paling banyak max_sessions GameSession aktif dalam
+urutan LRU. Kalau penuh, sesi yang paling lama tidak menerima pesan
+ditulis lewat GameSession.to_dict (termasuk battle yang sedang berjalan)
+ke SessionStore lalu dibuang dari memori. Pesan berikutnya untuk sesi itu
+memulihkannya dengan from_dict tanpa terlihat oleh pemain. Journal
+autosave sesi ditutup (fsync lewat antrian autosave) saat di-hibernate
+dan dilanjutkan saat restore.
+
+File sesi tetap ada setelah restore, ditandai sudah dipulihkan
+(<id>.restored), sampai sesi di-hibernate lagi atau dihapus. Kalau proses
+mati di antaranya, sesi kembali ke posisi hibernate terakhir itu. Party di
+journal mungkin sudah lebih baru, jadi journal-nya dimulai dari snapshot
+baru party file sesi supaya posisi dan party tetap cocok.
+"""
+import json
+import os
+import sys
+import zlib
+from collections import OrderedDict
+
+from session import GameSession
+from storage import atomic_write, safe_name
+
+class SessionStore:
+    """Satu file zlib(JSON) per sesi di folder"""
+    def __init__(self, folder="saves/sessions"):
+        self.folder = folder
+
+    def _path(self, session_id, suffix=".session"):
+        return os.path.join(self.folder, safe_name(session_id) + suffix)
+
+    def put(self, session_id, data):
+        os.makedirs(self.folder, exist_ok=True)
+        raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        # Tanpa fsync: party sudah aman di journal autosave, file sesi hanya
+        # posisi percakapan dan ditulis setiap kali sesi di-evict
+        atomic_write(self._path(session_id), zlib.compress(raw), sync=False)
+        self._remove(self._path(session_id, ".restored"))
+
+    def get(self, session_id):
+        """(dict sesi, sudah dipulihkan sejak hibernate terakhir), None kalau tidak pernah di-hibernate"""
+        for suffix, restored in ((".session", False), (".restored", True)):
+            try:
+                with open(self._path(session_id, suffix), "rb") as f:
+                    return json.loads(zlib.decompress(f.read())), restored
+            except FileNotFoundError:
+                continue
+        return None
+
+    def mark_restored(self, session_id):
+        """Tandai file sesi sudah dipulihkan; isinya dipakai lagi hanya kalau proses mati"""
+        try:
+            os.replace(self._path(session_id), self._path(session_id, ".restored"))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, session_id):
+        self._remove(self._path(session_id))
+        self._remove(self._path(session_id, ".restored"))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+class SessionCache:
+    """GameSession per id dengan batas LRU, sisanya di SessionStore"""
+    def __init__(self, max_sessions=1000, store=None):
+        self.max_sessions = max_sessions
+        self.store = store or SessionStore()
+        self.resident = OrderedDict()
+        self.restored = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.resident)
+
+    def get(self, session_id):
+        """Sesi aktif atau hasil restore, None kalau sesi belum pernah ada"""
+        session = self.resident.get(session_id)
+        if session is not None:
+            self.resident.move_to_end(session_id)
+            return session
+        found = self.store.get(session_id)
+        if found is None:
+            return None
+        data, restored = found
+        if restored and data["journal"] is not None:
+            # Proses mati setelah restore sebelumnya: journal mungkin berisi aksi
+            # sesudah posisi ini, jadi journal dimulai dari snapshot baru
+            data["journal"] = -1
+        session = GameSession.from_dict(data)
+        self.store.mark_restored(session_id)
+        self.restored += 1
+        self._add(session_id, session)
+        return session
+
+    def create(self, session_id):
+        session = GameSession(session_id)
+        self._add(session_id, session)
+        return session
+
+    def _add(self, session_id, session):
+        self.resident[session_id] = session
+        while len(self.resident) > self.max_sessions:
+            oldest = next(iter(self.resident))
+            try:
+                self.hibernate(oldest)
+            except OSError as e:
+                # Sesi tetap di memori; dicoba lagi saat sesi berikutnya ditambahkan
+                print(f"❌ Hibernate sesi {oldest} gagal: {e}", file=sys.stderr)
+                break
+
+    def hibernate(self, session_id):
+        """Tulis sesi ke store lalu buang dari memori. Kalau penulisan gagal, sesi tetap aktif"""
+        session = self.resident[session_id]
+        self.store.put(session_id, session.to_dict())
+        del self.resident[session_id]
+        session.close()
+        self.evicted += 1
+
+    def hibernate_all(self):
+        """Hibernate semua sesi aktif, misal saat server berhenti"""
+        for session_id in list(self.resident):
+            try:
+                self.hibernate(session_id)
+            except OSError as e:
+                print(f"❌ Hibernate sesi {session_id} gagal: {e}", file=sys.stderr)
@@ -0,0 +1,182 @@
+"""Journal aksi (write-ahead log) di atas snapshot save
+
+Setiap checkpoint menambah satu baris JSON ke <folder>/<nama>.journal berisi
+jenis aksi dan field pemain yang berubah sejak baris sebelumnya, bukan
+seluruh party. Setelah compact_every baris, party ditulis penuh sebagai
+snapshot lewat storage (format save_game) dan journal dikosongkan. Folder
+journal mengikuti backend store (journal_folder pada store), default saves/.
+
+Setiap baris dicap dengan revisi snapshot yang menjadi dasarnya. Recovery
+memuat snapshot terakhir lalu hanya me-replay baris dengan revisi yang
+sama, jadi baris lama tidak pernah diterapkan ke snapshot lain: baik saat
+proses mati di antara menulis snapshot dan mengosongkan journal, snapshot
+untuk party baru (game baru, load), maupun save yang ditulis dari luar.
+Baris terakhir yang terpotong karena crash diabaikan.
+
+Baris dan snapshot tidak ditulis di game loop: keduanya masuk antrian
+write-behind (autosave.py) yang menggabungkan snapshot beruntun dan
+menulis per batch dari thread latar. fsync dikelompokkan: paling lambat
+setiap sync_every baris atau sync_interval detik, dan saat journal
+ditutup. Kalau proses mati, yang hilang paling banyak aksi yang masih
+antre; kalau mesin mati, aksi sejak fsync terakhir.
+"""
+import json
+import os
+
+import autosave
+import save_schema
+import storage
+
+def journal_folder(store):
+    """Folder journal untuk backend store, di samping data save-nya"""
+    return getattr(store, "journal_folder", "saves")
+
+def journal_path(save_name, folder="saves"):
+    return os.path.join(folder, save_name + ".journal")
+
+class Journal:
+    """Journal autosave satu save. Penulisan ke disk lewat antrian write-behind
+    (autosave.py); revision, failed dan error diperbarui oleh thread penulisnya"""
+    def __init__(self, save_name, folder=None, store=None, compact_every=200, sync=True,
+                 sync_every=32, sync_interval=1.0, queue=None):
+        self.save_name = save_name
+        self.store = store or storage.get_store()
+        self.folder = folder or journal_folder(self.store)
+        self.path = journal_path(save_name, self.folder)
+        self.queue = queue or autosave.get_queue()
+        self.compact_every = compact_every
+        self.sync = sync
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.seq = 0
+        self.entries = 0
+        # Revisi snapshot yang sudah ditulis; baris dicap dengan ini
+        self.revision = 0
+        # Snapshot atau baris terakhir gagal ditulis: checkpoint berikutnya jadi snapshot
+        self.failed = False
+        self.error = None
+        self.chapter = None
+        self.last = None
+
+    def _snapshot(self, players, chapter):
+        return {
+            "schema_version": save_schema.CURRENT_VERSION,
+            "chapter": chapter,
+            "players": [player.to_save_data() for player in players],
+        }
+
+    def open(self, players, chapter):
+        """Mulai journal baru dari state ini (ditulis sebagai snapshot)"""
+        self.compact(players, chapter)
+
+    def resume(self, players, chapter, revision=None):
+        """Lanjutkan journal yang ada tanpa snapshot baru. players/chapter harus
+        sama dengan hasil recover() (misal sesi yang baru dipulihkan).
+        revision: revisi snapshot yang dipakai journal sebelumnya; kalau
+        snapshot sudah ditulis pihak lain sejak itu, ditulis snapshot baru"""
+        save_data = self._snapshot(players, chapter)
+        self.entries = 0
+        self.chapter = chapter
+        self.last = save_data["players"]
+        self.queue.resume(self, save_data, revision)
+
+    def compact(self, players, chapter):
+        """Jadwalkan snapshot penuh; journal dikosongkan setelah snapshot ditulis"""
+        save_data = self._snapshot(players, chapter)
+        self.entries = 0
+        self.chapter = chapter
+        self.last = save_data["players"]
+        self.queue.snapshot(self, save_data)
+
+    def record(self, kind, players, chapter, **info):
+        """Catat satu aksi. Hanya field yang berubah yang ditulis, aksi tanpa perubahan dilewati"""
+        if self.last is None or self.failed:
+            self.compact(players, chapter)
+            return
+
+        current = [player.to_save_data() for player in players]
+        changes = {}
+        for idx, data in enumerate(current):
+            if idx < len(self.last):
+                before = self.last[idx]
+                diff = {field: value for field, value in data.items() if before.get(field) != value}
+            else:
+                # Pemain baru ditulis lengkap, termasuk field yang None
+                diff = data
+            if diff:
+                changes[str(idx)] = diff
+
+        if not changes and chapter == self.chapter and len(current) == len(self.last):
+            return
+
+        self.seq += 1
+        # rev diisi penulis antrian: revisi snapshot yang sudah ditulis sebelum baris ini
+        entry = {"seq": self.seq, "rev": None, "kind": kind}
+        entry.update(info)
+        if chapter != self.chapter:
+            entry["chapter"] = chapter
+        if len(current) != len(self.last):
+            entry["party"] = len(current)
+        if changes:
+            entry["players"] = changes
+
+        self.queue.append(self, entry)
+        self.entries += 1
+        self.chapter = chapter
+        self.last = current
+
+        if self.entries >= self.compact_every:
+            self.compact(players, chapter)
+
+    def flush(self):
+        """Tunggu sampai semua yang antre untuk journal ini sudah ditulis"""
+        self.queue.flush(self.save_name)
+
+    def close(self):
+        """fsync dan tutup file journal setelah antriannya ditulis (tidak menunggu)"""
+        self.queue.close_journal(self)
+
+def replay(save_data, path, revision=None):
+    """Terapkan journal di path ke dict save (diubah langsung). Dengan revision,
+    baris yang dicap revisi lain dilewati. Kembalikan jumlah baris yang diterapkan"""
+    try:
+        f = open(path, "r")
+    except FileNotFoundError:
+        return 0
+    applied = 0
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            # Journal lama tanpa cap revisi tetap diterapkan
+            if revision is not None and entry.get("rev", revision) != revision:
+                continue
+            if "chapter" in entry:
+                save_data["chapter"] = entry["chapter"]
+            players = save_data["players"]
+            if "party" in entry:
+                del players[entry["party"]:]
+            for idx, changes in entry.get("players", {}).items():
+                idx = int(idx)
+                while len(players) <= idx:
+                    players.append({})
+                players[idx].update(changes)
+            applied += 1
+    return applied
+
+def recover(save_name, folder=None, store=None):
+    """Dict save terbaru: snapshot dari storage ditambah replay journal revisi itu"""
+    store = store or storage.get_store()
+    # Snapshot dan baris yang masih antre di proses ini ditulis dulu
+    autosave.flush(save_name)
+    while True:
+        # Revisi dibaca sebelum dan sesudah load supaya snapshot dan revisinya cocok
+        revision = store.revision(save_name)
+        save_data = store.load(save_name)
+        if store.revision(save_name) == revision:
+            break
+    save_data = save_schema.upgrade(save_data)
+    replay(save_data, journal_path(save_name, folder or journal_folder(store)), revision)
+    return save_data
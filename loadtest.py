@@ -0,0 +1,224 @@
+"""Load test server sesi dengan ribuan bot client
+
+Setiap bot adalah satu pemain yang menunggu balasan sebelum mengirim pesan
+berikutnya, seperti pengguna chat: membuat karakter, menjelajah Hutan
+Gelap dan Gua Orc, membeli potion, dan (setelah level 3) bertarung di
+misi kereta pedagang. Bot membaca prompt terakhir dari balasan server,
+jadi ia berjalan di atas protokol yang sama dengan client sungguhan.
+
+Untuk setiap tingkat concurrency dilaporkan latency per pesan (p50/p99),
+throughput, dan tambahan memori server per sesi (RSS dari /proc, hanya
+kalau server dijalankan oleh harness ini). Sesi dibuka bertahap dan pesan
+pertamanya tidak ikut diukur. Kalau jumlah bot melebihi --max-sessions,
+sesi di-hibernate ke disk: KB/sesi turun tapi latency naik.
+
+Contoh:
+    python loadtest.py                                   # server baru di folder sementara
+    python loadtest.py -c 10,100,1000 --messages 50 --workers 4
+    python loadtest.py --connect unix:/tmp/adventure.sock -c 500
+    python loadtest.py --connect 127.0.0.1:8765 --seed 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+CONNECT_BATCH = 50
+WARMUP_BOTS = 10
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+class BotPlayer:
+    """Pemain skrip acak: pilih balasan dari baris output terakhir server"""
+    def __init__(self, session_id, rng):
+        self.session_id = session_id
+        self.rng = rng
+        self.bought = False
+
+    def reply(self, lines):
+        prompt = lines[-1].strip() if lines else ""
+        text = "\n".join(lines)
+        if prompt == "Pilihan (1-3):":
+            return "1"
+        if prompt == "Siapa namamu?":
+            return f"bot{self.session_id}"
+        if prompt == "Pilihan (1-5):":
+            self.bought = False
+            return self.rng.choices(("1", "2", "3"), weights=(8, 2, 1))[0]
+        if prompt == "Pilih lokasi (0 batal):":
+            return self.rng.choice(("1", "2"))  # Hutan Gelap, Gua Orc
+        if prompt == "Pilih karakter:":
+            return "0" if self.bought else "1"
+        if prompt == "Pilihan:" and "[1] Potion" in text:
+            return "1"
+        if prompt == "Pilihan:":
+            return self.rng.choices(("1", "2", "8"), weights=(16, 3, 1))[0]
+        if prompt == "Pilih (0 batal):":
+            if "$" in text:  # daftar item shop: beli Health Potion sekali per kunjungan
+                self.bought = True
+            return "1"  # item pertama, target pertama, atau potion pertama
+        if prompt == "Pilih save file (0 batal):":
+            return "0"
+        return ""
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def _rss_kb(pid):
+    """RSS proses dan anak-anaknya (worker) dalam KB, None kalau /proc tidak ada"""
+    try:
+        pids = [pid]
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(child) for child in f.read().split()]
+        total = 0
+        for p in pids:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+        return total
+    except OSError:
+        return None
+
+async def _open(target):
+    if target.startswith("unix:"):
+        return await asyncio.open_unix_connection(target[5:], limit=2**20)
+    host, _, port = target.rpartition(":")
+    return await asyncio.open_connection(host, int(port), limit=2**20)
+
+async def _exchange(reader, writer, session_id, text):
+    writer.write((json.dumps({"session": session_id, "text": text}) + "\n").encode())
+    await writer.drain()
+    line = await reader.readline()
+    if not line:
+        raise ConnectionResetError("server menutup koneksi")
+    return json.loads(line)
+
+async def _open_session(target, bot):
+    """Koneksi baru plus pesan pertama (layar judul), tidak ikut diukur"""
+    reader, writer = await _open(target)
+    reply = await _exchange(reader, writer, bot.session_id, "")
+    return reader, writer, bot.reply(reply.get("output", []))
+
+async def _open_all(target, bots, batch=CONNECT_BATCH):
+    """Buka sesi bertahap: batch berikutnya baru dibuka setelah server
+    membalas batch sebelumnya, supaya backlog listen tidak meluap"""
+    opened = []
+    for start in range(0, len(bots), batch):
+        opened += await asyncio.gather(*(_open_session(target, bot) for bot in bots[start:start + batch]))
+    return opened
+
+async def run_bot(opened, bot, messages, latencies, errors):
+    """Satu koneksi, satu pemain, kirim-tunggu sebanyak messages pesan"""
+    reader, writer, text = opened
+    try:
+        for _ in range(messages):
+            start = time.perf_counter()
+            reply = await _exchange(reader, writer, bot.session_id, text)
+            latencies.append(time.perf_counter() - start)
+            if "error" in reply:
+                errors.append(reply["error"])
+                text = ""
+                continue
+            text = bot.reply(reply["output"])
+    except OSError as e:
+        errors.append(f"koneksi {bot.session_id}: {e}")
+    finally:
+        writer.close()
+
+async def run_level(target, concurrency, messages, seed, prefix):
+    """Jalankan concurrency bot bersamaan, kembalikan (latencies, errors, detik)"""
+    latencies = []
+    errors = []
+    bots = [BotPlayer(f"{prefix}{i}", random.Random(seed * 1000003 + i)) for i in range(concurrency)]
+    # Sesi dibuka sebelum waktu mulai dihitung: yang diukur hanya permainan
+    opened = await _open_all(target, bots)
+    start = time.perf_counter()
+    await asyncio.gather(*(run_bot(conn, bot, messages, latencies, errors)
+                           for conn, bot in zip(opened, bots)))
+    return latencies, errors, time.perf_counter() - start
+
+def _wait_for_server(target, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server berhenti sebelum siap")
+        try:
+            asyncio.run(_probe(target))
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError("server tidak siap")
+
+async def _probe(target):
+    _, writer = await _open(target)
+    writer.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test server sesi dengan bot client")
+    parser.add_argument("-c", "--concurrency", default="10,100,500",
+                        help="daftar jumlah bot bersamaan, dipisah koma")
+    parser.add_argument("--messages", type=int, default=40, help="pesan per bot di setiap tingkat")
+    parser.add_argument("--connect", default=None,
+                        help="server yang sudah jalan: host:port atau unix:path (default: jalankan server baru)")
+    parser.add_argument("--workers", type=int, default=1, help="--workers untuk server baru")
+    parser.add_argument("--max-sessions", type=int, default=100000, help="--max-sessions untuk server baru")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    process = None
+    workdir = None
+    target = args.connect
+    if target is None:
+        # Server baru di folder sementara supaya saves/ milik game tidak tersentuh
+        workdir = tempfile.mkdtemp(prefix="adventure-load-")
+        socket_path = os.path.join(workdir, "server.sock")
+        process = subprocess.Popen(
+            [sys.executable, SERVER, "--unix", socket_path, "--workers", str(args.workers),
+             "--max-sessions", str(args.max_sessions)],
+            cwd=workdir, stdout=subprocess.DEVNULL,
+        )
+        target = "unix:" + socket_path
+        _wait_for_server(target, process)
+        print(f"Server baru: {target} (workers {args.workers})")
+        # Pemanasan tanpa diukur: worker baru mengimpor modul game di pesan pertama
+        asyncio.run(run_level(target, WARMUP_BOTS * args.workers, 5, args.seed, "warmup-"))
+
+    try:
+        print(f"{'bot':>6} {'pesan':>8} {'msg/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'KB/sesi':>8} {'error':>6}")
+        for level_idx, concurrency in enumerate(levels):
+            rss_before = _rss_kb(process.pid) if process else None
+            latencies, errors, elapsed = asyncio.run(
+                run_level(target, concurrency, args.messages, args.seed + level_idx, f"L{level_idx}-")
+            )
+            rss_after = _rss_kb(process.pid) if process else None
+            latencies.sort()
+            per_session = (f"{(rss_after - rss_before) / concurrency:.1f}"
+                           if rss_before is not None and rss_after is not None else "n/a")
+            print(f"{concurrency:>6} {len(latencies):>8} {len(latencies) / elapsed:>9.0f} "
+                  f"{_percentile(latencies, 0.5) * 1000:>8.2f} {_percentile(latencies, 0.99) * 1000:>8.2f} "
+                  f"{latencies[-1] * 1000 if latencies else 0:>8.2f} {per_session:>8} {len(errors):>6}")
+            if errors:
+                print(f"       contoh error: {errors[0]}")
+    finally:
+        if process:
+            # SIGINT supaya server (dan worker-nya) berhenti lewat jalur normal
+            process.send_signal(signal.SIGINT)
+            try:
+                process.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Validasi dan upgrade massal file save ke skema terbaru
+
+Contoh:
+    python migrate.py                      # upgrade semua save di saves/
+    python migrate.py arsip/ --check       # hanya laporan, tidak menulis
+    python migrate.py arsip/ --format binary --workers 8
+
+Folder ditelusuri secara streaming dan file dibagi per batch ke process
+pool, jadi jumlah file di memori tetap kecil berapa pun besar arsipnya.
+Setiap file ditulis ulang secara atomik (lihat storage.atomic_write),
+dengan mode file asal, sambil memegang kunci save-nya (RevisionLock) dan
+menaikkan revisinya seperti FileStore.save. Baris journal autosave untuk
+revisi itu digabung ke save yang ditulis ulang lalu journal dikosongkan;
+tanpa itu, baris tersebut tidak akan di-replay lagi setelah revisi naik.
+Subfolder archive/ dan sessions/ dilewati.
+"""
+import argparse
+import os
+import stat
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import journal
+import save_codec
+import save_schema
+from storage import RevisionLock, atomic_write, lock_path, read_revision
+
+BATCH_SIZE = 256
+# Subfolder saves/ yang bukan save: arsip (archive.py) dan sesi hibernate
+SKIP_DIRS = frozenset(("archive", "sessions"))
+
+def iter_save_files(root):
+    """Path semua file save di bawah root, tanpa mengumpulkan semuanya dulu"""
+    for folder, dirnames, filenames in os.walk(root):
+        dirnames[:] = [dirname for dirname in dirnames if dirname not in SKIP_DIRS]
+        for filename in filenames:
+            if os.path.splitext(filename)[1] in save_codec.EXTENSIONS:
+                yield os.path.join(folder, filename)
+
+def migrate_file(path, check=False, format_name=None):
+    """Validasi dan upgrade satu file. Kembalikan (path, status, keterangan)
+
+    status: ok (sudah terbaru), upgraded, outdated (mode --check), invalid, error
+    """
+    if check:
+        return _migrate(path, True, format_name, None)
+    folder, filename = os.path.split(path)
+    try:
+        # Dibaca dan ditulis di bawah kunci: penulis lain tidak bisa menyelip
+        with RevisionLock(lock_path(folder, os.path.splitext(filename)[0])) as lock:
+            return _migrate(path, False, format_name, lock)
+    except OSError as e:
+        return path, "error", f"{type(e).__name__}: {e}"
+
+def _migrate(path, check, format_name, lock):
+    base, extension = os.path.splitext(path)
+    folder, save_name = os.path.split(base)
+    codec = save_codec.FORMATS[save_codec.EXTENSIONS[extension]]
+    journal_path = journal.journal_path(save_name, folder)
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+        save_data = codec.decode(raw)
+        version = save_schema.detect_version(save_data)
+        save_data = save_schema.upgrade(save_data)
+        # Sama seperti journal.recover: hanya baris yang dicap revisi save ini
+        revision = lock.read() if lock else read_revision(lock_path(folder, save_name))
+        replayed = journal.replay(save_data, journal_path, revision)
+        errors = save_schema.validate(save_data)
+    except Exception as e:
+        return path, "error", f"{type(e).__name__}: {e}"
+
+    if errors:
+        return path, "invalid", "; ".join(errors)
+
+    target = save_codec.get_codec(format_name) if format_name else codec
+    new_raw = target.encode(save_data)
+    if new_raw == raw:
+        return path, "ok", ""
+    detail = f"versi {version}" if version == save_schema.CURRENT_VERSION else \
+        f"versi {version} -> {save_schema.CURRENT_VERSION}"
+    if replayed:
+        detail += f", {replayed} baris journal digabung"
+    if check:
+        return path, "outdated", detail
+
+    target_path = base + target.extension
+    try:
+        lock.write(revision + 1)
+        atomic_write(target_path, new_raw, mode=stat.S_IMODE(os.stat(path).st_mode))
+        if target_path != path:
+            os.remove(path)
+        if replayed:
+            # Crash sebelum ini aman: baris lama tercap revisi sebelumnya
+            os.truncate(journal_path, 0)
+    except OSError as e:
+        return path, "error", f"{type(e).__name__}: {e}"
+    return path, "upgraded", detail
+
+def _migrate_batch(args):
+    paths, check, format_name = args
+    return [migrate_file(path, check, format_name) for path in paths]
+
+def _batches(paths, size):
+    batch = []
+    for path in paths:
+        batch.append(path)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def migrate_tree(root, check=False, format_name=None, workers=None, batch_size=BATCH_SIZE):
+    """Jalankan migrate_file untuk semua save di root, hasilnya di-yield per file"""
+    workers = workers or os.cpu_count() or 1
+    batches = _batches(iter_save_files(root), batch_size)
+    if workers == 1:
+        for batch in batches:
+            yield from _migrate_batch((batch, check, format_name))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for batch in batches:
+            pending.add(pool.submit(_migrate_batch, (batch, check, format_name)))
+            # Batasi batch yang sedang jalan supaya path tidak menumpuk di memori
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+        for future in pending:
+            yield from future.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validasi dan upgrade massal file save")
+    parser.add_argument("root", nargs="?", default="saves", help="folder save (ditelusuri rekursif)")
+    parser.add_argument("--check", action="store_true", help="hanya validasi, jangan tulis ulang")
+    parser.add_argument("--format", choices=list(save_codec.FORMATS), default=None,
+                        help="tulis ulang ke format ini (default: format asal file)")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: semua core)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    counts = Counter()
+    for path, status, detail in migrate_tree(args.root, args.check, args.format, args.workers, args.batch_size):
+        counts[status] += 1
+        if status in ("invalid", "error"):
+            print(f"❌ {path}: {detail}")
+        elif status == "outdated":
+            print(f"⚠️  {path}: {detail}")
+    elapsed = time.perf_counter() - start
+
+    total = sum(counts.values())
+    print(f"\n{total} file dalam {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f}/s)")
+    for status in ("ok", "upgraded", "outdated", "invalid", "error"):
+        if counts[status]:
+            print(f"  {status}: {counts[status]}")
+    return 1 if counts["invalid"] or counts["error"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
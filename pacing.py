@@ -0,0 +1,52 @@
+"""Pengaturan jeda permainan: realtime, accelerated, atau instant"""
+import os
+import sys
+import time
+
+MODES = {
+    "realtime": 1.0,
+    "accelerated": 0.25,
+    "instant": 0.0,
+}
+
+class Pacing:
+    """Kebijakan jeda. factor mengalikan setiap durasi sleep"""
+    def __init__(self, mode="realtime", factor=None):
+        if mode not in MODES:
+            raise ValueError(f"Mode pacing tidak dikenal: {mode} (pilih: {', '.join(MODES)})")
+        self.mode = mode
+        self.factor = MODES[mode] if factor is None else factor
+
+    def sleep(self, detik):
+        if self.factor > 0:
+            time.sleep(detik * self.factor)
+
+def _from_env():
+    # Nilai env yang salah tidak boleh membuat import gagal (server, simulator, game)
+    mode = os.environ.get("ADVENTURE_PACING", "realtime")
+    try:
+        return Pacing(mode)
+    except ValueError as e:
+        print(f"⚠️  ADVENTURE_PACING diabaikan: {e}", file=sys.stderr)
+        return Pacing("realtime")
+
+_current = _from_env()
+
+def get_pacing():
+    """Pacing default proses ini. Battle dan GameSession bisa memakai pacer sendiri"""
+    return _current
+
+def set_pacing(mode, factor=None):
+    """Ganti pacing aktif, misal dari argumen --pacing saat startup"""
+    global _current
+    _current = mode if isinstance(mode, Pacing) else Pacing(mode, factor)
+    return _current
+
+def sleep(detik):
+    """Jeda sesuai pacing aktif"""
+    _current.sleep(detik)
+
+def add_argument(parser):
+    """Tambahkan opsi --pacing ke argparse parser"""
+    parser.add_argument("--pacing", choices=list(MODES), default=None,
+                        help="kecepatan jeda (default: env ADVENTURE_PACING atau realtime)")
@@ -0,0 +1,378 @@
+"""Format file save: JSON (lama) dan biner ringkas berversi
+
+Codec bekerja pada dict save yang sama dengan JSON:
+{"chapter": int, "players": [dict pemain, ...]}. Format dipilih dengan
+nama ("json" atau "binary"), file lama .json tetap bisa dibaca.
+
+Layout biner versi 3 (little endian):
+    b"ADVS" | versi u8 | chapter u16 | jumlah pemain u8
+    per pemain: nama | role | stat (struct STATS) | skills | potions | bombs
+                | senjata terpasang | armor terpasang | inventory senjata | inventory armor
+                | status effect (jumlah u8, lalu nama | tipe | struct EFFECT)
+String ditulis sebagai panjang u8 + UTF-8. Role, skill dan item ditulis
+sebagai ID kecil dari tabel intern di bawah; nilai di luar tabel ditulis
+sebagai ID 0xFF/0xFFFF lalu string. Item terpasang yang kosong = 0xFFFE.
+Versi lama masih bisa dibaca: versi 1 (tanpa equipment) menjadi skema
+save 2, versi 2 (tanpa status effect) menjadi skema 3. Versi 3 selalu
+menyimpan skema save terbaru (lihat save_schema).
+
+read_header() hanya mengambil ringkasan (chapter, nama/role/level pemain)
+untuk daftar save dan matchmaking. Di format biner bagian lain file
+dilompati tanpa di-decode.
+"""
+import json
+import os
+import struct
+from itertools import islice
+
+from save_schema import CURRENT_VERSION, detect_version
+
+MAGIC = b"ADVS"
+# Layout versi terbaru menyimpan skema CURRENT_VERSION. Kalau skema naik,
+# layout (dan VERSION) harus ikut diubah; encode() menolak dict skema lain
+VERSION = 3
+
+# Tabel intern. Hanya boleh ditambah di belakang, urutan adalah format file
+ROLES = ("Warrior", "Archer")
+SKILL_NAMES = ("SLASH", "POWER_STRIKE", "MAGIC_BOLT", "HEAL", "POISON_STRIKE", "ARROW_SHOT", "MULTI_SHOT")
+ITEM_NAMES = (
+    "Health Potion", "Greater Health Potion", "Rage Potion", "Weaken Potion",
+    "Fire Bomb", "Ice Bomb",
+    "Iron Sword", "Steel Sword", "Wooden Bow", "Steel Bow", "Iron Plate", "Steel Plate",
+)
+
+STAT_FIELDS = ("level", "exp", "exp_max", "hp", "hp_max", "mp", "mp_max",
+               "attack", "defense", "magic", "agility", "gold")
+STATS = struct.Struct("<H I I i I i I H H H H I")
+HEADER = struct.Struct("<4s B H B")
+# nilai, durasi, sisa
+EFFECT = struct.Struct("<h B B")
+
+_ROLE_ID = {nama: idx for idx, nama in enumerate(ROLES)}
+_SKILL_ID = {nama: idx for idx, nama in enumerate(SKILL_NAMES)}
+_ITEM_ID = {nama: idx for idx, nama in enumerate(ITEM_NAMES)}
+_U8 = struct.Struct("<B")
+_ITEM = struct.Struct("<H H")
+_U16 = struct.Struct("<H")
+_NO_ITEM = 0xFFFE
+
+def header_of(save_data):
+    """Ringkasan dari dict save versi mana pun: {"chapter", "players": [{"nama", "role", "level"}]}"""
+    players = save_data["players"] if "players" in save_data else [save_data]
+    return {
+        "chapter": save_data["chapter"],
+        "players": [
+            {"nama": p["nama"], "role": p.get("role", "Warrior"), "level": p["level"]}
+            for p in players
+        ],
+    }
+
+class JsonCodec:
+    extension = ".json"
+
+    def encode(self, save_data):
+        return json.dumps(save_data, indent=2).encode("utf-8")
+
+    def decode(self, raw):
+        return json.loads(raw)
+
+    def read_header(self, raw):
+        return header_of(json.loads(raw))
+
+class BinaryCodec:
+    extension = ".sav"
+
+    def encode(self, save_data):
+        if detect_version(save_data) != CURRENT_VERSION:
+            raise ValueError(f"Save biner versi {VERSION} hanya untuk skema {CURRENT_VERSION}, "
+                             f"upgrade dulu (save_schema.upgrade)")
+        players = save_data["players"]
+        parts = [HEADER.pack(MAGIC, VERSION, save_data["chapter"], len(players))]
+        for player in players:
+            parts.append(_pack_str(player["nama"]))
+            parts.append(_pack_id(_ROLE_ID, player["role"]))
+            parts.append(STATS.pack(*[player[field] for field in STAT_FIELDS]))
+            parts.append(_U8.pack(len(player["skills"])))
+            parts.extend(_pack_id(_SKILL_ID, skill) for skill in player["skills"])
+            parts.append(_pack_items(player["potions"]))
+            parts.append(_pack_items(player["bombs"]))
+            parts.append(_pack_item_id(player.get("equipped_weapon")))
+            parts.append(_pack_item_id(player.get("equipped_armor")))
+            for field in ("weapon_inventory", "armor_inventory"):
+                inventory = player.get(field, [])
+                parts.append(_U8.pack(len(inventory)))
+                parts.extend(_pack_item_id(nama) for nama in inventory)
+            effects = player.get("status_effects", [])
+            parts.append(_U8.pack(len(effects)))
+            for effect in effects:
+                parts.append(_pack_str(effect["nama"]))
+                parts.append(_pack_str(effect["tipe"]))
+                parts.append(EFFECT.pack(effect["nilai"], effect["durasi"], effect["sisa"]))
+        return b"".join(parts)
+
+    def decode(self, raw):
+        view = memoryview(raw)
+        magic, version, chapter, count = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError("Bukan file save biner")
+        if not 1 <= version <= VERSION:
+            raise ValueError(f"Versi save biner tidak didukung: {version}")
+
+        offset = HEADER.size
+        players = []
+        for _ in range(count):
+            nama, offset = _unpack_str(view, offset)
+            role, offset = _unpack_id(view, offset, ROLES)
+            player = {"nama": nama, "role": role}
+            player.update(zip(STAT_FIELDS, STATS.unpack_from(view, offset)))
+            offset += STATS.size
+
+            skill_count = view[offset]
+            offset += 1
+            skills = []
+            for _ in range(skill_count):
+                skill, offset = _unpack_id(view, offset, SKILL_NAMES)
+                skills.append(skill)
+            player["skills"] = skills
+            player["potions"], offset = _unpack_items(view, offset)
+            player["bombs"], offset = _unpack_items(view, offset)
+            if version >= 2:
+                player["equipped_weapon"], offset = _unpack_item_id(view, offset)
+                player["equipped_armor"], offset = _unpack_item_id(view, offset)
+                for field in ("weapon_inventory", "armor_inventory"):
+                    count_items = view[offset]
+                    offset += 1
+                    inventory = []
+                    for _ in range(count_items):
+                        nama, offset = _unpack_item_id(view, offset)
+                        inventory.append(nama)
+                    player[field] = inventory
+            if version >= 3:
+                count_effects = view[offset]
+                offset += 1
+                effects = []
+                for _ in range(count_effects):
+                    nama, offset = _unpack_str(view, offset)
+                    tipe, offset = _unpack_str(view, offset)
+                    nilai, durasi, sisa = EFFECT.unpack_from(view, offset)
+                    offset += EFFECT.size
+                    effects.append({"nama": nama, "tipe": tipe, "nilai": nilai, "durasi": durasi, "sisa": sisa})
+                player["status_effects"] = effects
+            players.append(player)
+        if version == 1:
+            return {"chapter": chapter, "players": players}
+        if version == 2:
+            return {"schema_version": 3, "chapter": chapter, "players": players}
+        return {"schema_version": CURRENT_VERSION, "chapter": chapter, "players": players}
+
+    def read_header(self, raw):
+        view = memoryview(raw)
+        magic, version, chapter, count = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError("Bukan file save biner")
+        if not 1 <= version <= VERSION:
+            raise ValueError(f"Versi save biner tidak didukung: {version}")
+
+        offset = HEADER.size
+        players = []
+        for idx in range(count):
+            nama, offset = _unpack_str(view, offset)
+            role, offset = _unpack_id(view, offset, ROLES)
+            (level,) = _U16.unpack_from(view, offset)
+            players.append({"nama": nama, "role": role, "level": level})
+            if idx < count - 1:
+                offset = _skip_player_rest(view, offset + STATS.size, version)
+        return {"chapter": chapter, "players": players}
+
+def _pack_str(text):
+    data = text.encode("utf-8")
+    if len(data) > 255:
+        raise ValueError(f"String terlalu panjang untuk save biner: {text[:20]}...")
+    return _U8.pack(len(data)) + data
+
+def _unpack_str(view, offset):
+    length = view[offset]
+    end = offset + 1 + length
+    return str(view[offset + 1:end], "utf-8"), end
+
+def _pack_id(ids, nama):
+    if nama in ids:
+        return _U8.pack(ids[nama])
+    return _U8.pack(0xFF) + _pack_str(nama)
+
+def _unpack_id(view, offset, names):
+    idx = view[offset]
+    if idx == 0xFF:
+        return _unpack_str(view, offset + 1)
+    return names[idx], offset + 1
+
+def _pack_item_id(nama):
+    if nama is None:
+        return _U16.pack(_NO_ITEM)
+    if nama in _ITEM_ID:
+        return _U16.pack(_ITEM_ID[nama])
+    return _U16.pack(0xFFFF) + _pack_str(nama)
+
+def _unpack_item_id(view, offset):
+    (idx,) = _U16.unpack_from(view, offset)
+    offset += _U16.size
+    if idx == _NO_ITEM:
+        return None, offset
+    if idx == 0xFFFF:
+        return _unpack_str(view, offset)
+    return ITEM_NAMES[idx], offset
+
+def _skip_str(view, offset):
+    return offset + 1 + view[offset]
+
+def _skip_id(view, offset):
+    return _skip_str(view, offset + 1) if view[offset] == 0xFF else offset + 1
+
+def _skip_item_id(view, offset):
+    (idx,) = _U16.unpack_from(view, offset)
+    return _skip_str(view, offset + 2) if idx == 0xFFFF else offset + 2
+
+def _skip_player_rest(view, offset, version):
+    """Offset pemain berikutnya, mulai dari setelah blok stat"""
+    count = view[offset]
+    offset += 1
+    for _ in range(count):
+        offset = _skip_id(view, offset)
+    for _ in range(2):  # potions, bombs
+        count = view[offset]
+        offset += 1
+        for _ in range(count):
+            (idx,) = _U16.unpack_from(view, offset)
+            offset += _ITEM.size
+            if idx == 0xFFFF:
+                offset = _skip_str(view, offset)
+    if version >= 2:
+        offset = _skip_item_id(view, offset)
+        offset = _skip_item_id(view, offset)
+        for _ in range(2):  # inventory senjata, armor
+            count = view[offset]
+            offset += 1
+            for _ in range(count):
+                offset = _skip_item_id(view, offset)
+    if version >= 3:
+        count = view[offset]
+        offset += 1
+        for _ in range(count):
+            offset = _skip_str(view, offset)
+            offset = _skip_str(view, offset) + EFFECT.size
+    return offset
+
+def _pack_items(items):
+    parts = [_U8.pack(len(items))]
+    for nama, jumlah in items.items():
+        if nama in _ITEM_ID:
+            parts.append(_ITEM.pack(_ITEM_ID[nama], jumlah))
+        else:
+            parts.append(_ITEM.pack(0xFFFF, jumlah) + _pack_str(nama))
+    return b"".join(parts)
+
+def _unpack_items(view, offset):
+    count = view[offset]
+    offset += 1
+    items = {}
+    for _ in range(count):
+        idx, jumlah = _ITEM.unpack_from(view, offset)
+        offset += _ITEM.size
+        if idx == 0xFFFF:
+            nama, offset = _unpack_str(view, offset)
+        else:
+            nama = ITEM_NAMES[idx]
+        items[nama] = jumlah
+    return items, offset
+
+FORMATS = {
+    "json": JsonCodec(),
+    "binary": BinaryCodec(),
+}
+EXTENSIONS = {codec.extension: nama for nama, codec in FORMATS.items()}
+
+_default_format = os.environ.get("ADVENTURE_SAVE_FORMAT", "json")
+
+def get_codec(format_name=None):
+    """Codec untuk nama format, default dari env ADVENTURE_SAVE_FORMAT atau json"""
+    format_name = format_name or _default_format
+    if format_name not in FORMATS:
+        raise ValueError(f"Format save tidak dikenal: {format_name} (pilih: {', '.join(FORMATS)})")
+    return FORMATS[format_name]
+
+def set_default_format(format_name):
+    """Ganti format default, misal dari argumen --save-format saat startup"""
+    global _default_format
+    get_codec(format_name)
+    _default_format = format_name
+
+def save_path(folder, save_name, format_name=None):
+    return os.path.join(folder, save_name + get_codec(format_name).extension)
+
+def find_save(folder, save_name):
+    """(path, codec) file save terbaru untuk nama ini, atau (None, None)"""
+    found = []
+    for extension, format_name in EXTENSIONS.items():
+        path = os.path.join(folder, save_name + extension)
+        try:
+            found.append((os.stat(path).st_mtime_ns, path, FORMATS[format_name]))
+        except FileNotFoundError:
+            pass
+    if not found:
+        return None, None
+    _, path, codec = max(found, key=lambda entry: entry[0])
+    return path, codec
+
+def read_header(path):
+    """Ringkasan satu file save (lihat header_of), format dari ekstensi"""
+    codec = FORMATS[EXTENSIONS[os.path.splitext(path)[1]]]
+    with open(path, "rb") as f:
+        return codec.read_header(f.read())
+
+def scan_headers(folder, offset=0, limit=None):
+    """(nama save, header atau None kalau rusak) per save di folder, per halaman
+
+    Folder dibaca bertahap dengan os.scandir, urutan mengikuti direktori.
+    Kalau satu nama ada dalam beberapa format, hanya file terbaru yang dipakai.
+    """
+    def entries():
+        try:
+            it = os.scandir(folder)
+        except FileNotFoundError:
+            return
+        with it:
+            for dir_entry in it:
+                save_name, extension = os.path.splitext(dir_entry.name)
+                if extension not in EXTENSIONS:
+                    continue
+                if any(other != extension and os.path.exists(os.path.join(folder, save_name + other))
+                       for other in EXTENSIONS):
+                    if find_save(folder, save_name)[0] != dir_entry.path:
+                        continue
+                yield save_name, dir_entry.path
+
+    for save_name, path in islice(entries(), offset, None if limit is None else offset + limit):
+        try:
+            yield save_name, read_header(path)
+        except Exception:
+            yield save_name, None
+
+def list_saves(folder):
+    """Nama save unik di folder, semua format"""
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return []
+    saves = []
+    seen = set()
+    for filename in names:
+        save_name, extension = os.path.splitext(filename)
+        if extension in EXTENSIONS and save_name not in seen:
+            seen.add(save_name)
+            saves.append(save_name)
+    return saves
+
+def add_argument(parser):
+    """Tambahkan opsi --save-format ke argparse parser"""
+    parser.add_argument("--save-format", choices=list(FORMATS), default=None,
+                        help="format file save (default: env ADVENTURE_SAVE_FORMAT atau json)")
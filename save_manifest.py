@@ -0,0 +1,115 @@
+"""Index ringkasan save file, supaya menu load tidak membuka setiap save
+
+Manifest disimpan di <folder>/.manifest (JSON) dengan satu entry per nama
+save: file, mtime_ns, nama pemain, chapter dan level tertinggi. save_game
+memperbarui entry-nya di memori; refresh() hanya membaca ulang save yang
+mtime-nya berubah sejak terakhir diindex, lalu menulis manifest.
+"""
+import json
+import os
+import threading
+
+import save_codec
+import storage
+
+MANIFEST_NAME = ".manifest"
+MANIFEST_VERSION = 1
+
+def summarize(save_data):
+    """Field manifest dari dict save atau header (save_codec.read_header)"""
+    players = save_data["players"]
+    return {
+        "players": [p["nama"] for p in players],
+        "chapter": save_data["chapter"],
+        "level": max((p["level"] for p in players), default=0),
+    }
+
+class SaveManifest:
+    def __init__(self, folder="saves"):
+        self.folder = folder
+        self.path = os.path.join(folder, MANIFEST_NAME)
+        self.entries = {}
+        self.dirty = False
+        # record() bisa dipanggil dari thread lain saat refresh() berjalan
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data["entries"]
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+
+    def flush(self):
+        """Tulis manifest kalau ada perubahan (file sementara unik lalu rename)"""
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.dirty:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        data = json.dumps({"version": MANIFEST_VERSION, "entries": self.entries})
+        # Nama sementara unik: beberapa proses boleh flush bersamaan
+        storage.atomic_write(self.path, data.encode("utf-8"), sync=False)
+        self.dirty = False
+
+    def record(self, save_name, path, save_data):
+        """Catat save yang baru ditulis, tanpa membaca ulang filenya"""
+        entry = summarize(save_data)
+        entry["file"] = os.path.basename(path)
+        entry["mtime_ns"] = os.stat(path).st_mtime_ns
+        with self.lock:
+            self.entries[save_name] = entry
+            self.dirty = True
+
+    def _scan(self):
+        """Nama save -> (mtime_ns, nama file) terbaru di folder"""
+        newest = {}
+        try:
+            with os.scandir(self.folder) as it:
+                for dir_entry in it:
+                    save_name, extension = os.path.splitext(dir_entry.name)
+                    if extension not in save_codec.EXTENSIONS:
+                        continue
+                    mtime_ns = dir_entry.stat().st_mtime_ns
+                    if save_name not in newest or mtime_ns > newest[save_name][0]:
+                        newest[save_name] = (mtime_ns, dir_entry.name)
+        except FileNotFoundError:
+            pass
+        return newest
+
+    def _index(self, filename, mtime_ns):
+        entry = {"file": filename, "mtime_ns": mtime_ns, "players": None, "chapter": None, "level": None}
+        try:
+            entry.update(summarize(save_codec.read_header(os.path.join(self.folder, filename))))
+        except Exception:
+            pass
+        return entry
+
+    def refresh(self):
+        """Sinkronkan dengan isi folder, hanya parse save yang berubah"""
+        newest = self._scan()
+        with self.lock:
+            for save_name in list(self.entries):
+                if save_name not in newest:
+                    del self.entries[save_name]
+                    self.dirty = True
+            for save_name, (mtime_ns, filename) in newest.items():
+                entry = self.entries.get(save_name)
+                if entry is None or entry["mtime_ns"] != mtime_ns or entry["file"] != filename:
+                    self.entries[save_name] = self._index(filename, mtime_ns)
+                    self.dirty = True
+            self._flush()
+            return dict(self.entries)
+
+_manifests = {}
+
+def get_manifest(folder="saves"):
+    """Manifest bersama untuk folder ini dalam proses ini"""
+    if folder not in _manifests:
+        _manifests[folder] = SaveManifest(folder)
+    return _manifests[folder]
@@ -0,0 +1,111 @@
+"""Versi skema dict save, upgrade bertahap dan validasi
+
+Versi:
+    1  Adventure.py lama: satu pemain, field pemain langsung di root, tanpa role
+    2  Adventure_v2 awal: {"chapter", "players": [...]} dengan role dan bombs
+    3  versi 2 + "schema_version", senjata/armor terpasang dan inventory
+       (disimpan sebagai nama item katalog)
+    4  versi 3 + "status_effects" per pemain: [{"nama", "tipe", "nilai",
+       "durasi", "sisa"}]
+Save tanpa "schema_version" dikenali dari bentuknya.
+"""
+from skills import SkillType
+
+CURRENT_VERSION = 4
+
+PLAYER_INT_FIELDS = ("level", "exp", "exp_max", "hp", "hp_max", "mp", "mp_max",
+                     "attack", "defense", "magic", "agility", "gold")
+
+def detect_version(save_data):
+    if "schema_version" in save_data:
+        return save_data["schema_version"]
+    if "players" in save_data:
+        return 2
+    return 1
+
+def _upgrade_1(save_data):
+    player = {key: value for key, value in save_data.items() if key != "chapter"}
+    player.setdefault("role", "Warrior")
+    player.setdefault("bombs", {})
+    return {"chapter": save_data["chapter"], "players": [player]}
+
+def _upgrade_2(save_data):
+    players = []
+    for player in save_data["players"]:
+        player = dict(player)
+        player.setdefault("equipped_weapon", None)
+        player.setdefault("equipped_armor", None)
+        player.setdefault("weapon_inventory", [])
+        player.setdefault("armor_inventory", [])
+        players.append(player)
+    return {"schema_version": 3, "chapter": save_data["chapter"], "players": players}
+
+def _upgrade_3(save_data):
+    players = [dict(player, status_effects=player.get("status_effects", [])) for player in save_data["players"]]
+    return {"schema_version": 4, "chapter": save_data["chapter"], "players": players}
+
+# versi -> fungsi upgrade ke versi berikutnya
+UPGRADES = {
+    1: _upgrade_1,
+    2: _upgrade_2,
+    3: _upgrade_3,
+}
+
+def upgrade(save_data):
+    """Dict save dalam CURRENT_VERSION. Dict yang sudah terbaru dikembalikan apa adanya"""
+    version = detect_version(save_data)
+    if not isinstance(version, int) or version > CURRENT_VERSION:
+        raise ValueError(f"Versi skema save tidak didukung: {version}")
+    while version < CURRENT_VERSION:
+        save_data = UPGRADES[version](save_data)
+        version = detect_version(save_data)
+    return save_data
+
+def validate(save_data):
+    """Daftar pesan error untuk dict save versi terbaru, kosong kalau valid"""
+    if not isinstance(save_data, dict):
+        return [f"save bukan dict: {type(save_data).__name__}"]
+    errors = []
+    if detect_version(save_data) != CURRENT_VERSION:
+        errors.append(f"schema_version bukan {CURRENT_VERSION}")
+    chapter = save_data.get("chapter")
+    if not isinstance(chapter, int) or chapter < 1:
+        errors.append(f"chapter tidak valid: {chapter!r}")
+    players = save_data.get("players")
+    if not isinstance(players, list) or not players:
+        errors.append("players kosong")
+        return errors
+
+    for idx, player in enumerate(players):
+        prefix = f"players[{idx}]"
+        if not isinstance(player, dict):
+            errors.append(f"{prefix} bukan dict: {type(player).__name__}")
+            continue
+        if not isinstance(player.get("nama"), str) or not player.get("nama"):
+            errors.append(f"{prefix}.nama kosong")
+        if not isinstance(player.get("role"), str):
+            errors.append(f"{prefix}.role tidak ada")
+        for field in PLAYER_INT_FIELDS:
+            if not isinstance(player.get(field), int):
+                errors.append(f"{prefix}.{field} bukan angka: {player.get(field)!r}")
+        if isinstance(player.get("hp_max"), int) and isinstance(player.get("hp"), int) and player["hp"] > player["hp_max"]:
+            errors.append(f"{prefix}.hp melebihi hp_max")
+        skills = player.get("skills")
+        if not isinstance(skills, list):
+            errors.append(f"{prefix}.skills bukan list")
+        else:
+            errors.extend(f"{prefix}.skills: skill tidak dikenal {s!r}" for s in skills if s not in SkillType.__members__)
+        for field in ("potions", "bombs"):
+            items = player.get(field)
+            if not isinstance(items, dict) or not all(isinstance(n, int) and n >= 0 for n in items.values()):
+                errors.append(f"{prefix}.{field} tidak valid")
+        for field in ("weapon_inventory", "armor_inventory"):
+            if not isinstance(player.get(field), list):
+                errors.append(f"{prefix}.{field} bukan list")
+        effects = player.get("status_effects")
+        if not isinstance(effects, list) or not all(
+            isinstance(e, dict) and isinstance(e.get("nilai"), int) and isinstance(e.get("sisa"), int)
+            for e in effects
+        ):
+            errors.append(f"{prefix}.status_effects tidak valid")
+    return errors
@@ -0,0 +1,143 @@
+"""Host sesi asyncio: banyak game berjalan di satu event loop
+
+Protokol JSON-lines lokal sebagai pengganti platform chat. Setiap baris
+dari client berisi {"session": "<id>", "text": "<pesan>"} dan dibalas
+satu baris {"session": "<id>", "output": ["...", ...]}. Pesan pertama
+untuk sesi baru membuka layar judul. Kalau pesan berisi "id", nilainya
+ikut di balasan.
+
+Client boleh mengirim banyak pesan tanpa menunggu balasan (pipelining).
+Server mengambil semua baris lengkap yang sudah tiba sebagai satu batch,
+memprosesnya berurutan (dengan --workers: paralel antar worker) lalu
+menulis semua balasannya sekaligus, tetap dalam urutan pesan.
+
+Jumlah sesi di memori dibatasi --max-sessions; sesi yang lama diam
+di-hibernate ke saves/sessions/ dan dipulihkan saat pesan berikutnya
+datang (lihat hibernation.py).
+
+    python server.py --port 8765 --max-sessions 5000
+    python server.py --unix /tmp/adventure.sock
+"""
+import argparse
+import asyncio
+import json
+import traceback
+
+import autosave
+from hibernation import SessionCache
+
+MAX_LINE = 64 * 1024
+READ_SIZE = 64 * 1024
+
+class SessionHost:
+    """Semua sesi, dipetakan dari id sesi (yang aktif di memori dibatasi LRU)"""
+    def __init__(self, max_sessions=1000, cache=None):
+        self.sessions = cache if cache is not None else SessionCache(max_sessions)
+
+    def handle(self, session_id, text):
+        """Teruskan satu pesan ke sesinya, buat sesi baru kalau belum ada"""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return self.sessions.create(session_id).start()
+        return session.handle(text)
+
+    def handle_message(self, message):
+        """Pesan JSON (dict) ke balasan JSON (dict)"""
+        try:
+            session_id = str(message["session"])
+            text = str(message.get("text", ""))
+        except (KeyError, TypeError, AttributeError):
+            return {"error": "pesan harus berisi 'session' dan 'text'"}
+        try:
+            reply = {"session": session_id, "output": self.handle(session_id, text)}
+        except Exception as e:
+            traceback.print_exc()
+            reply = {"session": session_id, "error": str(e)}
+        if "id" in message:
+            reply["id"] = message["id"]
+        return reply
+
+    def handle_messages(self, messages):
+        """Balasan untuk daftar pesan, urutannya sama dengan pesan"""
+        return [self.handle_message(message) for message in messages]
+
+    async def handle_messages_async(self, messages):
+        return self.handle_messages(messages)
+
+    async def handle_client(self, reader, writer):
+        """Satu koneksi client: baca batch baris JSON, balas batch baris JSON"""
+        pending = b""
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                lines = (pending + data).split(b"\n")
+                pending = lines.pop()
+                # Baris lengkap di chunk ini tetap dibalas sebelum baris yang terlalu panjang ditolak
+                replies = await self._handle_lines([line for line in lines if line.strip()])
+                if replies:
+                    writer.write("".join(json.dumps(reply, ensure_ascii=False) + "\n" for reply in replies).encode())
+                    await writer.drain()
+                if len(pending) > MAX_LINE:
+                    writer.write(b'{"error": "baris terlalu panjang"}\n')
+                    await writer.drain()
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_lines(self, lines):
+        messages = []
+        invalid = {}
+        for idx, line in enumerate(lines):
+            try:
+                messages.append(json.loads(line))
+            except ValueError:
+                invalid[idx] = {"error": "JSON tidak valid"}
+        results = iter(await self.handle_messages_async(messages) if messages else [])
+        return [invalid[idx] if idx in invalid else next(results) for idx in range(len(lines))]
+
+    def close(self):
+        """Hibernate semua sesi dan tunggu autosave yang antre, dipanggil saat server berhenti"""
+        self.sessions.hibernate_all()
+        autosave.flush()
+
+async def serve(host="127.0.0.1", port=8765, session_host=None, unix_path=None):
+    """Jalankan server JSON-lines (TCP, atau Unix socket kalau unix_path) sampai dihentikan"""
+    session_host = session_host or SessionHost()
+    if unix_path:
+        server = await asyncio.start_unix_server(session_host.handle_client, unix_path)
+        print(f"🤖 Server berjalan di {unix_path}")
+    else:
+        server = await asyncio.start_server(session_host.handle_client, host, port)
+        print(f"🤖 Server berjalan di {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        session_host.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server sesi Shadow of Narcotics (JSON-lines)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="dengarkan di Unix socket ini, bukan TCP")
+    parser.add_argument("--max-sessions", type=int, default=1000,
+                        help="sesi maksimal di memori, sisanya di-hibernate ke disk")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="jumlah proses worker; lebih dari 1 membagi sesi ke beberapa core (lihat shards.py)")
+    args = parser.parse_args(argv)
+    if args.workers > 1:
+        from shards import ShardedHost
+        session_host = ShardedHost(args.workers, args.max_sessions)
+    else:
+        session_host = SessionHost(args.max_sessions)
+    try:
+        asyncio.run(serve(args.host, args.port, session_host, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,590 @@
+"""Sesi permainan berbasis pesan untuk bot
+
+GameSession menyimpan state satu pemain (party, chapter, battle yang
+sedang berjalan) dan menerima input sebagai pesan teks lewat handle().
+Setiap pesan langsung mengembalikan daftar baris output, tanpa input(),
+print() atau sleep, jadi ribuan sesi bisa berjalan di satu event loop.
+
+Alur game adalah state machine eksplisit: self.state menunjuk handler
+_state_<nama> untuk pesan berikutnya, transisi lewat _enter()/_pause().
+to_dict()/from_dict() menyimpan seluruh state di antara dua pesan
+(termasuk battle yang sedang berjalan), jadi sesi bisa dihentikan dan
+dilanjutkan kapan saja. Game konsol (Adventure_v2.game_utama) menjalankan
+GameSession yang sama lewat input(), dan menjalankan self.beats (jeda yang
+disarankan di output terakhir) lewat self.pacer milik sesi itu, jadi sesi
+dalam satu proses bisa punya pacing berbeda; bot mengabaikannya.
+"""
+import random
+import re
+
+import pacing
+import storage
+from journal import Journal
+from skills import SkillType
+from Adventure_v2 import (
+    CHARACTER_CODEC, ENEMY_CODEC, Battle, BattleAction, Character,
+    CARAVAN_DEFEAT_TEXT, CARAVAN_STORY, CARAVAN_VICTORY_TEXT, CHAPTER_2_TEXT, CHAPTER_3_TEXT,
+    SHOP_CATALOG, SHOP_MENU, THUG_DEFEAT_TEXT,
+    buy_item, caravan_guards, explore_locations, intro_text, load_game, main_menu_lines,
+    recruit_santoso, save_game, save_list_lines, save_summaries, spawn_monster,
+    thug_encounter_text, thug_enemies, thug_victory_text,
+)
+
+SAVE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# Nama pemain masuk ke save biner dengan prefix panjang 1 byte (save_codec._pack_str)
+MAX_NAME_LENGTH = 32
+# Nama autosave sesi (journal + snapshot), tidak boleh dipakai untuk save manual
+AUTOSAVE_PREFIX = "autosave_"
+# Autosave journal game konsol (Adventure_v2.game_utama), sama terlarangnya untuk sesi lain
+CONSOLE_AUTOSAVE = "autosave"
+
+def autosave_name_for(session_id):
+    """Nama autosave unik per id sesi (lihat storage.safe_name)"""
+    return AUTOSAVE_PREFIX + storage.safe_name(session_id)
+
+def is_autosave_name(save_name):
+    """Nama yang dipakai journal autosave (sesi bot atau konsol)"""
+    return save_name == CONSOLE_AUTOSAVE or save_name.startswith(AUTOSAVE_PREFIX)
+
+TITLE_LINES = [
+    "\n" + "="*70,
+    "SHADOW OF NARCOTICS".center(70),
+    "="*70,
+    "\n[1] Game Baru",
+    "[2] Lanjutkan Game (Load Save)",
+    "[3] Keluar",
+    "\nPilihan (1-3):",
+]
+
+def _parse_index(text):
+    """Angka pilihan 1-based jadi index 0-based, None kalau bukan angka"""
+    try:
+        return int(text) - 1
+    except ValueError:
+        return None
+
+def _autosave_warning(error):
+    return [f"⚠️  Autosave gagal: {type(error).__name__}: {error}"]
+
+SESSION_FORMAT = 1
+
+class GameSession:
+    """State satu pemain yang digerakkan oleh pesan"""
+    def __init__(self, session_id, autosave_name=None, pacer=None):
+        self.session_id = session_id
+        self.players = []
+        self.chapter = 1
+        self.battle = None
+        self.battle_context = None
+        self.pending_action = None
+        self.pending_enemy = None
+        self.shop_player = None
+        self.shop_kategori = None
+        self.save_files = []
+        self.next_state = None
+        self.state = "title"
+        self.autosave_name = autosave_name or autosave_name_for(session_id)
+        self.journal = None
+        # Revisi save yang terakhir dibaca/ditulis sesi ini, untuk deteksi konflik
+        self.save_revisions = {}
+        # (nama save, revisi) yang menunggu konfirmasi timpa
+        self.pending_save = None
+        # Jeda output pesan terakhir: [(index baris, detik)], tidak disimpan
+        self.beats = []
+        # Pacing untuk beats (lihat pacing.py), tidak disimpan
+        self.pacer = pacer or pacing.get_pacing()
+
+    def start(self):
+        """Output pembuka sesi baru"""
+        self.state = "title"
+        return list(TITLE_LINES)
+
+    def to_dict(self):
+        """Seluruh state sesi sebagai dict JSON, aman dipanggil di antara dua pesan"""
+        action = self.pending_action
+        return {
+            "format": SESSION_FORMAT,
+            "session_id": self.session_id,
+            "autosave_name": self.autosave_name,
+            "state": self.state,
+            "next_state": self.next_state,
+            "chapter": self.chapter,
+            "players": [CHARACTER_CODEC.to_dict(player) for player in self.players],
+            "battle": self.battle.to_save_data(self.players) if self.battle else None,
+            "battle_context": self.battle_context,
+            "pending_action": {
+                "tipe": action.tipe, "skill": action.skill.name if action.skill else None,
+                "target": action.target, "item": action.item,
+            } if action else None,
+            "pending_enemy": ENEMY_CODEC.to_dict(self.pending_enemy) if self.pending_enemy else None,
+            "shop_player": next(i for i, p in enumerate(self.players) if p is self.shop_player)
+                           if self.shop_player else None,
+            "shop_kategori": self.shop_kategori,
+            "save_files": list(self.save_files),
+            "save_revisions": dict(self.save_revisions),
+            "pending_save": list(self.pending_save) if self.pending_save else None,
+            # Revisi snapshot journal, None kalau sesi belum punya journal. -1 kalau
+            # snapshot terakhir gagal ditulis: resume() pasti menulis snapshot baru
+            "journal": (-1 if self.journal.failed else self.journal.revision) if self.journal else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Lanjutkan sesi dari to_dict. Journal autosave dilanjutkan tanpa snapshot baru"""
+        if data.get("format") != SESSION_FORMAT:
+            raise ValueError(f"Format sesi tidak didukung: {data.get('format')}")
+        session = cls(data["session_id"], data["autosave_name"])
+        session.state = data["state"]
+        session.next_state = data["next_state"]
+        session.chapter = data["chapter"]
+        session.players = [CHARACTER_CODEC.from_dict(player) for player in data["players"]]
+        if data["battle"]:
+            session.battle = Battle.from_save_data(data["battle"], session.players)
+        session.battle_context = data["battle_context"]
+        action = data["pending_action"]
+        if action:
+            session.pending_action = BattleAction(
+                action["tipe"], SkillType[action["skill"]] if action["skill"] else None,
+                action["target"], action["item"],
+            )
+        if data["pending_enemy"]:
+            session.pending_enemy = ENEMY_CODEC.from_dict(data["pending_enemy"])
+        if data["shop_player"] is not None:
+            session.shop_player = session.players[data["shop_player"]]
+        session.shop_kategori = data["shop_kategori"]
+        session.save_files = data["save_files"]
+        session.save_revisions = data["save_revisions"]
+        if data.get("pending_save"):
+            session.pending_save = tuple(data["pending_save"])
+        revision = data["journal"]
+        if revision is not None and revision is not False:
+            session.journal = Journal(session.autosave_name)
+            # Sesi lama menyimpan True, bukan revisi
+            session.journal.resume(session.players, session.chapter,
+                                   None if revision is True else revision)
+        return session
+
+    def close(self):
+        """Catat perubahan terakhir lalu tutup journal sesi (misal sebelum hibernate)"""
+        if self.journal:
+            self._checkpoint("close")
+            self.journal.close()
+            self.journal = None
+
+    def handle(self, text):
+        """Proses satu pesan, kembalikan baris output"""
+        handler = getattr(self, f"_state_{self.state}")
+        self.beats = []
+        return handler(text.strip())
+
+    def sleep_beats(self, idx):
+        """Jalankan jeda sebelum baris idx output terakhir, sesuai self.pacer"""
+        for beat_idx, detik in self.beats:
+            if beat_idx == idx:
+                self.pacer.sleep(detik)
+
+    def _beat(self, lines, detik):
+        """Sarankan jeda sebelum baris berikutnya yang ditambahkan ke lines"""
+        self.beats.append((len(lines), detik))
+
+    def _pause(self, lines, next_state, prompt="Tekan ENTER..."):
+        """Tampilkan teks lalu tunggu pesan apa saja sebelum lanjut ke next_state"""
+        self.state = "pause"
+        self.next_state = next_state
+        return lines + [prompt]
+
+    def _state_pause(self, text):
+        return self._enter(self.next_state)
+
+    def _enter(self, state):
+        """Masuk ke state dan kembalikan output pembukanya"""
+        if state == "title":
+            return self.start()
+        if state == "thugs":
+            lines = ["\n" + "="*70, "⚠️  PERTAMA KALI BERTEMPUR ⚠️".center(70), "="*70,
+                     thug_encounter_text(self.players[0])]
+            return self._pause(lines, "thug_battle", "\nTekan ENTER untuk mulai pertempuran...")
+        if state == "thug_battle":
+            return self._start_battle(self.players[0], thug_enemies(), "thug")
+        if state == "menu":
+            self.state = "menu"
+            return main_menu_lines(self.players, self.chapter) + ["\nPilihan (1-5):"]
+        if state == "chapter_3":
+            self.chapter = 3
+            self.players.append(recruit_santoso())
+            lines = [CHAPTER_3_TEXT] + self._checkpoint("chapter")
+            return self._pause(lines, "caravan_route", "Tekan ENTER untuk lanjut...")
+        if state == "caravan_route":
+            return self._pause(["\n🗺️  Kamu dan Santoso menuju Jalanan Gelap..."], "caravan_battle")
+        if state == "caravan_battle":
+            return self._start_battle(self.players, caravan_guards(), "caravan", CARAVAN_STORY)
+        if state == "explore_battle":
+            fighters = self.players if self.chapter >= 3 else self.players[0]
+            enemy, self.pending_enemy = self.pending_enemy, None
+            return self._start_battle(fighters, enemy, "explore")
+        if state == "after_explore":
+            # Trigger Chapter 3 saat level cukup
+            if self.chapter == 2 and self.players[0].level >= 3:
+                return self._pause(["\n📬 Kamu menerima panggilan dari Ketua Shadow Guardians..."], "chapter_3")
+            return self._enter("menu")
+        raise ValueError(f"State tidak dikenal: {state}")
+
+    # ---- Layar judul dan game baru ----
+
+    def _state_title(self, text):
+        if text == "1":
+            self.state = "ask_name"
+            return ["\nSiapa namamu?"]
+        if text == "2":
+            # Autosave sesi lain tidak ditampilkan, hanya milik sesi ini
+            summaries = [summary for summary in save_summaries()
+                         if not is_autosave_name(summary[0]) or summary[0] == self.autosave_name]
+            if not summaries:
+                return ["\nPilihan (1-3):"]
+            self.save_files = [save for save, _, _ in summaries]
+            self.state = "load_pick"
+            return save_list_lines(summaries) + ["\nPilih save file (0 batal):"]
+        if text == "3":
+            self.state = "ended"
+            return ["Terima kasih sudah bermain!"]
+        return ["❌ Input tidak valid!", "\nPilihan (1-3):"]
+
+    def _state_load_pick(self, text):
+        idx = _parse_index(text)
+        if idx is None or not 0 <= idx < len(self.save_files):
+            self.state = "title"
+            return ["\nPilihan (1-3):"]
+
+        save_name = self.save_files[idx]
+        # Revisi dibaca sebelum load: kalau ada penulis di antaranya, akibatnya konflik, bukan menimpa
+        revision = storage.get_store().revision(save_name)
+        players, chapter = load_game(save_name, verbose=False)
+        if not players:
+            self.state = "title"
+            return ["❌ Save tidak bisa dimuat!", "\nPilihan (1-3):"]
+
+        self.players = players
+        self.chapter = chapter
+        self.save_revisions[save_name] = revision
+        lines = ["✅ Game dimuat!"] + [f"👤 {p.nama} ({p.role}) - Level {p.level}" for p in players]
+        lines += self._open_journal()
+        if chapter == 3:
+            return self._pause(lines + [CHAPTER_3_TEXT], "menu", "Tekan ENTER untuk lanjut...")
+        return lines + self._enter("menu")
+
+    def _state_ask_name(self, text):
+        if not text:
+            return ["❌ Nama tidak boleh kosong!", "\nSiapa namamu?"]
+        if len(text) > MAX_NAME_LENGTH:
+            return [f"❌ Nama maksimal {MAX_NAME_LENGTH} karakter!", "\nSiapa namamu?"]
+        self.players = [Character(text, role="Warrior")]
+        self.chapter = 1
+        lines = ["\n" + "="*70, "🌙 SHADOW OF NARCOTICS 🌙".center(70), "="*70,
+                 intro_text(text), "\n" + "="*70]
+        self._beat(lines, 2)
+        return self._pause(lines, "thugs")
+
+    def _state_ended(self, text):
+        self.close()
+        self.__init__(self.session_id, self.autosave_name, self.pacer)
+        return self.start()
+
+    # ---- Menu utama ----
+
+    def _state_menu(self, text):
+        if text == "1":
+            self.state = "explore"
+            lines = [f"\n{'='*60}", "🌍 JELAJAHI DUNIA".center(60), f"{'='*60}"]
+            lines += [f"[{idx}] {nama}" for idx, (nama, _) in enumerate(explore_locations(), 1)]
+            return lines + ["\nPilih lokasi (0 batal):"]
+        if text == "2":
+            return self._shop_lines()
+        if text == "3":
+            lines = []
+            for player in self.players:
+                lines.extend(player.status_lines())
+            return lines + ["\nPilihan (1-5):"]
+        if text == "4":
+            self.state = "save_name"
+            return [f"Nama save (default: {self.autosave_name}):"]
+        if text == "5":
+            self.state = "ended"
+            return ["\nTerima kasih sudah bermain!"]
+        return ["❌ Input tidak valid!", "\nPilihan (1-5):"]
+
+    def _state_save_name(self, text):
+        save_name = text or self.autosave_name
+        self.state = "menu"
+        if not SAVE_NAME_PATTERN.match(save_name):
+            return ["❌ Nama save tidak valid!", "\nPilihan (1-5):"]
+        if is_autosave_name(save_name) and save_name != self.autosave_name:
+            return [f"❌ Nama save {save_name} dipakai autosave!", "\nPilihan (1-5):"]
+        if save_name == self.autosave_name and self.journal:
+            # Save ke nama autosave sendiri: lewat journal supaya barisnya tetap berlaku.
+            # Save manual ditunggu sampai tertulis, tidak seperti checkpoint
+            self.journal.compact(self.players, self.chapter)
+            self.journal.flush()
+            if self.journal.failed:
+                return [f"❌ Gagal menyimpan: {self.journal.error}", "\nPilihan (1-5):"]
+            self.save_revisions[save_name] = self.journal.revision
+            return ["✅ Game disimpan!", "\nPilihan (1-5):"]
+        if save_name in self.save_revisions:
+            return self._save(save_name, self.save_revisions[save_name])
+        # Nama yang belum pernah dimuat/ditulis sesi ini harus belum ada. Revisi
+        # 0 tidak cukup: save lama tanpa file .lock (atau baris SQLite lama) juga 0
+        store = storage.get_store()
+        revision = store.revision(save_name)
+        if store.exists(save_name):
+            self.pending_save = (save_name, revision)
+            self.state = "save_overwrite"
+            return [f"⚠️  Save {save_name} sudah ada.", "Timpa? (y/n):"]
+        return self._save(save_name, revision)
+
+    def _save(self, save_name, expected_revision):
+        try:
+            self.save_revisions[save_name] = save_game(
+                self.players, self.chapter, save_name, verbose=False,
+                expected_revision=expected_revision,
+            )
+        except storage.SaveConflict as e:
+            # Menimpa save orang lain atau versi yang lebih baru harus dikonfirmasi
+            self.pending_save = (save_name, e.actual)
+            self.state = "save_overwrite"
+            if save_name in self.save_revisions:
+                return [f"⚠️  Save {save_name} sudah diubah di tempat lain sejak kamu muat/simpan.",
+                        "Timpa? (y/n):"]
+            return [f"⚠️  Save {save_name} sudah ada.", "Timpa? (y/n):"]
+        return ["✅ Game disimpan!", "\nPilihan (1-5):"]
+
+    def _state_save_overwrite(self, text):
+        save_name, revision = self.pending_save
+        self.pending_save = None
+        self.state = "menu"
+        if text.lower() != "y":
+            return ["Save dibatalkan.", "\nPilihan (1-5):"]
+        # Revisi yang dikonfirmasi: kalau berubah lagi sejak ditanya, tanya ulang
+        return self._save(save_name, revision)
+
+    def _state_explore(self, text):
+        idx = _parse_index(text)
+        locations = explore_locations()
+        if idx is None or not 0 <= idx < len(locations):
+            return self._enter("after_explore")
+
+        location_name, possible_monsters = locations[idx]
+        self.pending_enemy = spawn_monster(random.choice(possible_monsters))
+        lines = [f"\n🗺️  Kamu memasuki {location_name}..."]
+        self._beat(lines, 1)
+        lines.append(f"\n⚠️  {self.pending_enemy.nama} muncul!")
+        self._beat(lines, 1)
+        return self._pause(lines, "explore_battle", "\nTekan ENTER untuk pertempuran...")
+
+    # ---- Shop ----
+
+    def _shop_lines(self):
+        self.state = "shop_player"
+        lines = [f"\n🏪 SHOP"]
+        for idx, player in enumerate(self.players, 1):
+            lines.append(f"[{idx}] {player.nama} ({player.role}) - Gold: {player.gold}")
+        return lines + ["[0] Keluar Shop", "Pilih karakter:"]
+
+    def _state_shop_player(self, text):
+        idx = _parse_index(text)
+        if idx == -1:
+            self.state = "menu"
+            return ["\nPilihan (1-5):"]
+        if idx is None or not 0 <= idx < len(self.players):
+            return self._shop_lines()
+        self.shop_player = self.players[idx]
+        self.state = "shop_kategori"
+        return [f"\n{self.shop_player.nama}, pilih item:",
+                "[1] Potion  [2] Bomb  [3] Weapon  [4] Armor  [5] Keluar", "Pilihan:"]
+
+    def _state_shop_kategori(self, text):
+        if text not in SHOP_MENU:
+            return self._shop_lines()
+        self.shop_kategori = SHOP_MENU[text]
+        self.state = "shop_item"
+        items = SHOP_CATALOG.items(self.shop_kategori)
+        return [f"[{i}] {item.nama} - ${item.harga}" for i, item in enumerate(items, 1)] + ["Pilih (0 batal):"]
+
+    def _state_shop_item(self, text):
+        idx = _parse_index(text)
+        items = SHOP_CATALOG.items(self.shop_kategori)
+        lines = []
+        if idx is not None and 0 <= idx < len(items):
+            lines.append(buy_item(self.shop_player, items[idx].nama))
+            lines += self._checkpoint("purchase", item=items[idx].nama)
+        return lines + self._shop_lines()
+
+    # ---- Battle ----
+
+    def _start_battle(self, players, enemies, context, story_text=""):
+        self.battle = Battle(players, enemies)
+        self.battle_context = context
+        self.state = "battle"
+        lines = [f"\n{'='*60}", "⚔️  PERTEMPURAN DIMULAI! ⚔️", f"{'='*60}"]
+        if story_text:
+            lines.append(story_text)
+        return lines + self._turn_lines()
+
+    def _turn_lines(self):
+        return self.battle.turn_header_lines() + self._menu_lines()
+
+    def _menu_lines(self):
+        self.state = "battle"
+        return self.battle.menu_lines(self.battle.current_player()) + ["\nPilihan:"]
+
+    def _state_battle(self, text):
+        battle = self.battle
+        player = battle.current_player()
+
+        if text in Battle.MENU_SKILLS:
+            skill = Battle.MENU_SKILLS[text]
+            error = battle.validate_skill(player, skill)
+            if error:
+                return [error] + self._menu_lines()
+            action = BattleAction("skill", skill=skill)
+            if battle.needs_target(skill=skill):
+                return self._ask_target(action)
+            return self._run_action(action)
+
+        if text == "8" and player.potions:
+            self.state = "battle_potion"
+            lines = ["\n🧪 Pilih Potion:"]
+            lines += [f"[{idx}] {nama} (x{jumlah})" for idx, (nama, jumlah) in enumerate(player.potions.items(), 1)]
+            return lines + ["Pilih (0 batal):"]
+
+        if text == "9" and player.bombs:
+            self.state = "battle_bomb"
+            lines = ["\n💣 Pilih Bomb:"]
+            lines += [f"[{idx}] {nama} (x{jumlah})" for idx, (nama, jumlah) in enumerate(player.bombs.items(), 1)]
+            return lines + ["Pilih (0 batal):"]
+
+        if text == "0":
+            return player.status_lines() + self._menu_lines()
+
+        return ["❌ Input tidak valid!"] + self._menu_lines()
+
+    def _ask_target(self, action):
+        self.pending_action = action
+        self.state = "battle_target"
+        return self.battle.target_lines() + ["Pilih (0 batal):"]
+
+    def _state_battle_target(self, text):
+        idx = _parse_index(text)
+        if idx == -1:
+            return self._menu_lines()
+        enemies = self.battle.enemies
+        if idx is None or not 0 <= idx < len(enemies) or enemies[idx].hp <= 0:
+            return ["❌ Input tidak valid!", "Pilih (0 batal):"]
+        self.pending_action.target = idx
+        return self._run_action(self.pending_action)
+
+    def _state_battle_potion(self, text):
+        idx = _parse_index(text)
+        potion_names = list(self.battle.current_player().potions)
+        if idx is None or not 0 <= idx < len(potion_names):
+            return self._menu_lines()
+        action = BattleAction("potion", item=potion_names[idx])
+        if self.battle.needs_target(item=action.item):
+            return self._ask_target(action)
+        return self._run_action(action)
+
+    def _state_battle_bomb(self, text):
+        idx = _parse_index(text)
+        bomb_names = list(self.battle.current_player().bombs)
+        if idx is None or not 0 <= idx < len(bomb_names):
+            return self._menu_lines()
+        return self._run_action(BattleAction("bomb", item=bomb_names[idx]))
+
+    def _run_action(self, action):
+        battle = self.battle
+        self.pending_action = None
+        events = battle.player_action(action)
+        lines = [event["teks"] for event in events]
+        if events[0]["tipe"] == "invalid":
+            return lines + self._menu_lines()
+        if battle.hasil is None:
+            enemy_events = battle.enemy_phase()
+            events += enemy_events
+            lines.append("")
+            self._beat(lines, 1)
+            lines += [event["teks"] for event in enemy_events]
+        if battle.hasil is None:
+            lines += self._checkpoint("battle_action", action=action.tipe)
+            self._beat(lines, 2)
+            return lines + self._turn_lines()
+        if any(event["tipe"] == "level_up" for event in events):
+            lines += self._checkpoint("level_up")
+        return lines + self._battle_over()
+
+    def _open_journal(self):
+        """Journal autosave sesi ini, dimulai dengan snapshot party sekarang.
+        Kembalikan baris peringatan kalau autosave gagal"""
+        try:
+            if self.journal:
+                self.journal.close()
+            self.journal = Journal(self.autosave_name)
+            self.journal.open(self.players, self.chapter)
+        except Exception as e:
+            self.journal = None
+            return _autosave_warning(e)
+        return self._autosave_errors()
+
+    def _checkpoint(self, kind, **info):
+        """Catat aksi ke journal sesi (append kecil, bukan save penuh). Error
+        penyimpanan jadi baris peringatan, state game tetap berjalan"""
+        if not self.journal:
+            return []
+        try:
+            self.journal.record(kind, self.players, self.chapter, **info)
+        except Exception as e:
+            return _autosave_warning(e)
+        return self._autosave_errors()
+
+    def _autosave_errors(self):
+        """Peringatan untuk error dari penulis autosave (di thread lain), sekali per error"""
+        error = self.journal.error
+        if not error:
+            return []
+        self.journal.error = None
+        return [f"⚠️  Autosave gagal: {error}"]
+
+    def _battle_over(self):
+        won = self.battle.hasil
+        context = self.battle_context
+
+        if context == "thug":
+            if won:
+                self.chapter = 2
+                lines = [thug_victory_text(self.players[0]), CHAPTER_2_TEXT] + self._open_journal()
+                next_state = "menu"
+            else:
+                lines = [THUG_DEFEAT_TEXT, "\n[Coba lagi?]"]
+                next_state = "title"
+        elif context == "caravan":
+            if won:
+                self.chapter = 4
+                lines = [CARAVAN_VICTORY_TEXT, "\n🎊 Misi Chapter 3 berhasil!"]
+            else:
+                for player in self.players:
+                    player.hp = player.hp_max
+                lines = [CARAVAN_DEFEAT_TEXT, "\n💪 Kamu akan coba lagi..."]
+            lines += self._checkpoint("battle_end")
+            next_state = "menu"
+        elif won:
+            lines = ["\n⏳ Kamu kembali ke kota..."] + self._checkpoint("battle_end")
+            next_state = "after_explore"
+        else:
+            for player in self.players:
+                player.hp = player.hp_max
+            lines = ["\n💀 Kamu kalah!", "Dirawat di markas..."] + self._checkpoint("battle_end")
+            next_state = "after_explore"
+
+        # Battle dilepas paling akhir, setelah autosave: sesi tidak pernah
+        # tertinggal di state battle tanpa battle
+        self.battle.release_enemies()
+        self.battle = None
+        self.battle_context = None
+        return self._pause(lines, next_state)
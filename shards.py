@@ -0,0 +1,145 @@
+"""Sesi dibagi ke beberapa proses worker supaya tidak terbatas satu core (GIL)
+
+ShardedHost menjalankan N proses, masing-masing dengan SessionHost sendiri
+(termasuk batas LRU dan hibernation). Setiap id sesi selalu diarahkan ke
+worker yang sama lewat crc32(id) % N, jadi satu sesi hanya pernah dipegang
+satu proses dan journal/file sesinya tidak ditulis bersamaan.
+
+Pesan dikirim per batch lewat pipe: handle_messages() mengelompokkan pesan
+per worker, mengirim semua batch dulu lalu menunggu balasannya, sehingga
+worker memproses secara paralel. Worker yang mati dijalankan ulang; pesan
+yang sedang diproses saat itu dibalas error (tidak diulang karena mungkin
+sudah sebagian dijalankan). Sesi yang pernah di-hibernate kembali ke
+posisi hibernate terakhirnya (lihat hibernation.py), termasuk party pada
+posisi itu. Sesi yang belum pernah di-hibernate mulai lagi dari layar
+judul; party-nya bisa dimuat dari journal autosave_<id> lewat menu load.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import zlib
+
+from server import SessionHost
+
+def shard_of(session_id, count):
+    """Index worker untuk id sesi, sama di semua proses (tidak pakai hash())"""
+    return zlib.crc32(str(session_id).encode("utf-8")) % count
+
+def _worker_main(conn, max_sessions):
+    host = SessionHost(max_sessions)
+    try:
+        while True:
+            batch = conn.recv()
+            if batch is None:
+                break
+            conn.send(host.handle_messages(batch))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        host.close()
+
+def _restart_error(message):
+    reply = {"error": "worker dijalankan ulang, kirim ulang pesan"}
+    if isinstance(message, dict):
+        reply["session"] = message.get("session")
+        if "id" in message:
+            reply["id"] = message["id"]
+    return reply
+
+class _Worker:
+    __slots__ = ("process", "conn", "lock", "restarts")
+
+    def __init__(self):
+        self.process = None
+        self.conn = None
+        self.lock = threading.Lock()
+        self.restarts = 0
+
+class ShardedHost(SessionHost):
+    """Pengganti SessionHost yang meneruskan pesan ke proses worker"""
+    def __init__(self, workers=None, max_sessions=1000):
+        self.count = workers or os.cpu_count() or 1
+        self.max_sessions = max_sessions
+        # spawn: worker tidak mewarisi thread atau event loop dari proses utama
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = [_Worker() for _ in range(self.count)]
+        for worker in self.workers:
+            self._start(worker)
+
+    def _start(self, worker):
+        parent, child = self.context.Pipe()
+        worker.process = self.context.Process(
+            target=_worker_main, args=(child, self.max_sessions), daemon=True,
+        )
+        worker.process.start()
+        child.close()
+        worker.conn = parent
+
+    def _restart(self, worker):
+        worker.conn.close()
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join()
+        worker.restarts += 1
+        self._start(worker)
+
+    def _route(self, message):
+        try:
+            return shard_of(message["session"], self.count)
+        except (KeyError, TypeError):
+            return 0
+
+    def handle_messages(self, messages):
+        """Balasan untuk daftar pesan, urutannya sama dengan pesan"""
+        groups = {}
+        for idx, message in enumerate(messages):
+            groups.setdefault(self._route(message), []).append(idx)
+
+        replies = [None] * len(messages)
+        sent = []
+        # Kunci diambil urut index worker supaya thread lain tidak deadlock
+        for shard in sorted(groups):
+            worker = self.workers[shard]
+            worker.lock.acquire()
+            try:
+                worker.conn.send([messages[idx] for idx in groups[shard]])
+                sent.append((shard, True))
+            except (OSError, ValueError):
+                sent.append((shard, False))
+
+        for shard, ok in sent:
+            worker = self.workers[shard]
+            try:
+                results = worker.conn.recv() if ok else None
+            except (EOFError, OSError):
+                results = None
+            try:
+                if results is None:
+                    self._restart(worker)
+                    results = [_restart_error(messages[idx]) for idx in groups[shard]]
+                for idx, reply in zip(groups[shard], results):
+                    replies[idx] = reply
+            finally:
+                worker.lock.release()
+        return replies
+
+    def handle_message(self, message):
+        return self.handle_messages([message])[0]
+
+    async def handle_messages_async(self, messages):
+        # Menunggu pipe di thread supaya event loop tetap melayani koneksi lain
+        return await asyncio.to_thread(self.handle_messages, messages)
+
+    def close(self):
+        """Hentikan worker; setiap worker meng-hibernate sesinya sebelum keluar"""
+        for worker in self.workers:
+            with worker.lock:
+                try:
+                    worker.conn.send(None)
+                except OSError:
+                    pass
+                worker.process.join(timeout=30)
+                if worker.process.is_alive():
+                    worker.process.kill()
+                worker.conn.close()
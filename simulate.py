@@ -0,0 +1,252 @@
+"""Simulasi Monte Carlo battle headless untuk cek balance
+
+Contoh:
+    python simulate.py pablo2 merchant_caravan -n 100000
+    python simulate.py pablo hutan_gelap -n 1000000 --workers 8 --seed 42
+    python simulate.py --list
+"""
+import argparse
+import copy
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from Adventure_v2 import (
+    ENCOUNTERS, ENEMY_POOL, Battle, BattleAction, SkillType, StatusEffects,
+    explore_locations, load_game, spawn_encounter, spawn_monster,
+)
+from skills import SKILLS, expected_damage
+
+CHUNK_SIZE = 20000
+
+def _slug(nama):
+    return nama.lower().replace(" ", "_")
+
+def encounter_factories():
+    """Nama encounter -> fungsi yang membuat daftar musuh baru"""
+    encounters = {nama: lambda nama=nama: spawn_encounter(nama) for nama in ENCOUNTERS}
+    for location, monsters in explore_locations():
+        for monster in monsters:
+            encounters[_slug(monster)] = lambda monster=monster: [spawn_monster(monster)]
+        encounters[_slug(location)] = lambda monsters=tuple(monsters): [spawn_monster(random.choice(monsters))]
+    return encounters
+
+# Skill serangan satu target, dipilih auto_action dari damage rata-rata terbesar
+SINGLE_TARGET_SKILLS = tuple(skill for skill, spec in SKILLS.items() if spec.target == "single")
+
+def auto_action(battle, player):
+    """Kebijakan otomatis: heal saat kritis, multi shot ke banyak musuh, selain itu serangan terkuat"""
+    if player.hp < player.hp_max * 0.35:
+        if battle.validate_skill(player, SkillType.HEAL) is None:
+            return BattleAction("skill", skill=SkillType.HEAL)
+        for nama in ("Greater Health Potion", "Health Potion"):
+            if player.potions.get(nama):
+                return BattleAction("potion", item=nama)
+
+    alive = [idx for idx, enemy in enumerate(battle.enemies) if enemy.hp > 0]
+    if len(alive) > 1 and battle.validate_skill(player, SkillType.MULTI_SHOT) is None:
+        return BattleAction("skill", skill=SkillType.MULTI_SHOT)
+
+    best_skill = SkillType.SLASH
+    best_damage = 0
+    for skill in SINGLE_TARGET_SKILLS:
+        if battle.validate_skill(player, skill) is None and expected_damage(player, skill) > best_damage:
+            best_skill = skill
+            best_damage = expected_damage(player, skill)
+
+    target = min(alive, key=lambda idx: battle.enemies[idx].hp)
+    return BattleAction("skill", skill=best_skill, target=target)
+
+def clone_party(party):
+    """Salinan party untuk satu battle, tanpa menyentuh party asli"""
+    clones = []
+    for player in party:
+        clone = copy.copy(player)
+        clone.potions = dict(player.potions)
+        clone.bombs = dict(player.bombs)
+        clone.skills = list(player.skills)
+        clone.status_effects = StatusEffects()
+        clones.append(clone)
+    return clones
+
+class SimStats:
+    """Akumulator hasil simulasi, bisa digabung antar worker"""
+    def __init__(self):
+        self.battles = 0
+        self.wins = 0
+        self.timeouts = 0
+        self.turns = Counter()
+        self.hp_left = Counter()
+        self.gold = Counter()
+        self.exp = Counter()
+
+    def record(self, battle, party, hp_left):
+        self.battles += 1
+        self.turns[battle.turn] += 1
+        self.hp_left[hp_left] += 1
+        if battle.hasil:
+            self.wins += 1
+            self.gold[sum(e.gold_drop for e in battle.enemies) // len(party)] += 1
+            self.exp[sum(e.exp_drop for e in battle.enemies) // len(party)] += 1
+        else:
+            if battle.hasil is None:
+                self.timeouts += 1
+            self.gold[0] += 1
+            self.exp[0] += 1
+
+    def record_arrays(self, result):
+        """Catat hasil simulate_lockstep (mode --vectorized)"""
+        self.battles += len(result["won"])
+        self.wins += int(result["won"].sum())
+        self.timeouts += int(result["timeout"].sum())
+        self.turns.update(result["turns"].tolist())
+        self.hp_left.update(result["hp_left"].tolist())
+        self.gold.update(result["gold"].tolist())
+        self.exp.update(result["exp"].tolist())
+
+    def merge(self, other):
+        self.battles += other.battles
+        self.wins += other.wins
+        self.timeouts += other.timeouts
+        self.turns.update(other.turns)
+        self.hp_left.update(other.hp_left)
+        self.gold.update(other.gold)
+        self.exp.update(other.exp)
+
+def run_battle(party, enemies, max_turns=100):
+    """Satu battle headless dengan auto_action. Battle dihentikan setelah max_turns
+
+    Kembalikan (battle, hp_left). hp_left diambil sebelum reward, karena
+    level up saat menang memulihkan HP.
+    """
+    battle = Battle(party, enemies)
+    hp_left = 0
+    while battle.hasil is None and battle.turn <= max_turns:
+        hp_left = sum(max(0, p.hp) for p in party)
+        battle.step(auto_action(battle, battle.current_player()))
+    if not battle.hasil:
+        hp_left = sum(max(0, p.hp) for p in party)
+    return battle, hp_left
+
+def _run_chunk(args):
+    party, encounter, count, seed, max_turns, vectorized = args
+    if seed is not None:
+        random.seed(seed)
+    factory = encounter_factories()[encounter]
+    stats = SimStats()
+    if vectorized:
+        import numpy as np
+        from damage_batch import simulate_lockstep
+        enemy_sets = [factory() for _ in range(count)]
+        stats.record_arrays(simulate_lockstep(party, enemy_sets, max_turns, np.random.default_rng(seed)))
+        for enemies in enemy_sets:
+            ENEMY_POOL.release(enemies)
+        return stats
+    for _ in range(count):
+        fighters = clone_party(party)
+        battle, hp_left = run_battle(fighters, factory(), max_turns)
+        stats.record(battle, fighters, hp_left)
+        battle.release_enemies()
+    return stats
+
+def simulate(party, encounter, battles, workers=None, seed=None, max_turns=100, vectorized=False):
+    """Jalankan banyak battle headless, kembalikan SimStats gabungan
+
+    vectorized=True memakai damage_batch.simulate_lockstep (butuh NumPy).
+    """
+    if encounter not in encounter_factories():
+        raise ValueError(f"Encounter tidak dikenal: {encounter}")
+
+    chunks = []
+    remaining = battles
+    while remaining > 0:
+        count = min(CHUNK_SIZE, remaining)
+        chunk_seed = None if seed is None else seed * 1000003 + len(chunks)
+        chunks.append((party, encounter, count, chunk_seed, max_turns, vectorized))
+        remaining -= count
+
+    stats = SimStats()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) == 1:
+        for chunk in chunks:
+            stats.merge(_run_chunk(chunk))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk_stats in pool.map(_run_chunk, chunks):
+                stats.merge(chunk_stats)
+    return stats
+
+def _percentile(counter, fraction):
+    total = sum(counter.values())
+    target = fraction * total
+    seen = 0
+    for value in sorted(counter):
+        seen += counter[value]
+        if seen >= target:
+            return value
+    return 0
+
+def _describe(counter):
+    total = sum(counter.values())
+    if not total:
+        return "-"
+    mean = sum(value * n for value, n in counter.items()) / total
+    variance = sum(n * (value - mean) ** 2 for value, n in counter.items()) / total
+    return (f"mean {mean:.2f}, std {variance ** 0.5:.2f} "
+            f"(min {min(counter)}, p50 {_percentile(counter, 0.5)}, "
+            f"p95 {_percentile(counter, 0.95)}, max {max(counter)})")
+
+def print_report(party, encounter, stats, elapsed):
+    """Tampilkan ringkasan simulasi"""
+    print(f"\n{'='*60}")
+    print(f"SIMULASI: {encounter}".center(60))
+    print(f"{'='*60}")
+    print("Party: " + ", ".join(f"{p.nama} ({p.role} Lv{p.level})" for p in party))
+    print(f"Battle: {stats.battles} dalam {elapsed:.1f}s ({stats.battles / max(elapsed, 1e-9):.0f}/s)")
+    print(f"Win rate: {100 * stats.wins / stats.battles:.2f}% (timeout: {stats.timeouts})")
+    print(f"Turn: {_describe(stats.turns)}")
+    print(f"HP tersisa (party, max {sum(p.hp_max for p in party)}): {_describe(stats.hp_left)}")
+    print(f"Gold/karakter: {_describe(stats.gold)}")
+    print(f"EXP/karakter: {_describe(stats.exp)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulasi Monte Carlo battle headless")
+    parser.add_argument("save", nargs="?", help="nama save di folder saves/ (tanpa .json)")
+    parser.add_argument("encounter", nargs="?", help="nama encounter, lihat --list")
+    parser.add_argument("-n", "--battles", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: semua core)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-turns", type=int, default=100)
+    parser.add_argument("--full", action="store_true", help="mulai dengan HP dan MP penuh")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="battle lockstep dengan NumPy (tanpa potion, bomb dan status effect)")
+    parser.add_argument("--list", action="store_true", help="tampilkan daftar encounter")
+    args = parser.parse_args(argv)
+
+    if args.list or not args.save or not args.encounter:
+        print("Encounter: " + ", ".join(encounter_factories()))
+        return
+
+    party, _ = load_game(args.save, verbose=False)
+    if not party:
+        parser.error(f"save tidak bisa dimuat: {args.save}")
+    if args.full:
+        for player in party:
+            player.hp = player.hp_max
+            player.mp = player.mp_max
+    if args.encounter not in encounter_factories():
+        parser.error(f"encounter tidak dikenal: {args.encounter}")
+    if args.vectorized:
+        try:
+            import numpy  # noqa: F401 (dependensi opsional, lihat README)
+        except ImportError:
+            parser.error("--vectorized butuh NumPy: pip install -r requirements-optional.txt")
+
+    start = time.perf_counter()
+    stats = simulate(party, args.encounter, args.battles, args.workers, args.seed, args.max_turns, args.vectorized)
+    print_report(party, args.encounter, stats, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
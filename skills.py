@@ -0,0 +1,64 @@
+"""Tabel skill bersama untuk Adventure.py, Adventure_v2.py dan simulator
+
+Setiap SkillType punya satu baris Skill: biaya MP, mode target
+(single, all, self), rumus damage (stat * skala + roll acak) dan teks.
+Battle cukup membaca baris ini, tanpa rantai if/elif per skill.
+"""
+import random
+from collections import namedtuple
+from enum import Enum
+from types import MappingProxyType
+
+class SkillType(Enum):
+    SLASH = "Slash"
+    POWER_STRIKE = "Power Strike"
+    MAGIC_BOLT = "Magic Bolt"
+    HEAL = "Heal"
+    POISON_STRIKE = "Poison Strike"
+    ARROW_SHOT = "Arrow Shot"
+    MULTI_SHOT = "Multi Shot"
+
+# bawaan: boleh dipakai tanpa ada di player.skills
+Skill = namedtuple("Skill", ["mp", "target", "stat", "scale", "roll_min", "roll_max", "teks", "archer_only", "bawaan"])
+
+SKILLS = MappingProxyType({
+    SkillType.SLASH: Skill(0, "single", "attack", 1.0, -3, 5, "⚔️  Menyerang dengan Slash!", False, True),
+    SkillType.POWER_STRIKE: Skill(10, "single", "attack", 1.5, 0, 10, "⚡ Power Strike!", False, True),
+    SkillType.MAGIC_BOLT: Skill(15, "single", "magic", 1.0, 5, 15, "🔮 Magic Bolt!", False, False),
+    SkillType.HEAL: Skill(20, "self", "magic", 1.0, 10, 20, "💚 Menyembuhkan diri!", False, False),
+    SkillType.POISON_STRIKE: Skill(12, "single", "attack", 1.0, 5, 12, "☠️  Poison Strike!", False, False),
+    SkillType.ARROW_SHOT: Skill(0, "single", "attack", 1.0, 3, 8, "🏹 Arrow Shot!", True, False),
+    SkillType.MULTI_SHOT: Skill(15, "all", "attack", 1.3, 2, 6, "🏹 Multi Shot! Serangan ke semua musuh!", True, False),
+})
+
+# Rumus untuk skill di luar tabel
+DEFAULT_SKILL = Skill(0, "single", "attack", 1.0, -2, 3, "", False, True)
+
+def base_power(attacker, skill):
+    """Stat penyerang setelah skala skill"""
+    stat = attacker.magic if skill.stat == "magic" else attacker.attack
+    return stat if skill.scale == 1.0 else int(stat * skill.scale)
+
+def roll_damage(attacker, skill_type, multiplier=1.0):
+    """Damage (atau jumlah heal) satu kali pakai skill"""
+    skill = SKILLS.get(skill_type, DEFAULT_SKILL)
+    damage = base_power(attacker, skill) + random.randint(skill.roll_min, skill.roll_max)
+    if multiplier != 1.0:
+        damage = int(damage * multiplier)
+    return max(1, damage)
+
+def expected_damage(attacker, skill_type):
+    """Damage rata-rata tanpa status effect, untuk kebijakan otomatis"""
+    skill = SKILLS.get(skill_type, DEFAULT_SKILL)
+    return base_power(attacker, skill) + (skill.roll_min + skill.roll_max) / 2
+
+def skill_error(player, skill_type):
+    """Pesan error kalau player tidak boleh memakai skill ini, None kalau boleh"""
+    skill = SKILLS[skill_type]
+    if skill.archer_only and player.role != "Archer":
+        return "❌ Input tidak valid!"
+    if not skill.bawaan and skill_type not in player.skills:
+        return "❌ Skill tidak dimiliki!"
+    if player.mp < skill.mp:
+        return "❌ MP tidak cukup!"
+    return None
@@ -0,0 +1,460 @@
+"""Backend penyimpanan save: folder file (default) atau SQLite
+
+Semua backend bekerja dengan dict save ({"chapter", "players"}) dan punya:
+    save(save_name, save_data, format_name=None, expected_revision=None) -> revisi baru
+    save_many([(save_name, save_data), ...]) -> [revisi baru]
+    load(save_name)            -> dict, FileNotFoundError kalau tidak ada
+    revision(save_name)        -> int, 0 kalau save belum ada (atau save lama tanpa revisi)
+    exists(save_name)          -> bool
+    summaries()                -> [(nama save, [nama pemain] atau None, chapter)]
+    find(player=None, chapter=None) -> [nama save]
+    headers(offset=0, limit=None) -> [(nama save, header atau None)], lihat save_codec.read_header
+    journal_folder             -> folder untuk journal autosave (lihat journal.py)
+Backend aktif dipilih dengan env ADVENTURE_SAVE_STORE atau --save-store:
+"file", "sqlite", "sqlite:path/ke/file.db" atau "archive" (riwayat
+snapshot dengan deduplikasi, lihat archive.py).
+
+Setiap save punya nomor revisi yang naik tiap kali ditulis. Penulis yang
+memberi expected_revision (revisi saat ia membaca) mendapat SaveConflict
+kalau proses lain sudah menulis duluan, bukan menimpa diam-diam. Penulisan
+per nama save dikunci antar proses (flock pada file <nama>.lock, yang
+juga menyimpan revisinya); kunci hanya dipegang selama menulis, encode
+dilakukan sebelum mengunci.
+"""
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import stat
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: kunci hanya berlaku di dalam proses ini
+    fcntl = None
+
+import save_codec
+import save_manifest
+
+_new_file_mode = None
+
+def new_file_mode():
+    """Mode file baru biasa (0666 - umask), dibaca sekali tanpa os.umask
+
+    os.umask hanya bisa dibaca dengan mengubahnya, dan perubahan itu berlaku
+    untuk semua thread. Di Linux dibaca dari /proc/self/status; di tempat
+    lain dari mode file yang dibuat dengan 0666 di folder sementara.
+    """
+    global _new_file_mode
+    if _new_file_mode is None:
+        try:
+            with open("/proc/self/status") as f:
+                umask = next(int(line.split()[1], 8) for line in f if line.startswith("Umask:"))
+            _new_file_mode = 0o666 & ~umask
+        except (OSError, StopIteration, ValueError):
+            with tempfile.TemporaryDirectory() as folder:
+                path = os.path.join(folder, "mode")
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+                _new_file_mode = stat.S_IMODE(os.stat(path).st_mode)
+    return _new_file_mode
+
+def atomic_write(path, data, sync=True, mode=None):
+    """Tulis ke file sementara di folder yang sama, fsync, lalu rename
+
+    mode default: mode file lama, atau untuk file baru mode biasa (0666 -
+    umask), bukan 0600 dari mkstemp. sync=False melewati fsync: file tetap utuh atau
+    versi lama kalau proses mati, tapi bisa hilang kalau mesin mati (untuk
+    data yang boleh hilang).
+    """
+    if mode is None:
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = new_file_mode()
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def safe_name(key):
+    """Nama file dari id bebas (misal id sesi platform chat): karakter aman
+    ditambah hash id asli, jadi dua id yang mirip tidak pernah bentrok"""
+    key = str(key)
+    safe = re.sub(r"[^A-Za-z0-9_-]", "_", key)[:40]
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return f"{safe}-{digest}"
+
+LOCK_TIMEOUT = 5.0
+_REVISION = struct.Struct("<Q")
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+class SaveConflict(Exception):
+    """Save sudah ditulis proses lain sejak revisi yang dibaca penulis"""
+    def __init__(self, save_name, expected, actual):
+        super().__init__(f"Save {save_name} sudah berubah (revisi {expected} -> {actual})")
+        self.save_name = save_name
+        self.expected = expected
+        self.actual = actual
+
+def check_revision(save_name, expected, actual):
+    if expected is not None and expected != actual:
+        raise SaveConflict(save_name, expected, actual)
+
+class RevisionLock:
+    """Kunci eksklusif satu save lewat file lock, dengan revisi di isi filenya
+
+    Dipakai sebagai context manager. Menunggu kunci dengan polling singkat
+    (0.5 ms naik sampai 5 ms) supaya autosave beruntun tidak tertahan lama,
+    TimeoutError kalau lewat timeout. shared=True mengambil kunci bersama
+    (banyak pemegang sekaligus, menunggu pemegang eksklusif).
+    """
+    def __init__(self, path, timeout=LOCK_TIMEOUT, shared=False):
+        self.path = path
+        self.timeout = timeout
+        self.shared = shared
+        self.file = None
+        self.local = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.file = open(self.path, "a+b")
+        try:
+            if fcntl is None:
+                with _local_locks_guard:
+                    self.local = _local_locks.setdefault(os.path.abspath(self.path), threading.Lock())
+                if not self.local.acquire(timeout=self.timeout):
+                    raise TimeoutError(f"Save terkunci: {self.path}")
+            else:
+                self._flock()
+        except BaseException:
+            self.file.close()
+            raise
+        return self
+
+    def _flock(self):
+        deadline = time.monotonic() + self.timeout
+        delay = 0.0005
+        while True:
+            try:
+                fcntl.flock(self.file.fileno(), (fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX) | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Save terkunci: {self.path}")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.005)
+
+    def __exit__(self, *exc):
+        if self.local:
+            self.local.release()
+        elif fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        self.file.close()
+
+    def read(self):
+        self.file.seek(0)
+        data = self.file.read(_REVISION.size)
+        return _REVISION.unpack(data)[0] if len(data) == _REVISION.size else 0
+
+    def write(self, revision):
+        self.file.seek(0)
+        self.file.truncate()
+        self.file.write(_REVISION.pack(revision))
+        self.file.flush()
+
+def lock_path(folder, save_name):
+    """File kunci+revisi save di folder (format FileStore)"""
+    return os.path.join(folder, save_name + ".lock")
+
+def read_revision(path):
+    """Revisi di file lock tanpa mengunci, 0 kalau belum ada"""
+    try:
+        with open(path, "rb") as f:
+            data = f.read(_REVISION.size)
+    except FileNotFoundError:
+        return 0
+    return _REVISION.unpack(data)[0] if len(data) == _REVISION.size else 0
+
+class FileStore:
+    """Satu file per save di folder, formatnya dari save_codec"""
+    def __init__(self, folder="saves"):
+        self.folder = folder
+        self.journal_folder = folder
+
+    def _lock_path(self, save_name):
+        return lock_path(self.folder, save_name)
+
+    def save(self, save_name, save_data, format_name=None, expected_revision=None):
+        os.makedirs(self.folder, exist_ok=True)
+        codec = save_codec.get_codec(format_name)
+        path = save_codec.save_path(self.folder, save_name, format_name)
+        data = codec.encode(save_data)
+        with RevisionLock(self._lock_path(save_name)) as lock:
+            revision = lock.read()
+            check_revision(save_name, expected_revision, revision)
+            # Revisi dinaikkan dulu: kalau crash sebelum file ditulis, akibatnya
+            # hanya konflik palsu, bukan penulis lama yang lolos menimpa
+            lock.write(revision + 1)
+            atomic_write(path, data)
+        save_manifest.get_manifest(self.folder).record(save_name, path, save_data)
+        return revision + 1
+
+    def revision(self, save_name):
+        return read_revision(self._lock_path(save_name))
+
+    def exists(self, save_name):
+        return save_codec.find_save(self.folder, save_name)[0] is not None
+
+    def save_many(self, items, format_name=None):
+        return [self.save(save_name, save_data, format_name) for save_name, save_data in items]
+
+    def load(self, save_name):
+        path, codec = save_codec.find_save(self.folder, save_name)
+        if path is None:
+            raise FileNotFoundError(save_name)
+        with open(path, "rb") as f:
+            return codec.decode(f.read())
+
+    def summaries(self):
+        entries = save_manifest.get_manifest(self.folder).refresh()
+        return [(save_name, entry["players"], entry["chapter"]) for save_name, entry in entries.items()]
+
+    def headers(self, offset=0, limit=None):
+        return save_codec.scan_headers(self.folder, offset, limit)
+
+    def find(self, player=None, chapter=None):
+        entries = save_manifest.get_manifest(self.folder).refresh()
+        return [
+            save_name for save_name, entry in entries.items()
+            if entry["players"] is not None
+            and (player is None or player in entry["players"])
+            and (chapter is None or entry["chapter"] == chapter)
+        ]
+
+class SqliteStore:
+    """Save di satu database SQLite dengan pool koneksi
+
+    Data save disimpan sebagai blob (default format biner), ditambah kolom
+    chapter, level dan tabel save_players yang diindex untuk pencarian.
+    Setiap koneksi meng-cache prepared statement untuk SQL di bawah.
+    """
+    SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS saves (
+            name TEXT PRIMARY KEY,
+            chapter INTEGER NOT NULL,
+            level INTEGER NOT NULL,
+            players TEXT NOT NULL,
+            format TEXT NOT NULL,
+            data BLOB NOT NULL,
+            updated REAL NOT NULL,
+            revision INTEGER NOT NULL DEFAULT 0
+        )""",
+        """CREATE TABLE IF NOT EXISTS save_players (
+            save_name TEXT NOT NULL REFERENCES saves(name) ON DELETE CASCADE,
+            player_name TEXT NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_saves_chapter ON saves(chapter)",
+        "CREATE INDEX IF NOT EXISTS idx_save_players_player ON save_players(player_name)",
+        "CREATE INDEX IF NOT EXISTS idx_save_players_save ON save_players(save_name)",
+    )
+    UPSERT_SQL = """INSERT INTO saves (name, chapter, level, players, format, data, updated, revision)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET chapter=excluded.chapter, level=excluded.level,
+            players=excluded.players, format=excluded.format, data=excluded.data,
+            updated=excluded.updated, revision=excluded.revision"""
+    REVISION_SQL = "SELECT revision FROM saves WHERE name = ?"
+    DELETE_PLAYERS_SQL = "DELETE FROM save_players WHERE save_name = ?"
+    INSERT_PLAYER_SQL = "INSERT INTO save_players (save_name, player_name) VALUES (?, ?)"
+    LOAD_SQL = "SELECT format, data FROM saves WHERE name = ?"
+    SUMMARY_SQL = "SELECT name, players, chapter FROM saves ORDER BY name"
+    HEADER_SQL = "SELECT name, format, data FROM saves ORDER BY name LIMIT ? OFFSET ?"
+
+    def __init__(self, path="saves/saves.db", pool_size=4, format_name="binary"):
+        self.path = path
+        self.journal_folder = os.path.dirname(path) or "."
+        self.format_name = format_name
+        self.pool = queue.LifoQueue()
+        self.pool_size = pool_size
+        self.created = 0
+        self.lock = threading.Lock()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self.connection() as conn:
+            with conn:
+                for statement in self.SCHEMA:
+                    conn.execute(statement)
+                # Database dari sebelum ada revisi
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(saves)")]
+                if "revision" not in columns:
+                    conn.execute("ALTER TABLE saves ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Pinjam koneksi dari pool, buat baru kalau pool belum penuh"""
+        try:
+            conn = self.pool.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_create = self.created < self.pool_size
+                if can_create:
+                    self.created += 1
+            conn = self._connect() if can_create else self.pool.get()
+        try:
+            yield conn
+        finally:
+            self.pool.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self.created = 0
+
+    def _encode(self, save_name, save_data, format_name):
+        codec = save_codec.get_codec(format_name)
+        summary = save_manifest.summarize(save_data)
+        return save_name, summary, codec.encode(save_data)
+
+    def _write(self, conn, encoded, format_name, expected_revision=None):
+        save_name, summary, data = encoded
+        row = conn.execute(self.REVISION_SQL, (save_name,)).fetchone()
+        revision = row[0] if row else 0
+        check_revision(save_name, expected_revision, revision)
+        conn.execute(self.UPSERT_SQL, (
+            save_name, summary["chapter"], summary["level"], json.dumps(summary["players"]),
+            format_name, data, time.time(), revision + 1,
+        ))
+        conn.execute(self.DELETE_PLAYERS_SQL, (save_name,))
+        conn.executemany(self.INSERT_PLAYER_SQL, [(save_name, nama) for nama in summary["players"]])
+        return revision + 1
+
+    def save(self, save_name, save_data, format_name=None, expected_revision=None):
+        format_name = format_name or self.format_name
+        encoded = self._encode(save_name, save_data, format_name)
+        with self.connection() as conn:
+            with conn:
+                # BEGIN IMMEDIATE: cek revisi dan tulis dalam satu kunci tulis
+                conn.execute("BEGIN IMMEDIATE")
+                return self._write(conn, encoded, format_name, expected_revision)
+
+    def save_many(self, items, format_name=None):
+        """Simpan banyak save dalam satu transaksi"""
+        format_name = format_name or self.format_name
+        encoded = [self._encode(save_name, save_data, format_name) for save_name, save_data in items]
+        with self.connection() as conn:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                return [self._write(conn, entry, format_name) for entry in encoded]
+
+    def revision(self, save_name):
+        with self.connection() as conn:
+            row = conn.execute(self.REVISION_SQL, (save_name,)).fetchone()
+        return row[0] if row else 0
+
+    def exists(self, save_name):
+        with self.connection() as conn:
+            return conn.execute(self.REVISION_SQL, (save_name,)).fetchone() is not None
+
+    def load(self, save_name):
+        with self.connection() as conn:
+            row = conn.execute(self.LOAD_SQL, (save_name,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(save_name)
+        format_name, data = row
+        return save_codec.get_codec(format_name).decode(data)
+
+    def summaries(self):
+        with self.connection() as conn:
+            rows = conn.execute(self.SUMMARY_SQL).fetchall()
+        return [(save_name, json.loads(players), chapter) for save_name, players, chapter in rows]
+
+    def headers(self, offset=0, limit=None):
+        with self.connection() as conn:
+            rows = conn.execute(self.HEADER_SQL, (-1 if limit is None else limit, offset)).fetchall()
+        headers = []
+        for save_name, format_name, data in rows:
+            try:
+                headers.append((save_name, save_codec.get_codec(format_name).read_header(data)))
+            except Exception:
+                headers.append((save_name, None))
+        return headers
+
+    def find(self, player=None, chapter=None):
+        sql = "SELECT DISTINCT s.name FROM saves s"
+        clauses = []
+        params = []
+        if player is not None:
+            sql += " JOIN save_players p ON p.save_name = s.name"
+            clauses.append("p.player_name = ?")
+            params.append(player)
+        if chapter is not None:
+            clauses.append("s.chapter = ?")
+            params.append(chapter)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self.connection() as conn:
+            return [row[0] for row in conn.execute(sql + " ORDER BY s.name", params)]
+
+def _archive_store(root="saves/archive"):
+    # archive.py memakai atomic_write dari modul ini, jadi diimpor saat dipakai
+    from archive import ArchiveStore
+    return ArchiveStore(root)
+
+BACKENDS = {
+    "file": FileStore,
+    "sqlite": SqliteStore,
+    "archive": _archive_store,
+}
+
+def open_store(spec):
+    """Buka backend dari spec seperti file, file:folder, sqlite, sqlite:path atau archive:folder"""
+    nama, _, path = spec.partition(":")
+    if nama not in BACKENDS:
+        raise ValueError(f"Backend save tidak dikenal: {nama} (pilih: {', '.join(BACKENDS)})")
+    return BACKENDS[nama](path) if path else BACKENDS[nama]()
+
+_current = None
+
+def get_store():
+    """Backend save aktif, default dari env ADVENTURE_SAVE_STORE atau folder saves/"""
+    global _current
+    if _current is None:
+        _current = open_store(os.environ.get("ADVENTURE_SAVE_STORE", "file"))
+    return _current
+
+def set_store(store):
+    """Ganti backend aktif, dengan objek store atau string seperti open_store"""
+    global _current
+    _current = open_store(store) if isinstance(store, str) else store
+    return _current
+
+def add_argument(parser):
+    """Tambahkan opsi --save-store ke argparse parser"""
+    parser.add_argument("--save-store", default=None,
+                        help="backend save: file, file:folder, sqlite, sqlite:path atau archive "
+                             "(default: env ADVENTURE_SAVE_STORE atau file)")
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import autosave
+import storage
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """FileStore di folder sementara sebagai backend aktif"""
+    monkeypatch.chdir(tmp_path)
+    previous = storage._current
+    store = storage.set_store(storage.FileStore(str(tmp_path / "saves")))
+    yield store
+    # Tulisan antrian autosave untuk folder ini selesai sebelum folder dihapus
+    autosave.flush()
+    storage._current = previous
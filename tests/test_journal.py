@@ -0,0 +1,69 @@
+import journal
+from Adventure_v2 import Character, save_game
+
+def make_journal(store):
+    return journal.Journal("run", store=store)
+
+def test_recover_replays_journal(store):
+    hero = Character("Pablo")
+    log = make_journal(store)
+    log.open([hero], 2)
+    hero.gold = 50
+    log.record("purchase", [hero], 2, item="Health Potion")
+    hero.hp = 40
+    hero.exp = 30
+    log.record("battle_action", [hero], 2, action="skill")
+    log.record("battle_action", [hero], 3)
+    log.flush()
+
+    save_data = journal.recover("run", store=store)
+    assert save_data["chapter"] == 3
+    assert save_data["players"] == [hero.to_save_data()]
+
+def test_new_party_member_is_recovered_in_full(store):
+    hero = Character("Pablo")
+    log = make_journal(store)
+    log.open([hero], 1)
+    archer = Character("Santoso", role="Archer")
+    log.record("new_member", [hero, archer], 1)
+    log.flush()
+
+    players = journal.recover("run", store=store)["players"]
+    assert Character.from_save_data(players[1]).to_save_data() == archer.to_save_data()
+
+def test_lines_for_old_snapshot_are_skipped(store):
+    hero = Character("Pablo")
+    log = make_journal(store)
+    log.open([hero], 2)
+    hero.gold = 999
+    log.record("purchase", [hero], 2)
+    log.flush()
+
+    # Save ditulis dari luar: baris journal lama tidak boleh diterapkan ke snapshot ini
+    other = Character("Lain")
+    save_game([other], 1, "run", verbose=False)
+    save_data = journal.recover("run", store=store)
+    assert save_data["players"] == [other.to_save_data()]
+
+def test_torn_last_line_is_ignored(store):
+    hero = Character("Pablo")
+    log = make_journal(store)
+    log.open([hero], 2)
+    hero.gold = 10
+    log.record("purchase", [hero], 2)
+    log.flush()
+    with open(log.path, "a") as f:
+        f.write('{"seq": 9, "players": {"0": {"gold"')
+
+    assert journal.recover("run", store=store)["players"][0]["gold"] == 10
+
+def test_compaction_writes_snapshot(store):
+    hero = Character("Pablo")
+    log = journal.Journal("run", store=store, compact_every=3)
+    log.open([hero], 2)
+    for gold in range(1, 8):
+        hero.gold = gold
+        log.record("purchase", [hero], 2)
+    log.flush()
+
+    assert journal.recover("run", store=store)["players"][0]["gold"] == 7
@@ -0,0 +1,42 @@
+import pytest
+
+import save_codec
+import save_schema
+from Adventure_v2 import Character, StatusEffect
+
+def make_save():
+    hero = Character("Pablo")
+    hero.level = 3
+    hero.gold = 460
+    hero.potions = {"Health Potion": 2}
+    hero.bombs = {"Fire Bomb": 1}
+    hero.status_effects.add(StatusEffect("Rage", "buff", 5, 3), sisa=2)
+    archer = Character("Santoso", role="Archer")
+    return {
+        "schema_version": save_schema.CURRENT_VERSION,
+        "chapter": 3,
+        "players": [hero.to_save_data(), archer.to_save_data()],
+    }
+
+@pytest.mark.parametrize("format_name", list(save_codec.FORMATS))
+def test_round_trip(format_name):
+    codec = save_codec.get_codec(format_name)
+    save_data = make_save()
+    assert codec.decode(codec.encode(save_data)) == save_data
+
+@pytest.mark.parametrize("format_name", list(save_codec.FORMATS))
+def test_read_header(format_name):
+    codec = save_codec.get_codec(format_name)
+    save_data = make_save()
+    assert codec.read_header(codec.encode(save_data)) == save_codec.header_of(save_data)
+
+def test_binary_rejects_long_string():
+    save_data = make_save()
+    save_data["players"][0]["nama"] = "x" * 256
+    with pytest.raises(ValueError):
+        save_codec.get_codec("binary").encode(save_data)
+
+def test_binary_rejects_old_schema():
+    save_data = dict(make_save(), schema_version=save_schema.CURRENT_VERSION - 1)
+    with pytest.raises(ValueError):
+        save_codec.get_codec("binary").encode(save_data)
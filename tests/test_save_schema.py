@@ -0,0 +1,41 @@
+import pytest
+
+import save_schema
+
+PLAYER_V1 = {
+    "nama": "pablo", "level": 2, "exp": 10, "exp_max": 150, "hp": 80, "hp_max": 120,
+    "mp": 40, "mp_max": 60, "attack": 12, "defense": 6, "magic": 9, "agility": 8,
+    "gold": 100, "skills": ["SLASH"], "potions": {"Health Potion": 1},
+}
+
+def test_upgrade_v1():
+    save_data = save_schema.upgrade(dict(PLAYER_V1, chapter=2))
+    assert save_data["schema_version"] == save_schema.CURRENT_VERSION
+    assert save_data["chapter"] == 2
+    player = save_data["players"][0]
+    assert player["role"] == "Warrior"
+    assert player["bombs"] == {}
+    assert player["weapon_inventory"] == []
+    assert player["status_effects"] == []
+    assert save_schema.validate(save_data) == []
+
+def test_upgrade_v2():
+    save_data = save_schema.upgrade({"chapter": 3, "players": [dict(PLAYER_V1, role="Archer", bombs={})]})
+    assert save_data["players"][0]["role"] == "Archer"
+    assert save_schema.validate(save_data) == []
+
+def test_upgrade_current_is_unchanged():
+    save_data = save_schema.upgrade({"chapter": 1, "players": [dict(PLAYER_V1, role="Warrior", bombs={})]})
+    assert save_schema.upgrade(save_data) is save_data
+
+def test_upgrade_rejects_future_version():
+    with pytest.raises(ValueError):
+        save_schema.upgrade({"schema_version": save_schema.CURRENT_VERSION + 1, "chapter": 1, "players": []})
+
+def test_validate_reports_errors():
+    save_data = save_schema.upgrade(dict(PLAYER_V1, chapter=1))
+    save_data["players"][0]["nama"] = ""
+    save_data["players"][0]["hp"] = 500
+    errors = save_schema.validate(save_data)
+    assert "players[0].nama kosong" in errors
+    assert "players[0].hp melebihi hp_max" in errors
@@ -0,0 +1,90 @@
+import random
+
+import journal
+from hibernation import SessionCache, SessionStore
+from loadtest import BotPlayer
+from Adventure_v2 import Character
+from session import GameSession
+
+def play(session, bot, text, messages):
+    for _ in range(messages):
+        text = bot.reply(session.handle(text))
+    return text
+
+def test_random_input_never_raises(store):
+    rng = random.Random(7)
+    session = GameSession("fuzz")
+    session.start()
+    for _ in range(2000):
+        session.handle(rng.choice(["", "0", "1", "2", "3", "4", "5", "8", "9", "y", "n", "x"]))
+    session.close()
+
+def test_bot_play_is_recoverable(store):
+    session = GameSession("bot")
+    bot = BotPlayer("bot", random.Random(1))
+    play(session, bot, bot.reply(session.start()), 300)
+    assert session.chapter >= 2
+    expected = [player.to_save_data() for player in session.players]
+    session.close()
+    journal.autosave.flush()
+    # Hasil recover harus bisa dimuat lagi sebagai Character
+    players = journal.recover(session.autosave_name)["players"]
+    assert [Character.from_save_data(data).to_save_data() for data in players] == expected
+
+def test_hibernate_and_restore(store, tmp_path):
+    cache = SessionCache(max_sessions=1, store=SessionStore(str(tmp_path / "sessions")))
+    bots = {sid: BotPlayer(sid, random.Random(sid)) for sid in ("a", "b")}
+    texts = {sid: bots[sid].reply(cache.create(sid).start()) for sid in bots}
+    for _ in range(100):
+        for sid, bot in bots.items():
+            texts[sid] = bot.reply(cache.get(sid).handle(texts[sid]))
+    assert len(cache) == 1
+    assert cache.restored > 0
+
+    # Sesi yang di-hibernate kembali dengan state yang sama, termasuk battle
+    session = cache.get("a")
+    before = session.to_dict()
+    cache.hibernate("a")
+    restored = cache.get("a")
+    assert restored is not session
+    after = restored.to_dict()
+    before.pop("journal")
+    after.pop("journal")
+    assert after == before
+
+def test_restored_session_keeps_file_until_hibernated(store, tmp_path):
+    sessions = SessionStore(str(tmp_path / "sessions"))
+    cache = SessionCache(store=sessions)
+    session = cache.create("a")
+    bot = BotPlayer("a", random.Random(3))
+    play(session, bot, bot.reply(session.start()), 50)
+    cache.hibernate("a")
+    position = sessions.get("a")[0]
+
+    cache.get("a")
+    assert sessions.get("a") == (position, True)
+    cache.hibernate("a")
+    assert sessions.get("a")[1] is False
+
+    # Proses mati setelah restore: sesi kembali ke posisi hibernate terakhir
+    # dan journal dimulai dari party posisi itu
+    restored = SessionCache(store=sessions).get("a")
+    play(restored, bot, bot.reply(restored.handle("")), 100)
+    position = sessions.get("a")[0]
+    restored = SessionCache(store=sessions).get("a")
+    assert restored.state == position["state"]
+    journal.autosave.flush()
+    players = journal.recover(restored.autosave_name)["players"]
+    assert players == position["players"]
+
+def test_failed_hibernate_keeps_session(store, tmp_path, monkeypatch):
+    cache = SessionCache(max_sessions=1, store=SessionStore(str(tmp_path / "sessions")))
+    session = cache.create("a")
+    session.start()
+
+    def fail(session_id, data):
+        raise OSError("disk penuh")
+    monkeypatch.setattr(cache.store, "put", fail)
+    cache.create("b").start()
+    assert len(cache) == 2
+    assert cache.get("a") is session
@@ -0,0 +1,40 @@
+import pytest
+
+import save_schema
+import storage
+
+SAVE = {"schema_version": save_schema.CURRENT_VERSION, "chapter": 1, "players": []}
+
+@pytest.fixture(params=["file", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "file":
+        yield storage.FileStore(str(tmp_path))
+    else:
+        store = storage.SqliteStore(str(tmp_path / "saves.db"))
+        yield store
+        store.close()
+
+def test_revision_and_exists(backend):
+    assert backend.revision("a") == 0
+    assert not backend.exists("a")
+    assert backend.save("a", SAVE) == 1
+    assert backend.save("a", SAVE) == 2
+    assert backend.exists("a")
+    assert backend.load("a") == SAVE
+
+def test_stale_writer_gets_conflict(backend):
+    revision = backend.save("a", SAVE)
+    backend.save("a", dict(SAVE, chapter=2), expected_revision=revision)
+    with pytest.raises(storage.SaveConflict) as info:
+        backend.save("a", dict(SAVE, chapter=3), expected_revision=revision)
+    assert info.value.actual == revision + 1
+    assert backend.load("a")["chapter"] == 2
+
+def test_new_name_expects_no_save(backend):
+    backend.save("a", SAVE)
+    with pytest.raises(storage.SaveConflict):
+        backend.save("a", SAVE, expected_revision=0)
+
+def test_save_many_returns_revisions(backend):
+    backend.save("a", SAVE)
+    assert backend.save_many([("a", SAVE), ("b", SAVE)]) == [2, 1]